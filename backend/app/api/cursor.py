@@ -0,0 +1,21 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, hand_id: str) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a hand"""
+    raw = f"{created_at.isoformat()}|{hand_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, hand_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        # Checked here rather than left for Postgres to reject as a uuid
+        return datetime.fromisoformat(created_at), str(uuid.UUID(hand_id))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,89 @@
+from typing import Union
+
+from fastapi import Depends, Request
+from starlette.requests import HTTPConnection
+
+from ..repository.connection import DatabaseConnection
+from ..repository.hands_repo import HandsRepository
+from ..repository.player_stats_repo import PlayerStatsRepository
+from ..repository.write_behind import GroupCommitWriter
+from ..services.equity import EquityCalculator
+from ..services.hand_cache import HandResponseCache
+from ..services.hand_imports import HandImports
+from ..services.idempotency import RecentHandKeys
+from ..services.live_tables import LiveTableRegistry
+from ..services.pending_ev import PendingEv
+from ..services.replay import ReplayCache
+from ..services.settlement_pool import SettlementExecutor
+
+
+def get_db_connection(request: Request) -> DatabaseConnection:
+    return request.app.state.db_connection
+
+
+# HTTPConnection so WebSocket endpoints can share these dependencies
+def get_hands_repo(request: HTTPConnection) -> HandsRepository:
+    return request.app.state.hands_repo
+
+
+def get_hand_writer(
+    request: HTTPConnection, hands_repo: HandsRepository = Depends(get_hands_repo)
+) -> Union[GroupCommitWriter, HandsRepository]:
+    """Where single hands are saved: the write-behind queue when enabled"""
+    writer = getattr(request.app.state, "hand_writer", None)
+    return writer if writer is not None else hands_repo
+
+
+def get_player_stats_repo(request: Request) -> PlayerStatsRepository:
+    return request.app.state.player_stats_repo
+
+
+def get_equity_calculator(request: Request) -> EquityCalculator:
+    return request.app.state.equity_calculator
+
+
+def get_hand_cache(request: Request) -> HandResponseCache:
+    return request.app.state.hand_cache
+
+
+def get_replay_cache(request: Request) -> ReplayCache:
+    return request.app.state.replay_cache
+
+
+def get_live_tables(request: HTTPConnection) -> LiveTableRegistry:
+    return request.app.state.live_tables
+
+
+def get_settlement_executor(request: HTTPConnection) -> SettlementExecutor:
+    """The app's settlement executor; apps started without the lifespan settle inline"""
+    executor = getattr(request.app.state, "settlement_executor", None)
+    if executor is None:
+        executor = request.app.state.settlement_executor = SettlementExecutor("inline")
+        executor.start()
+    return executor
+
+
+def get_hand_keys(request: HTTPConnection) -> RecentHandKeys:
+    """Recent idempotency keys; created on first use for apps started without the lifespan"""
+    keys = getattr(request.app.state, "hand_keys", None)
+    if keys is None:
+        keys = request.app.state.hand_keys = RecentHandKeys()
+    return keys
+
+
+def get_pending_ev(
+    request: HTTPConnection, hands_repo: HandsRepository = Depends(get_hands_repo)
+) -> PendingEv:
+    """All-in EV sampled after the response; created on first use for apps started without the lifespan"""
+    pending = getattr(request.app.state, "pending_ev", None)
+    if pending is None:
+        pending = request.app.state.pending_ev = PendingEv(hands_repo)
+    return pending
+
+
+def get_hand_imports(request: HTTPConnection) -> HandImports:
+    """Hand history import progress; created on first use for apps started without the lifespan"""
+    imports = getattr(request.app.state, "hand_imports", None)
+    if imports is None:
+        imports = request.app.state.hand_imports = HandImports()
+    return imports
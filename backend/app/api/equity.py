@@ -0,0 +1,70 @@
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from ..domain.cards import add_cards, parse_cards
+from ..services.equity import EquityCalculator
+from .dependencies import get_equity_calculator
+
+
+router = APIRouter()
+
+
+class EquityRequest(BaseModel):
+    hole_cards: Dict[int, str]  # seat -> cards
+    board: Dict[str, Optional[str]] = {}  # street -> cards
+    samples: int = Field(100_000, ge=1_000, le=10_000_000)
+    max_time_ms: Optional[int] = Field(None, ge=1, le=10_000)
+    seed: Optional[int] = Field(None, ge=0)
+
+
+@router.post("/equity")
+async def calculate_equity(
+    request: EquityRequest,
+    calculator: EquityCalculator = Depends(get_equity_calculator),
+) -> dict:
+    """Win/tie equity per seat; exact from the flop on, Monte Carlo preflop"""
+    try:
+        hole_cards = {
+            seat: parse_cards(cards) for seat, cards in request.hole_cards.items()
+        }
+        board = []
+        for street in ("flop", "turn", "river"):
+            if request.board.get(street):
+                board.extend(parse_cards(request.board[street]))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if not 2 <= len(hole_cards) <= 6:
+        raise HTTPException(status_code=422, detail="Equity needs 2 to 6 seats")
+    if any(len(cards) != 2 for cards in hole_cards.values()):
+        raise HTTPException(status_code=422, detail="Each seat needs two hole cards")
+    if len(board) not in (0, 3, 4, 5):
+        raise HTTPException(status_code=422, detail="Board must have 0, 3, 4 or 5 cards")
+    try:
+        known = add_cards(0, board)
+        for cards in hole_cards.values():
+            known = add_cards(known, cards)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    result = await calculator.calculate(
+        hole_cards,
+        board,
+        samples=request.samples,
+        max_time_ms=request.max_time_ms,
+        seed=request.seed,
+    )
+    return {
+        "method": result.method,
+        "samples": result.samples,
+        "equity": {
+            seat: {
+                "win": result.win[seat],
+                "tie": result.tie[seat],
+                "equity": result.equity[seat],
+            }
+            for seat in result.equity
+        },
+    }
@@ -1,25 +1,66 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from pydantic import BaseModel, Field, ValidationError
+import asyncio
+import csv
+import io
 import uuid
 from datetime import datetime
 
-from ..domain.hand import Hand, PlayerSnapshot, Action, Board
+from ..domain.hand import Hand, PlayerSnapshot, Action, Board, utc_now
+from ..domain.hand_history import HandHistoryReader, ParsedHand
+from ..domain.hand_codec import (
+    CONTENT_TYPE,
+    MAX_STACK,
+    VERSION as CODEC_VERSION,
+    check_encodable,
+)
+from ..domain.search import HandSearch, parse_action, parse_card
+from ..domain.serialization import dumps, dumps_text, loads
 from ..repository.hands_repo import HandsRepository
-from ..repository.connection import DatabaseConnection
-from ..services.settlement import SettlementService
+from ..repository.write_behind import GroupCommitWriter, WriteQueueFull
+from ..services.hand_cache import HandResponseCache
+from ..services.hand_imports import HandImports, ImportProgress
+from ..services.idempotency import (
+    MAX_HEADER_LENGTH,
+    RecentHandKeys,
+    content_key,
+    header_key,
+)
+from ..services.metrics import STAGE_SECONDS, metrics
+from ..services.pending_ev import PendingEv
+from ..services.replay import ReplayCache
+from ..services.settlement_pool import SettlementBusy, SettlementExecutor
+from .cursor import decode_cursor, encode_cursor
+from .responses import FastJSONResponse
+from .dependencies import (
+    get_hand_cache,
+    get_hand_imports,
+    get_hand_keys,
+    get_hand_writer,
+    get_hands_repo,
+    get_pending_ev,
+    get_replay_cache,
+    get_settlement_executor,
+)
 
 
 router = APIRouter()
 
-# Initialize services
-db_connection = DatabaseConnection()
-hands_repo = HandsRepository(db_connection)
-settlement_service = SettlementService()
+REQUIRED_ROLES = {"BTN", "SB", "BB", "UTG", "MP", "CO"}
+MAX_BATCH_SIZE = 50_000
+IMMUTABLE = "public, max-age=31536000, immutable"
+# bb_size is an INT column
+MAX_BB_SIZE = 2**31 - 1
+
+_PARSE_SECONDS = STAGE_SECONDS.labels("parse")
+_BUILD_SECONDS = STAGE_SECONDS.labels("build")
 
 
 class HandRequest(BaseModel):
-    bb_size: int
+    bb_size: int = Field(gt=0, le=MAX_BB_SIZE)
     seats: List[dict]
     hole_cards: dict
     board: dict
@@ -30,90 +71,310 @@ class HandResponse(BaseModel):
     id: str
     result: dict
     short_line: str
+    ev_result: Optional[dict]
+    ev_pending: bool = False
 
 
 @router.get("/hands")
 async def list_hands(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
-) -> List[dict]:
-    """List hands with pagination"""
-    hands = await hands_repo.list(limit=limit, offset=offset)
-    return [
-        {
-            "id": hand.id,
-            "created_at": hand.created_at.isoformat(),
-            "bb_size": hand.bb_size,
-            "short_line": hand.short_line,
-            "result": hand.result
-        }
-        for hand in hands
-    ]
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+) -> FastJSONResponse:
+    """List hands newest first; pass the X-Next-Cursor header back as ?cursor="""
+    before = None
+    if cursor:
+        if offset:
+            raise HTTPException(status_code=422, detail="Use either cursor or offset")
+        try:
+            before = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    hands = await hands_repo.list_summaries(limit=limit, offset=offset, before=before)
+    headers = {}
+    if len(hands) == limit:
+        last = hands[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+
+    # HandSummary fields are exactly the response keys
+    return FastJSONResponse(hands, headers=headers)
+
+
+@router.get("/hands/search")
+async def search_hands(
+    player: Optional[str] = Query(None),
+    action: Optional[str] = Query(None, description="street:type, e.g. preflop:r"),
+    board: List[str] = Query([]),
+    hole: List[str] = Query([]),
+    min_pot_bb: Optional[float] = Query(None, ge=0),
+    max_pot_bb: Optional[float] = Query(None, ge=0),
+    showdown: Optional[bool] = Query(None),
+    winner_seat: Optional[int] = Query(None, ge=0, le=7),
+    q: Optional[str] = Query(None, min_length=3),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+) -> FastJSONResponse:
+    """Hand summaries matching every given filter, newest first.
+
+    ``action`` alone matches any seat; with ``player`` it must be that
+    player's action. ``board`` and ``hole`` may repeat and must all appear.
+    """
+    try:
+        search = HandSearch(
+            player=player,
+            action=parse_action(action) if action else None,
+            board_cards=[parse_card(card) for card in board],
+            hole_cards=[parse_card(card) for card in hole],
+            min_pot_bb=min_pot_bb,
+            max_pot_bb=max_pot_bb,
+            showdown=showdown,
+            winner_seat=winner_seat,
+            text=q,
+        )
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    hands = await hands_repo.search(search, limit=limit, before=before)
+    headers = {}
+    if len(hands) == limit:
+        last = hands[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return FastJSONResponse(hands, headers=headers)
+
+
+CSV_COLUMNS = [
+    "id", "created_at", "bb_size", "seats", "hole_cards", "flop", "turn",
+    "river", "actions", "short_line", "result", "cursor",
+]
+
+
+@router.get("/hands/export")
+async def export_hands(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    after: Optional[str] = Query(None),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+) -> StreamingResponse:
+    """Stream every matching hand oldest first as NDJSON or CSV.
+
+    Each row carries a ``cursor``; pass the last one received as ``after`` to
+    resume an interrupted export.
+    """
+    position = None
+    if after:
+        try:
+            position = decode_cursor(after)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    hands = hands_repo.stream(since=since, until=until, after=position)
+    if format == "csv":
+        return StreamingResponse(
+            _csv_rows(hands),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="hands.csv"'},
+        )
+    return StreamingResponse(_ndjson_rows(hands), media_type="application/x-ndjson")
+
+
+async def _ndjson_rows(hands: AsyncIterator[Hand]) -> AsyncIterator[bytes]:
+    async for hand in hands:
+        # Splice the cursor into the encoded object rather than copying a dict
+        cursor = encode_cursor(hand.created_at, str(hand.id))
+        yield dumps(hand)[:-1] + b',"cursor":"' + cursor.encode() + b'"}\n'
+
+
+async def _csv_rows(hands: AsyncIterator[Hand]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    async for hand in hands:
+        writer.writerow([
+            str(hand.id),
+            hand.created_at.isoformat(),
+            hand.bb_size,
+            dumps_text(hand.seats),
+            dumps_text(hand.hole_cards),
+            hand.board.flop or "",
+            hand.board.turn or "",
+            hand.board.river or "",
+            dumps_text(hand.actions),
+            hand.short_line,
+            dumps_text(hand.result),
+            encode_cursor(hand.created_at, str(hand.id)),
+        ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+@router.get("/hands/imports")
+async def list_imports(imports: HandImports = Depends(get_hand_imports)) -> dict:
+    """Running and recent hand history imports, newest first, without error lists"""
+    return {"imports": [progress.stats(errors=False) for progress in imports.list()]}
+
+
+@router.get("/hands/imports/{import_id}")
+async def get_import(
+    import_id: str, imports: HandImports = Depends(get_hand_imports)
+) -> dict:
+    progress = imports.get(import_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return progress.stats()
 
 
 @router.get("/hands/{hand_id}")
-async def get_hand(hand_id: str) -> dict:
-    """Get a specific hand by ID"""
-    hand = await hands_repo.get(hand_id)
-    if not hand:
+async def get_hand(
+    hand_id: str,
+    request: Request,
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+    cache: HandResponseCache = Depends(get_hand_cache),
+    pending: PendingEv = Depends(get_pending_ev),
+) -> Response:
+    """Get a specific hand by ID, as JSON or in the binary hand encoding.
+
+    Stored hands only change once, when the all-in EV sampled after their
+    creation is added. Until then they are served uncached; after that
+    responses carry a strong ETag derived from the id and representation and
+    are cached in-process after the first read.
+    """
+    binary = CONTENT_TYPE in request.headers.get("accept", "")
+    variant = "bin" if binary else "json"
+    media_type = CONTENT_TYPE if binary else "application/json"
+    if pending.sampling(hand_id):
+        body = await _hand_body(hands_repo, hand_id, binary)
+        return Response(
+            content=body,
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "Vary": "Accept"},
+        )
+
+    etag = f'"h{CODEC_VERSION}-{hand_id}-{variant}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Vary": "Accept"}
+
+    match = _if_none_match(request.headers.get("if-none-match", ""), etag)
+    if match is True:
+        cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    cached = cache.get((hand_id, variant))
+    if cached is None:
+        body = await _hand_body(hands_repo, hand_id, binary)
+        cached = cache.put(
+            (hand_id, variant),
+            body,
+            media_type,
+            etag,
+        )
+
+    if match is None:
+        # "*" matches any current representation, so only once the hand exists
+        cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=cached.media_type, headers=headers)
+
+
+async def _hand_body(hands_repo: HandsRepository, hand_id: str, binary: bool) -> bytes:
+    if binary:
+        body = await hands_repo.get_encoded(hand_id)
+    else:
+        hand = await hands_repo.get(hand_id)
+        body = dumps(hand) if hand else None
+    if body is None:
         raise HTTPException(status_code=404, detail="Hand not found")
-    
-    return {
-        "id": hand.id,
-        "created_at": hand.created_at.isoformat(),
-        "bb_size": hand.bb_size,
-        "seats": [
-            {
-                "seat": s.seat,
-                "name": s.name,
-                "starting_stack": s.starting_stack,
-                "role": s.role
-            }
-            for s in hand.seats
-        ],
-        "hole_cards": hand.hole_cards,
-        "board": {
-            "flop": hand.board.flop,
-            "turn": hand.board.turn,
-            "river": hand.board.river
-        },
-        "actions": [
-            {
-                "seat": a.seat,
-                "street": a.street,
-                "type": a.type,
-                "amount": a.amount
-            }
-            for a in hand.actions
-        ],
-        "short_line": hand.short_line,
-        "result": hand.result
-    }
+    return body
+
+
+def _if_none_match(header: str, etag: str) -> Optional[bool]:
+    """True when If-None-Match lists ``etag``, None for "*", else False.
+
+    Comparison is weak, as the header requires: a W/ prefix is ignored.
+    """
+    for token in header.split(","):
+        token = token.strip()
+        if token == "*":
+            return None
+        if token.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@router.get("/hands/{hand_id}/replay")
+async def replay_hand(
+    hand_id: str,
+    response: Response,
+    step: Optional[int] = Query(None, ge=0),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+    replays: ReplayCache = Depends(get_replay_cache),
+) -> dict:
+    """Pot, stacks, seat to act and board after each action; ?step=N for one"""
+    replay = replays.get(hand_id)
+    if replay is None:
+        hand = await hands_repo.get(hand_id)
+        if not hand:
+            raise HTTPException(status_code=404, detail="Hand not found")
+        replay = replays.load(hand_id, hand)
+    response.headers["Cache-Control"] = IMMUTABLE
+
+    try:
+        if step is not None:
+            if step >= replay.steps:
+                raise HTTPException(
+                    status_code=422, detail=f"step must be below {replay.steps}"
+                )
+            return replay.snapshot(step)
+        return {"id": hand_id, "steps": replay.steps, "snapshots": replay.snapshots()}
+    except ValueError as e:
+        # Hands stored before betting validation may not replay cleanly
+        raise HTTPException(status_code=422, detail=str(e))
+
 
+@router.get("/hands/{hand_id}/ev")
+async def get_hand_ev(
+    hand_id: str,
+    pending: PendingEv = Depends(get_pending_ev),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+) -> dict:
+    """All-in EV of a hand; ``ev_pending`` stays true while its runouts are sampled.
 
-@router.post("/hands", response_model=HandResponse)
-async def create_hand(request: HandRequest) -> HandResponse:
-    """Create a new hand with validation and settlement"""
-    
-    # Validate request
+    The last ``ALL_IN_EV_CACHE_SIZE`` hands created with ``ev_pending`` are
+    answered from memory, any other hand from its stored ``ev_result``.
+    """
+    ev = pending.get(hand_id)
+    if ev is not None:
+        return ev
+    hand = await hands_repo.get(hand_id)
+    if hand is None or hand.ev_result is None:
+        raise HTTPException(status_code=404, detail="No pending or sampled EV for this hand")
+    return {"id": hand.id, "ev_result": hand.ev_result, "ev_pending": False}
+
+
+def _build_hand(request: HandRequest) -> Hand:
+    """Check the table shape and build an unsettled Hand"""
     if len(request.seats) != 6:
-        raise HTTPException(status_code=422, detail="Must have exactly 6 players")
-    
-    # Check roles
-    roles = {seat["role"] for seat in request.seats}
-    required_roles = {"BTN", "SB", "BB", "UTG", "MP", "CO"}
-    if roles != required_roles:
-        raise HTTPException(status_code=422, detail=f"Invalid roles. Required: {required_roles}")
-    
-    # Create domain objects
-    seats = [PlayerSnapshot(**seat) for seat in request.seats]
-    board = Board(**request.board)
-    actions = [Action(**action) for action in request.actions]
-    
-    # Create hand
-    hand = Hand(
+        raise ValueError("Must have exactly 6 players")
+
+    try:
+        seats = [PlayerSnapshot(**seat) for seat in request.seats]
+        board = Board(**request.board)
+        actions = [Action(**action) for action in request.actions]
+    except TypeError as e:
+        raise ValueError(f"Malformed hand: {e}") from e
+    _check_types(seats, request.hole_cards, board, actions)
+
+    roles = {seat.role for seat in seats}
+    if roles != REQUIRED_ROLES:
+        raise ValueError(f"Invalid roles. Required: {REQUIRED_ROLES}")
+
+    return Hand(
         id=str(uuid.uuid4()),
-        created_at=datetime.utcnow(),
+        created_at=utc_now(),
         bb_size=request.bb_size,
         seats=seats,
         hole_cards=request.hole_cards,
@@ -122,20 +383,424 @@ async def create_hand(request: HandRequest) -> HandResponse:
         short_line="",  # Will be generated
         result={}  # Will be calculated
     )
-    
-    # Validate and settle the hand
+
+
+def _check_types(
+    seats: List[PlayerSnapshot], hole_cards: dict, board: Board, actions: List[Action]
+) -> None:
+    """Reject values of the wrong type or range before settlement uses them"""
+    # bool is an int subclass but never a seat or an amount
+    for player in seats:
+        if type(player.seat) is not int or type(player.starting_stack) is not int:
+            raise ValueError("Seat and starting_stack must be integers")
+        if not 0 <= player.starting_stack <= MAX_STACK:
+            raise ValueError(f"starting_stack must be between 0 and {MAX_STACK}")
+        if not isinstance(player.name, str) or not isinstance(player.role, str):
+            raise ValueError("Seat name and role must be strings")
+    for cards in hole_cards.values():
+        if cards is not None and not isinstance(cards, str):
+            raise ValueError("Hole cards must be strings")
+    for cards in (board.flop, board.turn, board.river):
+        if cards is not None and not isinstance(cards, str):
+            raise ValueError("Board cards must be strings")
+    for action in actions:
+        if type(action.seat) is not int or type(action.amount) is not int:
+            raise ValueError("Action seat and amount must be integers")
+        if not isinstance(action.street, str) or not isinstance(action.type, str):
+            raise ValueError("Action street and type must be strings")
+
+
+async def _settle(executor: SettlementExecutor, hand: Hand) -> Optional[Dict[int, float]]:
+    """Settle in place, returning the all-in EV result (None while it is pending)"""
+    result, short_line, ev_result = await executor.settle(hand)
+    _apply_settlement(hand, result, short_line, ev_result)
+    return ev_result
+
+
+def _apply_settlement(
+    hand: Hand,
+    result: Dict[int, int],
+    short_line: str,
+    ev_result: Optional[Dict[int, float]],
+) -> None:
+    hand.result = result
+    hand.short_line = short_line
+    hand.ev_result = ev_result
+
+
+def _hand_response(hand: Hand, ev_result: Optional[Dict[int, float]]) -> dict:
+    response = {
+        "id": hand.id,
+        "result": hand.result,
+        "short_line": hand.short_line,
+        "ev_result": ev_result,
+    }
+    if ev_result is None:
+        # Sampled once the response is out; GET /hands/{id}/ev returns it
+        response["ev_pending"] = True
+    return response
+
+
+def _idempotency_header(request: Request) -> Optional[str]:
+    value = request.headers.get("idempotency-key")
+    if value is not None and not 0 < len(value) <= MAX_HEADER_LENGTH:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Idempotency-Key must be 1 to {MAX_HEADER_LENGTH} characters",
+        )
+    return value
+
+
+@router.post(
+    "/hands",
+    response_model=HandResponse,
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": HandRequest.model_json_schema()}},
+        }
+    },
+)
+async def create_hand(
+    request: Request,
+    writer: Union[GroupCommitWriter, HandsRepository] = Depends(get_hand_writer),
+    executor: SettlementExecutor = Depends(get_settlement_executor),
+    keys: RecentHandKeys = Depends(get_hand_keys),
+    pending: PendingEv = Depends(get_pending_ev),
+) -> FastJSONResponse:
+    """Create a new hand with validation and settlement.
+
+    A hand submitted again, with the same Idempotency-Key or, without one, the
+    same content, gets the original response back with Idempotent-Replayed.
+    """
+    idempotency = _idempotency_header(request)
+    # Parsed here rather than by FastAPI so the parse stage can be timed
+    body = await request.body()
+    started = metrics.now()
     try:
-        result, short_line = settlement_service.validate_and_settle_hand(hand)
-        hand.result = result
-        hand.short_line = short_line
+        hand_request = HandRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+    _PARSE_SECONDS.observe_since(started)
+
+    try:
+        started = metrics.now()
+        hand = _build_hand(hand_request)
+        _BUILD_SECONDS.observe_since(started)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
-    
+
+    key = header_key(idempotency) if idempotency else content_key(hand)
+    recent = await keys.claim(key)
+    if recent is not None:
+        return _replay(recent)
+
+    response = None
+    try:
+        response, replayed = await _settle_and_save(writer, executor, hand, key)
+    finally:
+        keys.finish(key, response)
+
+    if replayed:
+        return _replay(response)
+    if response.get("ev_pending"):
+        pending.schedule(executor, [hand])
+    return FastJSONResponse(response, status_code=201)
+
+
+async def _settle_and_save(
+    writer: Union[GroupCommitWriter, HandsRepository],
+    executor: SettlementExecutor,
+    hand: Hand,
+    key: bytes,
+) -> Tuple[dict, bool]:
+    """Settle and store a hand; returns its response and whether it is a replay"""
+    try:
+        ev_result = await _settle(executor, hand)
+    except SettlementBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    response = _hand_response(hand, ev_result)
     # Save to database
-    await hands_repo.save(hand)
-    
-    return HandResponse(
-        id=hand.id,
-        result=hand.result,
-        short_line=hand.short_line
+    try:
+        # Checked here, as a queued hand would fail its whole write group
+        check_encodable(hand)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        existing = await writer.save(hand, (key, response))
+    except WriteQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if existing is not None:
+        # Another submission of this key was stored first
+        return existing, True
+    return response, False
+
+
+def _replay(response: dict) -> FastJSONResponse:
+    return FastJSONResponse(
+        response, status_code=201, headers={"Idempotent-Replayed": "true"}
+    )
+
+
+class _BatchParseError:
+    def __init__(self, message: str):
+        self.message = message
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    """Split a batch body into raw items; unparseable NDJSON lines become errors"""
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line))
+            except ValueError as e:
+                items.append(_BatchParseError(f"Invalid JSON: {e}"))
+        return items
+
+    try:
+        items = loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=422, detail="Batch body must be a JSON array")
+    return items
+
+
+@router.post("/hands/batch")
+async def create_hands_batch(
+    request: Request,
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+    executor: SettlementExecutor = Depends(get_settlement_executor),
+    keys: RecentHandKeys = Depends(get_hand_keys),
+    pending: PendingEv = Depends(get_pending_ev),
+) -> dict:
+    """Settle and store many hands at once; invalid hands are reported, not fatal.
+
+    Hands already submitted (by the Idempotency-Key plus their index, or by
+    content) are reported with their original response and ``replayed``.
+    """
+    idempotency = _idempotency_header(request)
+    items = _parse_batch_body(
+        await request.body(), request.headers.get("content-type", "")
+    )
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413, detail=f"Batch exceeds {MAX_BATCH_SIZE} hands"
+        )
+
+    built: List[Hand] = []
+    positions: List[int] = []
+    results: List[Optional[dict]] = []
+    for index, item in enumerate(items):
+        if isinstance(item, _BatchParseError):
+            results.append({"index": index, "error": item.message})
+            continue
+        try:
+            hand = _build_hand(HandRequest.model_validate(item))
+        except ValidationError as e:
+            results.append({"index": index, "error": _format_validation_error(e)})
+            continue
+        except ValueError as e:
+            results.append({"index": index, "error": str(e)})
+            continue
+        built.append(hand)
+        positions.append(len(results))
+        results.append(None)
+
+    hand_keys = [
+        header_key(idempotency, position) if idempotency else content_key(hand)
+        for hand, position in zip(built, positions)
+    ]
+    outcomes = await _store_many(built, hand_keys, hands_repo, executor, keys)
+    pending.schedule(executor, [
+        hand for hand, outcome in zip(built, outcomes)
+        if isinstance(outcome, dict) and outcome.get("ev_pending") and not outcome.get("replayed")
+    ])
+    for position, outcome in zip(positions, outcomes):
+        if isinstance(outcome, str):
+            results[position] = {"index": position, "error": outcome}
+        else:
+            results[position] = {"index": position, **outcome}
+
+    stored = [result for result in results if "id" in result]
+    return {
+        "accepted": len(stored),
+        "replayed": sum(1 for result in stored if result.get("replayed")),
+        "rejected": len(items) - len(stored),
+        "results": results,
+    }
+
+
+@router.post(
+    "/hands/import",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/plain": {"schema": {"type": "string"}},
+                "application/gzip": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def import_hand_histories(
+    request: Request,
+    name: Optional[str] = Query(None, max_length=255),
+    hands_repo: HandsRepository = Depends(get_hands_repo),
+    executor: SettlementExecutor = Depends(get_settlement_executor),
+    keys: RecentHandKeys = Depends(get_hand_keys),
+    imports: HandImports = Depends(get_hand_imports),
+) -> dict:
+    """Import a room's text hand history file, plain or gzip, as it uploads.
+
+    Hands are settled and saved in batches keyed by content, so uploading a
+    file again replays its hands instead of storing them twice. Hands that
+    cannot be read or settled are reported with the room's hand number and
+    line; ``GET /hands/imports`` shows the counts while the upload runs.
+    """
+    progress = imports.start(name or "upload")
+    reader = HandHistoryReader()
+    pending: List[ParsedHand] = []
+    try:
+        async for chunk in request.stream():
+            # Parsing a chunk takes milliseconds; keep it off the event loop
+            parsed = await asyncio.to_thread(reader.feed, chunk)
+            progress.bytes_read = reader.bytes_read
+            pending.extend(_count_parsed(parsed, progress))
+            if len(pending) >= imports.batch_size:
+                await _import_batch(pending, progress, hands_repo, executor, keys)
+                pending = []
+        pending.extend(_count_parsed(reader.close(), progress))
+        await _import_batch(pending, progress, hands_repo, executor, keys)
+    except ValueError as e:
+        # The file itself is unreadable, e.g. corrupt gzip
+        progress.finish(str(e))
+        raise HTTPException(status_code=422, detail=progress.stats())
+    except BaseException as e:
+        progress.finish(str(getattr(e, "detail", "")) or type(e).__name__)
+        raise
+    progress.finish()
+    return progress.stats()
+
+
+def _count_parsed(parsed: List[ParsedHand], progress: ImportProgress) -> List[ParsedHand]:
+    """Record parsed hands and their parse errors; returns the readable ones"""
+    readable = []
+    for item in parsed:
+        progress.hands += 1
+        if item.error is not None:
+            progress.reject(item.reference, item.line, item.error)
+        else:
+            readable.append(item)
+    return readable
+
+
+async def _import_batch(
+    parsed: List[ParsedHand],
+    progress: ImportProgress,
+    hands_repo: HandsRepository,
+    executor: SettlementExecutor,
+    keys: RecentHandKeys,
+) -> None:
+    if not parsed:
+        return
+    hands = [item.hand for item in parsed]
+    outcomes = await _store_many(
+        hands, [content_key(hand) for hand in hands], hands_repo, executor, keys
+    )
+    for item, outcome in zip(parsed, outcomes):
+        if isinstance(outcome, str):
+            progress.reject(item.reference, item.line, outcome)
+        else:
+            progress.accepted += 1
+            progress.replayed += bool(outcome.get("replayed"))
+
+
+async def _store_many(
+    hands: List[Hand],
+    hand_keys: List[bytes],
+    hands_repo: HandsRepository,
+    executor: SettlementExecutor,
+    keys: RecentHandKeys,
+) -> List[Union[dict, str]]:
+    """Settle and save hands under their idempotency keys, in one repository call.
+
+    Each outcome is the hand's response, marked ``replayed`` when its key was
+    stored before (or earlier in ``hands``), or why the hand was rejected.
+    """
+    outcomes: List[Union[dict, str, None]] = [None] * len(hands)
+    # Keys settled here by the position of their first hand, and those this call owns
+    first: Dict[bytes, int] = {}
+    owned: List[bytes] = []
+    repeats: List[Tuple[int, int]] = []
+    to_settle: List[Tuple[bytes, Hand, int]] = []
+    stored: Dict[bytes, dict] = {}
+    try:
+        for position, (hand, key) in enumerate(zip(hands, hand_keys)):
+            if key in first:
+                repeats.append((position, first[key]))
+                continue
+            # Never waits: a key another request is settling is settled here
+            # too, and save_many reports whichever was stored first
+            recent, owns = keys.claim_nowait(key)
+            if recent is not None:
+                outcomes[position] = {**recent, "replayed": True}
+                continue
+            if owns:
+                owned.append(key)
+            first[key] = position
+            to_settle.append((key, hand, position))
+
+        try:
+            settlements = await executor.settle_many([hand for _, hand, _ in to_settle])
+        except SettlementBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+        accepted: List[Hand] = []
+        accepted_keys: List[Tuple[bytes, dict]] = []
+        for (key, hand, position), settlement in zip(to_settle, settlements):
+            if isinstance(settlement, ValueError):
+                outcomes[position] = str(settlement)
+                continue
+            try:
+                # One hand the codec cannot store would fail the whole COPY
+                check_encodable(hand)
+            except ValueError as e:
+                outcomes[position] = str(e)
+                continue
+            result, short_line, ev_result = settlement
+            _apply_settlement(hand, result, short_line, ev_result)
+            response = _hand_response(hand, ev_result)
+            accepted.append(hand)
+            accepted_keys.append((key, response))
+            outcomes[position] = response
+
+        taken = await hands_repo.save_many(accepted, accepted_keys)
+        for (key, response), existing in zip(accepted_keys, taken):
+            stored[key] = existing or response
+            if existing is not None:
+                outcomes[first[key]] = {**existing, "replayed": True}
+    finally:
+        for key in owned:
+            keys.finish(key, stored.get(key))
+
+    for position, original in repeats:
+        outcome = outcomes[original]
+        outcomes[position] = {**outcome, "replayed": True} if isinstance(outcome, dict) else outcome
+    return outcomes
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
     )
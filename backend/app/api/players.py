@@ -0,0 +1,38 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..repository.player_stats_repo import LEADERBOARD_ORDERS, PlayerStatsRepository
+from .dependencies import get_player_stats_repo
+
+
+router = APIRouter()
+
+
+@router.get("/players/leaderboard")
+async def leaderboard(
+    by: str = Query("net_result"),
+    limit: int = Query(20, ge=1, le=500),
+    min_hands: int = Query(0, ge=0),
+    repo: PlayerStatsRepository = Depends(get_player_stats_repo),
+) -> List[dict]:
+    """Players ranked by one of the stored counters"""
+    if by not in LEADERBOARD_ORDERS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"by must be one of: {', '.join(LEADERBOARD_ORDERS)}",
+        )
+    rows = await repo.leaderboard(by, limit, min_hands)
+    return [{"name": name, **stats.as_dict()} for name, stats in rows]
+
+
+@router.get("/players/{name}/stats")
+async def player_stats(
+    name: str,
+    repo: PlayerStatsRepository = Depends(get_player_stats_repo),
+) -> dict:
+    """Running totals for one player, maintained as hands are saved"""
+    stats = await repo.get(name)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return {"name": name, **stats.as_dict()}
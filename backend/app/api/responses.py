@@ -0,0 +1,14 @@
+from typing import Any
+
+from fastapi.responses import Response
+
+from ..domain.serialization import dumps
+
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson; dataclasses are serialized as-is"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,188 @@
+import logging
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from ..domain.action import ActionError
+from ..domain.hand import Action, Board
+from ..domain.serialization import dumps_text, loads
+from ..repository.hands_repo import HandsRepository
+from ..repository.write_behind import GroupCommitWriter, WriteQueueFull
+from ..services.live_tables import LiveTable, LiveTableRegistry, TableLimitReached
+from ..services.pending_ev import PendingEv
+from ..services.settlement_pool import SettlementBusy, SettlementExecutor
+from .dependencies import (
+    get_hand_writer,
+    get_live_tables,
+    get_pending_ev,
+    get_settlement_executor,
+)
+from .hands import HandRequest, _build_hand, _hand_response, _settle
+
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+
+class _Reply(Exception):
+    """A message for the client that ends handling of the current request"""
+
+    def __init__(self, op: str, **fields):
+        super().__init__(op)
+        self.message = {"op": op, **fields}
+
+
+def _action(message: dict) -> Action:
+    try:
+        action = Action(message["seat"], message["street"], message["type"], message["amount"])
+    except KeyError as e:
+        raise _Reply("error", detail=f"Action is missing {e.args[0]}") from None
+    if not isinstance(action.seat, int) or not isinstance(action.amount, int):
+        raise _Reply("error", detail="Action seat and amount must be integers")
+    # Checked before the betting rules look them up in sets, where lists raise
+    if not isinstance(action.street, str) or not isinstance(action.type, str):
+        raise _Reply("error", detail="Action street and type must be strings")
+    return action
+
+
+def _open_table(tables: LiveTableRegistry, message: dict) -> LiveTable:
+    try:
+        hand = _build_hand(HandRequest(
+            bb_size=message.get("bb_size"),
+            seats=message.get("seats"),
+            hole_cards=message.get("hole_cards") or {},
+            board={},
+            actions=[],
+        ))
+        return tables.open(hand)
+    except TableLimitReached as e:
+        raise _Reply("error", detail=str(e), retry=True) from None
+    except (ValueError, TypeError) as e:
+        raise _Reply("error", detail=str(e)) from None
+
+
+class _Session:
+    """One connection's conversation; at most one open hand at a time"""
+
+    def __init__(
+        self,
+        tables: LiveTableRegistry,
+        writer: Union[GroupCommitWriter, HandsRepository],
+        executor: SettlementExecutor,
+        pending: PendingEv,
+    ):
+        self.tables = tables
+        self.writer = writer
+        self.executor = executor
+        self.pending = pending
+        self.hand_id: Optional[str] = None
+
+    async def handle(self, raw: str) -> dict:
+        try:
+            message = loads(raw)
+        except ValueError as e:
+            return {"op": "error", "detail": f"Invalid JSON: {e}"}
+        if not isinstance(message, dict):
+            return {"op": "error", "detail": "Messages must be JSON objects"}
+        try:
+            return await self._dispatch(message.get("op"), message)
+        except _Reply as e:
+            return e.message
+
+    async def _dispatch(self, op: Optional[str], message: dict) -> dict:
+        table = self.tables.get(self.hand_id) if self.hand_id else None
+        if self.hand_id and table is None:
+            self.hand_id = None
+            raise _Reply("error", detail="Hand expired after going idle")
+
+        if op in ("open", "resume"):
+            if table is not None:
+                raise _Reply("error", detail="Finish or abandon the open hand first")
+            if op == "open":
+                table = _open_table(self.tables, message)
+            else:
+                table = self.tables.get(str(message.get("hand_id")))
+                if table is None:
+                    raise _Reply("error", detail="No open hand with that id")
+            if not table.attach(self):
+                raise _Reply("error", detail="Hand is being played on another connection", retry=True)
+            self.hand_id = table.hand.id
+            return {"op": "opened", "state": table.view()}
+        if table is None:
+            raise _Reply("error", detail="Open a hand first")
+
+        if op == "action":
+            try:
+                index = table.act(_action(message))
+            except ActionError as e:
+                raise _Reply("illegal", index=e.index, reason=e.reason, state=table.view()) from None
+            return {"op": "state", "index": index, "state": table.view()}
+        if op == "board":
+            table.deal(Board(message.get("flop"), message.get("turn"), message.get("river")))
+            return {"op": "state", "state": table.view()}
+        if op == "finish":
+            reply = await self._finish(table)
+            self.hand_id = None
+            return reply
+        if op == "abandon":
+            self.tables.close(table.hand.id)
+            self.hand_id = None
+            return {"op": "abandoned"}
+        raise _Reply("error", detail=f"Unknown op: {op}")
+
+    def release(self) -> None:
+        """Let another connection resume the open hand"""
+        table = self.tables.get(self.hand_id) if self.hand_id else None
+        if table is not None:
+            table.detach(self)
+
+    async def _finish(self, table: LiveTable) -> dict:
+        try:
+            hand = table.finish()
+            ev_result = await _settle(self.executor, hand)
+        except SettlementBusy as e:
+            raise _Reply("error", detail=str(e), retry=True) from None
+        except ValueError as e:
+            raise _Reply("error", detail=str(e), state=table.view()) from None
+        try:
+            await self.writer.save(hand)
+        except WriteQueueFull as e:
+            raise _Reply("error", detail=str(e), retry=True) from None
+        except Exception as e:
+            # The hand stays open, so the client can send finish again
+            logger.warning("Could not save live hand %s: %s", hand.id, e)
+            raise _Reply("error", detail="Could not save the hand", retry=True) from None
+        self.tables.close(hand.id, finished=True)
+        if ev_result is None:
+            self.pending.schedule(self.executor, [hand])
+        return {"op": "settled", **_hand_response(hand, ev_result)}
+
+
+@router.websocket("/tables/live")
+async def live_table(
+    websocket: WebSocket,
+    tables: LiveTableRegistry = Depends(get_live_tables),
+    writer: Union[GroupCommitWriter, HandsRepository] = Depends(get_hand_writer),
+    executor: SettlementExecutor = Depends(get_settlement_executor),
+    pending: PendingEv = Depends(get_pending_ev),
+) -> None:
+    """Play one hand at a time, validating each action as it arrives.
+
+    Client messages are JSON objects with an ``op``: ``open`` (bb_size,
+    seats, hole_cards), ``resume`` (hand_id), ``action`` (seat, street, type,
+    amount), ``board`` (flop/turn/river), ``finish`` and ``abandon``. Every
+    reply carries an ``op`` too; ``opened``, ``state`` and ``illegal``
+    replies include the pot, stacks, commitments and seat to act.
+    """
+    await websocket.accept()
+    session = _Session(tables, writer, executor, pending)
+    try:
+        while True:
+            reply = await session.handle(await websocket.receive_text())
+            await websocket.send_text(dumps_text(reply))
+    except WebSocketDisconnect:
+        # The open hand stays resumable until it goes idle
+        pass
+    finally:
+        session.release()
@@ -0,0 +1,146 @@
+"""Move cold monthly partitions of hands into archive files.
+
+    python -m app.commands.archive_hands [--keep-months 6] [--dir data/archive]
+        [--dry-run]
+
+Every monthly partition that ended more than ``--keep-months`` months ago is
+written to ``<dir>/<partition>.hca`` and then dropped, all in one transaction
+that blocks writes to the partition, so no hand can land in it between the
+export and the drop. The idempotency keys of the partition's hands are
+deleted from ``hand_keys`` in the same transaction, so keys are only kept for
+hands still in Postgres. The API reads archived hands from the same directory
+(``HANDS_ARCHIVE_DIR``) as soon as the file appears. A partition whose month
+already has an archive file, e.g. one recreated by a backdated import, is
+merged with that file into a new one that replaces it; the old file is only
+gone once the partition is dropped. Upcoming partitions are created on the way.
+"""
+import argparse
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from ..domain.hand_codec import encode_hand
+from ..repository.archive import SUFFIX, ArchiveFile, ArchiveWriter, HandArchive
+from ..repository.connection import DatabaseConnection
+from ..repository.hands_repo import JSON_COLUMNS, HandsRepository
+from ..repository.partitions import HandPartitions, Partition, month_start
+
+
+async def archive_partition(
+    db: DatabaseConnection, repo: HandsRepository, partition: Partition, directory: Path
+) -> int:
+    """Write one partition to an archive file and drop it; returns the hand count"""
+    path = directory / f"{partition.name}{SUFFIX}"
+    # Neither name ends in SUFFIX, so the API never reads them
+    staged = path.with_name(path.name + ".new")
+    kept = path.with_name(path.name + ".old")
+    staged.unlink(missing_ok=True)
+    kept.unlink(missing_ok=True)
+    # A month archived before comes back when hands are imported into it
+    # later; the new file then holds the earlier file's hands as well
+    previous = ArchiveFile(path) if path.exists() else None
+    installed = False
+    try:
+        async with db.get_connection() as conn:
+            async with conn.transaction():
+                async with conn.cursor() as cur:
+                    await cur.execute(f"LOCK TABLE {partition.name} IN EXCLUSIVE MODE")
+                    await cur.execute(f"SELECT count(*) FROM {partition.name}")
+                    expected = (await cur.fetchone())[0]
+
+                with ArchiveWriter(staged, merge=previous) as writer:
+                    async with conn.cursor(name=f"archive_{uuid.uuid4().hex}") as rows:
+                        rows.itersize = 2000
+                        await rows.execute(
+                            f"SELECT id, created_at, hand_bin FROM {partition.name} "
+                            "ORDER BY created_at, id"
+                        )
+                        async for hand_id, created_at, hand_bin in rows:
+                            if hand_bin is None:
+                                async with conn.cursor() as legacy:
+                                    await legacy.execute(
+                                        f"SELECT {JSON_COLUMNS} FROM {partition.name} "
+                                        "WHERE id = %s",
+                                        (hand_id,),
+                                    )
+                                    hand = repo._deserialize_hand(await legacy.fetchone())
+                                hand_bin = encode_hand(hand)
+                            writer.add(hand_id, created_at, bytes(hand_bin))
+
+                archived = ArchiveFile(staged)
+                count = archived.count - (previous.count if previous else 0)
+                archived.close()
+                if count != expected:
+                    raise RuntimeError(
+                        f"{partition.name}: archived {count} of {expected} hands"
+                    )
+                if previous is not None:
+                    os.link(path, kept)
+                os.replace(staged, path)
+                installed = True
+                async with conn.cursor() as cur:
+                    # hand_keys would otherwise grow forever; a retry of an
+                    # archived hand is stored again as a new hand
+                    await cur.execute(
+                        f"DELETE FROM hand_keys WHERE hand_id IN (SELECT id FROM {partition.name})"
+                    )
+                    await cur.execute(f"DROP TABLE {partition.name}")
+    except BaseException:
+        # The partition is still there, so its hands must not be read from the
+        # file as well. Only what this run wrote is removed; an earlier archive
+        # is put back as it was
+        staged.unlink(missing_ok=True)
+        if installed:
+            if previous is not None:
+                os.replace(kept, path)
+            else:
+                path.unlink(missing_ok=True)
+        raise
+    finally:
+        if previous is not None:
+            previous.close()
+        kept.unlink(missing_ok=True)
+    return count
+
+
+async def archive(keep_months: int, directory: Path, dry_run: bool) -> List[str]:
+    db = DatabaseConnection()
+    await db.open(wait=True)
+    try:
+        repo = HandsRepository(db, archive=HandArchive(directory))
+        partitions = HandPartitions(db)
+        await partitions.ensure()
+        cutoff = month_start(datetime.now(timezone.utc), -keep_months)
+        cold = [p for p in await partitions.list() if p.end <= cutoff]
+        directory.mkdir(parents=True, exist_ok=True)
+        done = []
+        for partition in cold:
+            if dry_run:
+                print(f"Would archive {partition.name}")
+                continue
+            count = await archive_partition(db, repo, partition, directory)
+            print(f"Archived {partition.name}: {count} hands")
+            done.append(partition.name)
+        return done
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive cold hand partitions")
+    parser.add_argument(
+        "--keep-months", type=int, default=6,
+        help="whole months kept in Postgres before the current one",
+    )
+    parser.add_argument("--dir", type=Path, default=HandArchive().directory)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    done = asyncio.run(archive(args.keep_months, args.dir, args.dry_run))
+    print(f"Archived {len(done)} partitions")
+
+
+if __name__ == "__main__":
+    main()
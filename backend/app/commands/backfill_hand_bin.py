@@ -0,0 +1,78 @@
+"""Fill hands.hand_bin for rows stored before the binary codec existed.
+
+    python -m app.commands.backfill_hand_bin [--batch-size 1000]
+
+Rows that cannot be encoded (legacy roles, cards or action types) are logged
+and keep a NULL ``hand_bin``; reads fall back to the JSON columns for them.
+"""
+import argparse
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from ..domain.hand_codec import encode_hand
+from ..repository.connection import DatabaseConnection
+from ..repository.hands_repo import JSON_COLUMNS, HandsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def encode_rows(repo: HandsRepository, rows: list) -> Tuple[List[tuple], int]:
+    """(hand_bin, id) updates for the rows that encode, and how many did not"""
+    updates = []
+    failed = 0
+    for row in rows:
+        try:
+            updates.append((encode_hand(repo._deserialize_hand(row)), row[0]))
+        except Exception:
+            logger.exception("Cannot encode hand %s; leaving hand_bin NULL", row[0])
+            failed += 1
+    return updates, failed
+
+
+async def backfill(batch_size: int) -> int:
+    db = DatabaseConnection()
+    await db.open(wait=True)
+    repo = HandsRepository(db)
+    total = 0
+    skipped = 0
+    # Keyset by id, so rows left NULL are not selected again
+    last_id: Optional[str] = None
+    try:
+        while True:
+            async with db.get_connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        f"SELECT {JSON_COLUMNS} FROM hands WHERE hand_bin IS NULL "
+                        "AND (%s::uuid IS NULL OR id > %s::uuid) "
+                        "ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED",
+                        (last_id, last_id, batch_size),
+                    )
+                    rows = await cur.fetchall()
+                    if not rows:
+                        if skipped:
+                            logger.warning("%d hands could not be encoded", skipped)
+                        return total
+                    last_id = rows[-1][0]
+                    updates, failed = encode_rows(repo, rows)
+                    await cur.executemany(
+                        "UPDATE hands SET hand_bin = %s WHERE id = %s", updates
+                    )
+            total += len(updates)
+            skipped += failed
+            print(f"Backfilled {total} hands")
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill hands.hand_bin")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    total = asyncio.run(backfill(args.batch_size))
+    print(f"Backfill complete: {total} hands")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Build the memory-mapped heads-up preflop equity table.
+
+    python -m app.commands.build_preflop_equity [--samples 20000 | --exact]
+        [--workers N] [--output data/preflop_equity.bin]
+
+Matchups that differ only by a relabelling of suits share an equity, so only
+one representative per class (about 47k of the 878k pairs) is evaluated, by
+Monte Carlo over ``--samples`` runouts or, with ``--exact``, over every board.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from ..services.equity import all_runouts, rank_runouts, sample_runouts, warm_tables
+from ..services.preflop_equity import COMBOS, DEFAULT_PATH, HEADER, MAGIC, SCALE, VERSION
+
+_HANDS = 52 * 52
+
+
+def _combos() -> Tuple[np.ndarray, np.ndarray]:
+    """Low and high card of every starting hand, in combo_index order"""
+    high = np.repeat(np.arange(52), np.arange(52))
+    low = np.concatenate([np.arange(h) for h in range(52)])
+    return low, high
+
+
+def canonical_classes() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per combo pair (triangular order): class key, swap flag and validity.
+
+    The key is the smallest (hand, hand) encoding over all 24 suit
+    relabellings; the flag says the pair's lower-indexed hand maps to the
+    key's second hand.
+    """
+    low, high = _combos()
+    first, second = np.triu_indices(COMBOS, 1)
+    cards = np.stack([low[first], high[first], low[second], high[second]], axis=1)
+    valid = (
+        (cards[:, 0] != cards[:, 2]) & (cards[:, 0] != cards[:, 3])
+        & (cards[:, 1] != cards[:, 2]) & (cards[:, 1] != cards[:, 3])
+    )
+
+    ranks, suits = cards >> 2, cards & 3
+    best = np.full(len(cards), np.iinfo(np.int64).max, dtype=np.int64)
+    swapped = np.zeros(len(cards), dtype=bool)
+    for perm in permutations(range(4)):
+        mapped = ranks * 4 + np.array(perm)[suits]
+        hand_a = np.maximum(mapped[:, 0], mapped[:, 1]) * 52 + np.minimum(mapped[:, 0], mapped[:, 1])
+        hand_b = np.maximum(mapped[:, 2], mapped[:, 3]) * 52 + np.minimum(mapped[:, 2], mapped[:, 3])
+        key = np.minimum(hand_a, hand_b) * _HANDS + np.maximum(hand_a, hand_b)
+        better = key < best
+        best[better] = key[better]
+        swapped[better] = hand_a[better] > hand_b[better]
+    return best, swapped, valid
+
+
+def _hand_cards(hand: int) -> List[int]:
+    return [hand // 52, hand % 52]
+
+
+def class_equities(keys: np.ndarray, samples: int, seed: int) -> np.ndarray:
+    """Equity of each key's first hand; ``samples`` of 0 enumerates every board"""
+    warm_tables()
+    equities = np.empty(len(keys))
+    empty = np.empty(0, dtype=np.int64)
+    for i, key in enumerate(keys.tolist()):
+        first, second = divmod(key, _HANDS)
+        holdings = np.array([_hand_cards(first), _hand_cards(second)], dtype=np.int64)
+        deck = np.setdiff1d(np.arange(52), holdings.ravel())
+        if samples:
+            boards = sample_runouts(empty, deck, samples, seed + key)
+        else:
+            boards = all_runouts(empty, deck)
+        ranks = rank_runouts(holdings, boards)
+        wins = (ranks[:, 0] > ranks[:, 1]).sum()
+        ties = (ranks[:, 0] == ranks[:, 1]).sum()
+        equities[i] = (wins + ties / 2) / len(boards)
+    return equities
+
+
+def build(output: Path, samples: int, workers: int, seed: int = 1) -> int:
+    keys, swapped, valid = canonical_classes()
+    classes, inverse = np.unique(keys[valid], return_inverse=True)
+
+    chunks = np.array_split(classes, max(1, len(classes) // 500))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            parts = list(pool.map(
+                class_equities, chunks, [samples] * len(chunks), [seed] * len(chunks)
+            ))
+    else:
+        parts = [class_equities(chunk, samples, seed) for chunk in chunks]
+    equities = np.concatenate(parts)[inverse]
+
+    equities = np.where(swapped[valid], 1 - equities, equities)
+    values = np.zeros(len(keys), dtype="<u2")
+    values[valid] = np.rint(equities * SCALE).astype("<u2")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, samples))
+        f.write(values.tobytes())
+    return len(classes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the preflop equity table")
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--exact", action="store_true", help="enumerate every board (slow)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", type=Path, default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    classes = build(args.output, 0 if args.exact else args.samples, args.workers)
+    print(
+        f"Wrote {args.output}: {classes} matchup classes "
+        f"in {time.perf_counter() - started:.0f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Recompute player_stats from every stored hand.
+
+    python -m app.commands.rebuild_player_stats [--batch-size 1000]
+
+Use after changing how a counter is derived, or to repair drift.
+"""
+import argparse
+import asyncio
+
+from ..repository.connection import DatabaseConnection
+from ..repository.hands_repo import HandsRepository
+
+
+async def rebuild(batch_size: int) -> int:
+    db = DatabaseConnection()
+    await db.open(wait=True)
+    try:
+        repo = HandsRepository(db)
+        return await repo.player_stats.rebuild(repo, batch_size=batch_size)
+    finally:
+        await db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild player_stats")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    total = asyncio.run(rebuild(args.batch_size))
+    print(f"Rebuilt player stats from {total} hands")
+
+
+if __name__ == "__main__":
+    main()
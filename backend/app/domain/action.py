@@ -1,6 +1,14 @@
+"""Incremental no-limit betting state machine.
+
+``GameState`` replays a hand one action at a time. Every action is checked
+and applied in constant time (a six-seat table bounds every loop), so a whole
+hand is validated in a single pass over its action list. Amounts are the
+chips an action adds to the pot, matching ``Action.amount``.
+"""
 from enum import Enum
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .hand import Action, PlayerSnapshot
 
 
 class ActionType(Enum):
@@ -19,27 +27,236 @@ class Street(Enum):
     RIVER = "river"
 
 
-@dataclass
+STREETS = tuple(street.value for street in Street)
+ACTION_TYPES = frozenset(action_type.value for action_type in ActionType)
+
+# Seat order starting left of the button; odd chips go to the earliest winner
+POSITION_ORDER = ("SB", "BB", "UTG", "MP", "CO", "BTN")
+
+
+class ActionError(ValueError):
+    """An illegal action, with its position in the hand's action list"""
+
+    def __init__(self, index: int, reason: str):
+        super().__init__(f"Action {index}: {reason}")
+        self.index = index
+        self.reason = reason
+
+
 class GameState:
-    seats: List[Dict]
-    current_street: Street
-    pot: int
-    last_raise_to: int
-    current_player: int
-    board: Optional[str] = None
-    hole_cards: Optional[Dict[int, str]] = None
+    """Betting state of one hand: stacks, commitments, turn and street"""
 
+    __slots__ = (
+        "bb_size", "order", "stacks", "committed", "street_bet", "folded",
+        "all_in", "pending", "street_index", "last_raise_to", "min_raise",
+        "current_player", "closed", "_position",
+    )
 
-def validate_action(action_type: ActionType, amount: int, game_state: GameState) -> bool:
-    """Validate if an action is legal given current game state"""
-    # Basic validation logic - will be expanded
-    if action_type == ActionType.FOLD:
-        return True
-    elif action_type == ActionType.CHECK:
-        return game_state.pot == 0 or amount == 0
-    elif action_type in [ActionType.CALL, ActionType.BET, ActionType.RAISE]:
-        return amount > 0
-    elif action_type == ActionType.ALL_IN:
-        return True
-    return False
+    def __init__(self, seats: Sequence[PlayerSnapshot], bb_size: int):
+        seat_by_role = {seat.role: seat.seat for seat in seats}
+        self.bb_size = bb_size
+        self.order: List[int] = [seat_by_role[role] for role in POSITION_ORDER]
+        self._position = {seat: i for i, seat in enumerate(self.order)}
+        self.stacks: Dict[int, int] = {seat.seat: seat.starting_stack for seat in seats}
+        self.committed: Dict[int, int] = dict.fromkeys(self.stacks, 0)
+        self.street_bet: Dict[int, int] = dict.fromkeys(self.stacks, 0)
+        self.folded: set = set()
+        self.all_in: set = set()
+        self.street_index = 0
+        self.closed = False
+
+        self._put(self.order[0], min(bb_size // 2, self.stacks[self.order[0]]))
+        self._put(self.order[1], min(bb_size, self.stacks[self.order[1]]))
+        self.last_raise_to = bb_size
+        self.min_raise = bb_size
+        self.pending = {seat for seat in self.order if seat not in self.all_in}
+        self.current_player: Optional[int] = self._next_to_act(2)
+        if self.current_player is None:
+            self._close_street()
+
+    @property
+    def street(self) -> str:
+        return STREETS[min(self.street_index, 3)]
+
+    @property
+    def pot(self) -> int:
+        return sum(self.committed.values())
+
+    @property
+    def live(self) -> int:
+        return len(self.order) - len(self.folded)
+
+    def illegal(self, action: Action) -> Optional[str]:
+        """Why ``action`` cannot be played next, or None when it is legal"""
+        # Properties are inlined on this path; it runs for every submitted action
+        if len(self.order) - len(self.folded) == 1:
+            return "Hand is already over"
+        if action.type not in ACTION_TYPES:
+            return f"Invalid action type: {action.type}"
+        if action.street not in STREETS:
+            return f"Invalid street: {action.street}"
+        if action.seat not in self.stacks:
+            return f"Invalid seat: {action.seat}"
+        if action.amount < 0:
+            return f"Negative action amount: {action.amount}"
+        if self.closed:
+            return "Betting is complete"
+        if action.street != STREETS[self.street_index]:
+            return f"Expected a {self.street} action"
+        if action.seat != self.current_player:
+            return f"Seat {action.seat} acted out of turn; seat {self.current_player} is next"
 
+        seat = action.seat
+        amount = action.amount
+        stack = self.stacks[seat]
+        to_call = self.last_raise_to - self.street_bet[seat]
+        if action.type in ("f", "x"):
+            if amount:
+                return f"A {'fold' if action.type == 'f' else 'check'} cannot add chips"
+            if action.type == "x" and to_call:
+                return f"Cannot check facing a bet of {to_call}"
+            return None
+        if amount > stack:
+            return f"Seat {seat} adds {amount} with {stack} behind"
+        if action.type == "allin":
+            if amount != stack:
+                return f"All-in must add the remaining stack of {stack}"
+            return None
+        if action.type == "c":
+            if not to_call:
+                return "Nothing to call"
+            if amount != min(to_call, stack):
+                return f"Call must add {min(to_call, stack)}"
+            return None
+        if action.type == "b":
+            if self.last_raise_to:
+                return "Cannot bet facing a bet; raise instead"
+            if amount < self.bb_size and amount != stack:
+                return f"Bet of {amount} is below the minimum of {self.bb_size}"
+            return None
+        # Raise
+        if not self.last_raise_to:
+            return "Nothing to raise; bet instead"
+        if amount <= to_call:
+            return f"Raise must add more than the {to_call} to call"
+        if amount - to_call < self.min_raise and amount != stack:
+            return (
+                f"Raise to {self.street_bet[seat] + amount} is below the minimum "
+                f"of {self.last_raise_to + self.min_raise}"
+            )
+        return None
+
+    def apply(self, action: Action, index: int = 0) -> None:
+        """Validate and play one action, raising ActionError when illegal"""
+        reason = self.illegal(action)
+        if reason is not None:
+            raise ActionError(index, reason)
+
+        seat = action.seat
+        pending = self.pending
+        if action.type == "f":
+            self.folded.add(seat)
+            pending.discard(seat)
+            if len(self.order) - len(self.folded) == 1:
+                self.current_player = None
+                return
+        elif action.amount:
+            self._put(seat, action.amount)
+            bet = self.street_bet[seat]
+            if bet > self.last_raise_to:
+                if bet - self.last_raise_to >= self.min_raise:
+                    # A full raise reopens the betting for everyone
+                    self.min_raise = bet - self.last_raise_to
+                    pending.clear()
+                    pending.update(self._able())
+                else:
+                    # An all-in short of a full raise only owes the others a call
+                    pending.update(s for s in self._able() if self.street_bet[s] < bet)
+                self.last_raise_to = bet
+            pending.discard(seat)
+        else:
+            pending.discard(seat)
+
+        self.current_player = self._next_to_act(self._position[seat] + 1)
+        if self.current_player is None:
+            self._close_street()
+
+    def copy(self) -> "GameState":
+        """Independent copy, used to checkpoint a replay"""
+        clone = GameState.__new__(GameState)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.stacks = dict(self.stacks)
+        clone.committed = dict(self.committed)
+        clone.street_bet = dict(self.street_bet)
+        clone.folded = set(self.folded)
+        clone.all_in = set(self.all_in)
+        clone.pending = set(self.pending)
+        return clone
+
+    def finish(self, index: int) -> None:
+        """Check that the action list ended with the betting complete"""
+        if self.live > 1 and not self.closed:
+            raise ActionError(
+                index,
+                f"Hand ends with seat {self.current_player} to act on the {self.street}",
+            )
+
+    def _put(self, seat: int, amount: int) -> None:
+        self.stacks[seat] -= amount
+        self.committed[seat] += amount
+        self.street_bet[seat] += amount
+        if not self.stacks[seat]:
+            self.all_in.add(seat)
+
+    def _able(self) -> List[int]:
+        """Seats that can still make betting decisions"""
+        return [
+            seat for seat in self.order
+            if seat not in self.folded and seat not in self.all_in
+        ]
+
+    def _next_to_act(self, start: int) -> Optional[int]:
+        pending = self.pending
+        order = self.order
+        for seat in order[start:]:
+            if seat in pending:
+                return seat
+        for seat in order[:start]:
+            if seat in pending:
+                return seat
+        return None
+
+    def _close_street(self) -> None:
+        able = self._able()
+        # With fewer than two players holding chips nobody is left to bet against
+        if self.street_index >= 3 or len(able) < 2:
+            self.closed = True
+            self.current_player = None
+            return
+        self.street_index += 1
+        for seat in self.street_bet:
+            self.street_bet[seat] = 0
+        self.last_raise_to = 0
+        self.min_raise = self.bb_size
+        self.pending.update(able)
+        self.current_player = able[0]
+
+
+def replay(
+    seats: Sequence[PlayerSnapshot], bb_size: int, actions: Sequence[Action]
+) -> GameState:
+    """Play a full action list, raising ActionError at the first illegal action"""
+    state = GameState(seats, bb_size)
+    for index, action in enumerate(actions):
+        state.apply(action, index)
+    state.finish(len(actions))
+    return state
+
+
+def validate_action(action_type: ActionType, amount: int, game_state: GameState) -> bool:
+    """Whether the player to act may take this action now"""
+    if game_state.current_player is None:
+        return False
+    action = Action(game_state.current_player, game_state.street, action_type.value, amount)
+    return game_state.illegal(action) is None
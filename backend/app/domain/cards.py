@@ -0,0 +1,92 @@
+"""Cards as small integers and 52-bit masks.
+
+A card is ``rank * 4 + suit`` (0-51), the encoding the evaluator, equity
+engine and binary codec all use. A set of cards is an int with bit ``c`` set
+for card ``c``, so duplicate checks and deck-minus-known-cards are a couple of
+bit operations. Text such as "As Kd" is parsed once at the edge and formatted
+back only for display and storage.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RANKS = "23456789TJQKA"
+SUITS = "shdc"
+
+CARD_INDEX: Dict[str, int] = {
+    rank + suit: r * 4 + s
+    for r, rank in enumerate(RANKS)
+    for s, suit in enumerate(SUITS)
+}
+CARD_NAMES: Tuple[str, ...] = tuple(
+    rank + suit for rank in RANKS for suit in SUITS
+)
+
+FULL_DECK = (1 << 52) - 1
+
+# Card numbers of the set bits of every byte, for iterating masks 8 bits at a time
+_BYTE_CARDS = tuple(
+    tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)
+)
+
+
+@dataclass(slots=True)
+class DealtCards:
+    """Every card dealt in a hand, parsed once"""
+
+    board: List[int]  # flop, turn, river in deal order
+    holdings: Dict[int, Tuple[int, int]]  # seat -> hole cards
+    mask: int  # board and hole cards together
+
+
+def parse_card(token: str) -> int:
+    try:
+        return CARD_INDEX[token]
+    except KeyError:
+        raise ValueError(f"Invalid card: {token}") from None
+
+
+def parse_cards(cards: Optional[str]) -> List[int]:
+    """Parse space-separated cards such as "As Kd" into card integers"""
+    if not cards:
+        return []
+    try:
+        return [CARD_INDEX[token] for token in cards.split()]
+    except KeyError as e:
+        raise ValueError(f"Invalid card: {e.args[0]}") from None
+
+
+def format_cards(cards: Iterable[int]) -> str:
+    return " ".join([CARD_NAMES[c] for c in cards])
+
+
+def card_mask(cards: Iterable[int]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def add_cards(mask: int, cards: Iterable[int]) -> int:
+    """``mask`` plus ``cards``, raising ValueError on a card already present"""
+    for card in cards:
+        bit = 1 << card
+        if mask & bit:
+            raise ValueError(f"Duplicate card: {CARD_NAMES[card]}")
+        mask |= bit
+    return mask
+
+
+def mask_cards(mask: int) -> List[int]:
+    """Cards in ``mask``, lowest first"""
+    cards: List[int] = []
+    base = 0
+    while mask:
+        cards.extend([base + bit for bit in _BYTE_CARDS[mask & 0xFF]])
+        mask >>= 8
+        base += 8
+    return cards
+
+
+def remaining(known: int) -> List[int]:
+    """The deck without the cards in ``known``, lowest first"""
+    return mask_cards(FULL_DECK & ~known)
@@ -1,9 +1,16 @@
 from dataclasses import dataclass
 from typing import Dict, List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
+from .cards import CARD_INDEX, DealtCards, add_cards, parse_cards
 
-@dataclass
+
+def utc_now() -> datetime:
+    """The current time as naive UTC, the form every created_at is stored in"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(slots=True)
 class PlayerSnapshot:
     seat: int
     name: str
@@ -11,7 +18,7 @@ class PlayerSnapshot:
     role: str  # BTN, SB, BB, UTG, MP, CO
 
 
-@dataclass
+@dataclass(slots=True)
 class Action:
     seat: int
     street: str  # preflop, flop, turn, river
@@ -19,14 +26,31 @@ class Action:
     amount: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Board:
     flop: Optional[str] = None
     turn: Optional[str] = None
     river: Optional[str] = None
 
+    def cards(self) -> List[int]:
+        """Board cards in deal order; streets must be complete and dealt in order"""
+        cards = parse_cards(self.flop)
+        if len(cards) not in (0, 3):
+            raise ValueError("Flop must have 3 cards")
+        for street, text, before in (("Turn", self.turn, 3), ("River", self.river, 4)):
+            if not text:
+                continue
+            card = CARD_INDEX.get(text)
+            if card is None:
+                parse_cards(text)  # names the bad card, if there is one
+                raise ValueError(f"{street} must have 1 card")
+            if len(cards) != before:
+                raise ValueError(f"{street} dealt before the previous street")
+            cards.append(card)
+        return cards
 
-@dataclass
+
+@dataclass(slots=True)
 class Hand:
     id: str
     created_at: datetime
@@ -37,4 +61,29 @@ class Hand:
     actions: List[Action]
     short_line: str
     result: Dict[int, int]  # seat -> winnings
+    # seat -> net result with all-in pots paid at equity; None while sampling
+    ev_result: Optional[Dict[int, float]] = None
+
+    def dealt(self) -> DealtCards:
+        """Parse hole and board cards, rejecting bad cards and duplicates"""
+        mask = 0
+        holdings = {}
+        for seat, text in self.hole_cards.items():
+            cards = parse_cards(text)
+            if not cards:
+                continue
+            if len(cards) != 2:
+                raise ValueError(f"Seat {seat} must have two hole cards")
+            mask = add_cards(mask, cards)
+            holdings[int(seat)] = (cards[0], cards[1])
+        board = self.board.cards()
+        return DealtCards(board, holdings, add_cards(mask, board))
 
+
+@dataclass(slots=True)
+class HandSummary:
+    id: str
+    created_at: datetime
+    bb_size: int
+    short_line: str
+    result: Dict[int, int]
@@ -0,0 +1,239 @@
+"""Versioned compact binary encoding for ``Hand``.
+
+Layout (version 1, little endian):
+
+    u8        version
+    16 bytes  id (UUID)
+    i64       created_at, microseconds since the Unix epoch (UTC)
+    varint    bb_size
+    u8        seat count, then per seat: u8 seat, u8 role, u32 starting stack,
+              2 hole-card bytes (0xFF when unknown)
+    5 bytes   board cards (0xFF when not dealt)
+    varint    action count, then per action one byte packing
+              seat (bits 0-2), street (bits 3-4) and type (bits 5-7)
+              followed by a varint amount
+    per seat  zigzag varint result, in seat-table order
+    strings   varint length + UTF-8 for each seat name, then the short line
+    optional  all-in EV, absent while it is being sampled: u8 0 when it equals
+              the result, else u8 1 and per seat a zigzag varint in hundredths
+"""
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+from .cards import CARD_NAMES
+from .hand import Action, Board, Hand, PlayerSnapshot
+
+VERSION = 1
+NO_CARD = 0xFF
+
+ROLES = ("BTN", "SB", "BB", "UTG", "MP", "CO")
+STREETS = ("preflop", "flop", "turn", "river")
+ACTION_TYPES = ("f", "x", "c", "b", "r", "allin")
+
+_ROLE_CODES = {role: i for i, role in enumerate(ROLES)}
+_STREET_CODES = {street: i for i, street in enumerate(STREETS)}
+_TYPE_CODES = {action_type: i for i, action_type in enumerate(ACTION_TYPES)}
+
+# Every possible packed action byte, pre-split into (seat, street, type)
+_ACTION_FIELDS = tuple(
+    (packed & 0x07, STREETS[packed >> 3 & 0x03], ACTION_TYPES[packed >> 5])
+    if packed >> 5 < len(ACTION_TYPES) else None
+    for packed in range(256)
+)
+
+_NO_HOLDING = (NO_CARD, NO_CARD)
+_NO_BOARD = bytes([NO_CARD] * 5)
+
+_HEADER = struct.Struct("<B16sq")
+_SEAT = struct.Struct("<BBIBB")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+CONTENT_TYPE = "application/octet-stream"
+
+MAX_STACK = 2**32 - 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_text(out: bytearray, text: str) -> None:
+    raw = text.encode()
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def check_encodable(hand: Hand) -> None:
+    """Raise ValueError when a field of ``hand`` does not fit the format"""
+    if type(hand.bb_size) is not int or hand.bb_size < 0:
+        raise ValueError(f"Cannot encode bb_size: {hand.bb_size}")
+    if len(hand.seats) > 0xFF:
+        raise ValueError(f"Cannot encode {len(hand.seats)} seats")
+    for player in hand.seats:
+        if not 0 <= player.seat <= 0xFF:
+            raise ValueError(f"Cannot encode seat: {player.seat}")
+        if not 0 <= player.starting_stack <= MAX_STACK:
+            raise ValueError(
+                f"Cannot encode starting stack of seat {player.seat}: {player.starting_stack}"
+            )
+        if player.role not in _ROLE_CODES:
+            raise ValueError(f"Cannot encode role: {player.role}")
+
+
+def encode_hand(hand: Hand) -> bytes:
+    """Encode a hand in the compact binary format"""
+    check_encodable(hand)
+    created_at = hand.created_at
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    micros = (created_at - _EPOCH) // _MICROSECOND
+
+    out = bytearray(_HEADER.pack(VERSION, uuid.UUID(str(hand.id)).bytes, micros))
+    _write_varint(out, hand.bb_size)
+
+    dealt = hand.dealt()
+    holdings = dealt.holdings
+    out.append(len(hand.seats))
+    for player in hand.seats:
+        cards = holdings.get(player.seat, _NO_HOLDING)
+        out += _SEAT.pack(
+            player.seat, _ROLE_CODES[player.role], player.starting_stack, *cards
+        )
+
+    out += bytes(dealt.board)
+    out += _NO_BOARD[len(dealt.board):]
+
+    _write_varint(out, len(hand.actions))
+    for action in hand.actions:
+        if not 0 <= action.seat < 8 or action.amount < 0:
+            raise ValueError(f"Cannot encode action: {action}")
+        out.append(
+            action.seat
+            | _STREET_CODES[action.street] << 3
+            | _TYPE_CODES[action.type] << 5
+        )
+        _write_varint(out, action.amount)
+
+    result = {int(seat): amount for seat, amount in hand.result.items()}
+    for player in hand.seats:
+        amount = result.get(player.seat, 0)
+        _write_varint(out, (amount << 1) ^ (amount >> 63))
+
+    for player in hand.seats:
+        _write_text(out, player.name)
+    _write_text(out, hand.short_line)
+
+    if hand.ev_result is not None:
+        ev_result = {int(seat): value for seat, value in hand.ev_result.items()}
+        if ev_result == result:
+            out.append(0)
+        else:
+            out.append(1)
+            for player in hand.seats:
+                cents = round(ev_result.get(player.seat, 0) * 100)
+                _write_varint(out, (cents << 1) ^ (cents >> 63))
+    return bytes(out)
+
+
+def decode_hand(data: bytes) -> Hand:
+    """Decode a hand produced by encode_hand"""
+    version, id_bytes, micros = _HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"Unsupported hand encoding version: {version}")
+    bb_size, pos = _read_varint(data, _HEADER.size)
+
+    count = data[pos]
+    pos += 1
+    end = pos + count * _SEAT.size
+    table = list(_SEAT.iter_unpack(data[pos:end]))
+    pos = end
+    hole_cards = {
+        seat: f"{CARD_NAMES[first]} {CARD_NAMES[second]}"
+        for seat, _, _, first, second in table
+        if first != NO_CARD
+    }
+
+    cards = data[pos:pos + 5]
+    pos += 5
+    board = Board(
+        " ".join([CARD_NAMES[c] for c in cards[:3]]) if cards[0] != NO_CARD else None,
+        CARD_NAMES[cards[3]] if cards[3] != NO_CARD else None,
+        CARD_NAMES[cards[4]] if cards[4] != NO_CARD else None,
+    )
+
+    count, pos = _read_varint(data, pos)
+    actions = []
+    fields = _ACTION_FIELDS
+    for _ in range(count):
+        seat, street, action_type = fields[data[pos]]
+        amount = data[pos + 1]
+        if amount < 0x80:
+            pos += 2
+        else:
+            amount, pos = _read_varint(data, pos + 1)
+        actions.append(Action(seat, street, action_type, amount))
+
+    result = {}
+    for seat, _, _, _, _ in table:
+        zigzag = data[pos]
+        if zigzag < 0x80:
+            pos += 1
+        else:
+            zigzag, pos = _read_varint(data, pos)
+        result[seat] = (zigzag >> 1) ^ -(zigzag & 1)
+
+    seats = []
+    for seat, role, stack, _, _ in table:
+        length = data[pos]
+        pos += 1
+        if length >= 0x80:
+            length, pos = _read_varint(data, pos - 1)
+        seats.append(PlayerSnapshot(seat, data[pos:pos + length].decode(), stack, ROLES[role]))
+        pos += length
+    length, pos = _read_varint(data, pos)
+    short_line = data[pos:pos + length].decode()
+    pos += length
+
+    ev_result = None
+    if pos < len(data):
+        if data[pos] == 0:
+            ev_result = dict(result)
+        else:
+            pos += 1
+            ev_result = {}
+            for seat, _, _, _, _ in table:
+                zigzag, pos = _read_varint(data, pos)
+                ev_result[seat] = ((zigzag >> 1) ^ -(zigzag & 1)) / 100
+
+    # Same text as str(uuid.UUID(bytes=...)) without building a UUID
+    hex_id = id_bytes.hex()
+    return Hand(
+        f"{hex_id[:8]}-{hex_id[8:12]}-{hex_id[12:16]}-{hex_id[16:20]}-{hex_id[20:]}",
+        _EPOCH + timedelta(microseconds=micros),
+        bb_size,
+        seats,
+        hole_cards,
+        board,
+        actions,
+        short_line,
+        result,
+        ev_result,
+    )
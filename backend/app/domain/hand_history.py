@@ -0,0 +1,366 @@
+"""Streaming parser for online-room text hand histories.
+
+Reads the PokerStars-style format most rooms and trackers export: a header
+line per hand (``PokerStars Hand #...: Hold'em No Limit ($0.25/$0.50 USD) -
+2024/01/05 20:24:11 ET``), seat lines, blinds, ``*** FLOP ***`` style street
+markers, one action per line and a ``*** SUMMARY ***``. ``HandHistoryReader``
+takes the file in arbitrary byte chunks, plain or gzip (including concatenated
+gzip members), and yields one ``ParsedHand`` per hand as soon as the next
+header arrives, so memory stays bounded by a single hand whatever the file size.
+
+Room seats are renumbered 0-5 in table order and given roles clockwise from the
+button. Amounts become integer chips: cents when the stakes carry a currency
+symbol or decimals, chips as written for tournaments. Hole cards come from ``Dealt to``,
+showdown and summary lines; hands the domain cannot represent (antes, not
+six-handed, straddles, run it twice) come back with an error instead.
+"""
+import codecs
+import re
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .action import STREETS
+from .cards import CARD_INDEX
+from .hand import Action, Board, Hand, PlayerSnapshot, utc_now
+
+# Role by seat offset clockwise from the button
+ROLES_FROM_BUTTON = ("BTN", "SB", "BB", "UTG", "MP", "CO")
+MAX_LINE_LENGTH = 64 * 1024
+MAX_HAND_LINES = 1000
+
+HEADER = re.compile(r"^(?P<reference>[\w.' -]+? (?:Hand|Game) #\d+)[:\s]")
+STAKES = re.compile(r"\((?P<sb>[$€£]?[\d.,]+)/(?P<bb>[$€£]?[\d.,]+)(?: [A-Z]{3})?\)")
+PLAYED_AT = re.compile(
+    r"(\d{4})/(\d{1,2})/(\d{1,2}) (\d{1,2}):(\d{2}):(\d{2})(?: (?P<zone>[A-Z]{2,4}))?"
+)
+BUTTON = re.compile(r"Seat #(\d+) is the button")
+SEAT = re.compile(r"^Seat (?P<seat>\d+): (?P<name>.+) \((?P<stack>[$€£]?[\d.,]+) in chips")
+STREET_MARKER = re.compile(r"^\*\*\* (?P<name>[A-Z ]+) \*\*\*(?P<rest>.*)$")
+CARDS = re.compile(r"\[([^\]]*)\]")
+AMOUNT = r"[$€£]?[\d.,]+"
+ACTION = re.compile(
+    rf"^(?P<verb>folds|checks|calls|bets|raises)"
+    rf"(?: (?P<amount>{AMOUNT}))?(?: to (?P<to>{AMOUNT}))?(?P<all_in> and is all-in)?"
+)
+POST = re.compile(rf"^posts (?P<blind>small blind|big blind|small & big blinds|the ante|ante)"
+                  rf" (?P<amount>{AMOUNT})")
+SUMMARY_CARDS = re.compile(r"^Seat (?P<seat>\d+): .*?(?:showed|mucked) \[(?P<cards>[^\]]+)\]")
+
+# Header abbreviations rooms use, as IANA zones
+ZONES = {
+    "ET": "America/New_York", "EST": "America/New_York", "EDT": "America/New_York",
+    "CT": "America/Chicago", "MT": "America/Denver", "PT": "America/Los_Angeles",
+    "CET": "Europe/Paris", "CEST": "Europe/Paris", "WET": "Europe/Lisbon",
+    "EET": "Europe/Helsinki", "MSK": "Europe/Moscow", "BRT": "America/Sao_Paulo",
+    "AET": "Australia/Sydney", "UTC": "UTC", "GMT": "UTC",
+}
+STREET_MARKERS = {"FLOP": 1, "TURN": 2, "RIVER": 3}
+BLIND_ROLES = {"small blind": "SB", "big blind": "BB"}
+VERB_TYPES = {"folds": "f", "checks": "x", "calls": "c", "bets": "b", "raises": "r"}
+
+
+@dataclass(slots=True)
+class ParsedHand:
+    """One hand from a history file, or why it could not be read"""
+
+    reference: str  # the room's hand number, e.g. "PokerStars Hand #243717411876"
+    line: int  # line of the header in the file, from 1
+    hand: Optional[Hand] = None
+    error: Optional[str] = None
+
+
+class HandHistoryReader:
+    """Incremental bytes -> ParsedHand, for plain or gzip text"""
+
+    def __init__(self):
+        self._decompressor = None
+        self._gzip: Optional[bool] = None
+        self._head = b""
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self._partial = ""
+        self._line_number = 0
+        self._block: List[str] = []
+        self._block_line = 0
+        self.bytes_read = 0
+        self.lines = 0
+
+    def feed(self, data: bytes) -> List[ParsedHand]:
+        """Hands completed by this chunk"""
+        self.bytes_read += len(data)
+        if self._gzip is None:
+            # Decide plain or gzip from the first two bytes
+            self._head += data
+            if len(self._head) < 2:
+                return []
+            data, self._head = self._head, b""
+            self._gzip = data[:2] == b"\x1f\x8b"
+        if self._gzip:
+            data = self._decompress(data)
+        return self._text(self._decoder.decode(data))
+
+    def close(self) -> List[ParsedHand]:
+        """The last hand, once the whole file has been fed"""
+        text = ""
+        if self._gzip is None:
+            self._gzip = False
+            text = self._decoder.decode(self._head)
+        elif self._gzip and not self._decompressor.eof:
+            raise ValueError("Truncated gzip file")
+        parsed = self._text(text + self._decoder.decode(b"", final=True))
+        if self._partial:
+            parsed.extend(self._line(self._partial))
+            self._partial = ""
+        if self._block:
+            parsed.append(self._parse_block())
+        return parsed
+
+    def _decompress(self, data: bytes) -> bytes:
+        out = []
+        while data:
+            if self._decompressor is None or self._decompressor.eof:
+                # Each gzip member gets a fresh decompressor
+                self._decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            try:
+                out.append(self._decompressor.decompress(data))
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip data: {e}") from e
+            data = self._decompressor.unused_data if self._decompressor.eof else b""
+        return b"".join(out)
+
+    def _text(self, text: str) -> List[ParsedHand]:
+        if not text:
+            return []
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        if len(self._partial) > MAX_LINE_LENGTH:
+            raise ValueError(f"Line {self._line_number + 1} is longer than {MAX_LINE_LENGTH} characters")
+        parsed: List[ParsedHand] = []
+        for line in lines:
+            parsed.extend(self._line(line))
+        return parsed
+
+    def _line(self, line: str) -> List[ParsedHand]:
+        self._line_number += 1
+        self.lines += 1
+        line = line.rstrip("\r")
+        parsed = []
+        if " #" in line and HEADER.match(line):
+            if self._block:
+                parsed.append(self._parse_block())
+            self._block = [line]
+            self._block_line = self._line_number
+        elif self._block and line.strip() and len(self._block) <= MAX_HAND_LINES:
+            # One line past the limit is kept so the parse reports it
+            self._block.append(line)
+        return parsed
+
+    def _parse_block(self) -> ParsedHand:
+        block, self._block = self._block, []
+        reference = HEADER.match(block[0]).group("reference").strip()
+        if len(block) > MAX_HAND_LINES:
+            return ParsedHand(reference, self._block_line, error=f"Hand has more than {MAX_HAND_LINES} lines")
+        try:
+            hand = parse_hand(block)
+        except ValueError as e:
+            return ParsedHand(reference, self._block_line, error=str(e))
+        return ParsedHand(reference, self._block_line, hand=hand)
+
+
+def parse_hand(lines: List[str]) -> Hand:
+    """Build an unsettled Hand from one hand's lines, header first"""
+    header = lines[0]
+    if "Hold'em No Limit" not in header:
+        raise ValueError("Only No Limit Hold'em is supported")
+    stakes = list(STAKES.finditer(header))
+    if not stakes:
+        raise ValueError("Header has no blinds")
+    # Cash games quote stakes in currency; count those in cents
+    scale = 100 if any(c in stakes[-1].group() for c in "$€£.") else 1
+    small_blind = _chips(stakes[-1].group("sb"), scale)
+    bb_size = _chips(stakes[-1].group("bb"), scale)
+    if small_blind * 2 != bb_size:
+        raise ValueError(f"Small blind {small_blind} is not half the big blind {bb_size}")
+
+    button = None
+    room_seats: List[Tuple[int, str, int]] = []
+    for line in lines[1:]:
+        if line.startswith("***"):
+            break
+        match = BUTTON.search(line)
+        if match:
+            button = int(match.group(1))
+            continue
+        match = SEAT.match(line)
+        if match and "is sitting out" not in line and "out of hand" not in line:
+            room_seats.append(
+                (int(match.group("seat")), match.group("name"), _chips(match.group("stack"), scale))
+            )
+    if len(room_seats) != 6:
+        raise ValueError(f"Hand has {len(room_seats)} players; only 6-handed hands are supported")
+    room_seats.sort()
+    numbers = [number for number, _, _ in room_seats]
+    if button not in numbers:
+        raise ValueError("Button is not on an occupied seat")
+
+    # Table order is clockwise, so roles follow seat numbers from the button
+    first = numbers.index(button)
+    seats = [
+        PlayerSnapshot(
+            seat=i,
+            name=name,
+            starting_stack=stack,
+            role=ROLES_FROM_BUTTON[(i - first) % 6],
+        )
+        for i, (_, name, stack) in enumerate(room_seats)
+    ]
+    if len({s.name for s in seats}) != 6:
+        raise ValueError("Two seats share a player name")
+    seat_of_room = {number: i for i, number in enumerate(numbers)}
+    # Longest first, so a name that prefixes another cannot claim its lines
+    names = {s.name: s.seat for s in sorted(seats, key=lambda s: -len(s.name))}
+    role_of = {s.seat: s.role for s in seats}
+
+    street = 0
+    street_bet = [0] * 6
+    actions: List[Action] = []
+    hole_cards: Dict[int, str] = {}
+    board = Board()
+    posted = {}
+    in_summary = False
+    for line in lines[1:]:
+        marker = line.startswith("***") and STREET_MARKER.match(line)
+        if marker:
+            name = marker.group("name")
+            if name in STREET_MARKERS:
+                street = STREET_MARKERS[name]
+                street_bet = [0] * 6
+                cards = CARDS.findall(marker.group("rest"))
+                if not cards:
+                    raise ValueError(f"{name.title()} has no cards")
+                if street == 1:
+                    board.flop = _cards(cards[0], 3)
+                elif street == 2:
+                    board.turn = _cards(cards[-1], 1)
+                else:
+                    board.river = _cards(cards[-1], 1)
+            elif "FIRST" in name or "SECOND" in name:
+                raise ValueError("Run it twice is not supported")
+            elif name == "SUMMARY":
+                in_summary = True
+            continue
+
+        if in_summary:
+            match = SUMMARY_CARDS.match(line)
+            if match and int(match.group("seat")) in seat_of_room:
+                hole_cards[seat_of_room[int(match.group("seat"))]] = _cards(match.group("cards"), 2)
+            continue
+
+        if line.startswith("Dealt to "):
+            seat, rest = _player(line[len("Dealt to "):], names, " ")
+            if seat is not None:
+                cards = CARDS.findall(rest)
+                if cards and cards[-1].strip():
+                    hole_cards[seat] = _cards(cards[-1], 2)
+            continue
+
+        seat, rest = _player(line, names, ": ")
+        if seat is None:
+            continue  # chat, joins, disconnects, uncalled bets, collections
+        if rest.startswith("posts "):
+            match = POST.match(rest)
+            if match is None:
+                raise ValueError(f"Unsupported post: {line}")
+            blind = match.group("blind")
+            if "ante" in blind:
+                raise ValueError("Antes are not supported")
+            if BLIND_ROLES.get(blind) != role_of[seat]:
+                raise ValueError(f"{role_of[seat]} posts a {blind}; dead and extra blinds are not supported")
+            amount = _chips(match.group("amount"), scale)
+            posted[role_of[seat]] = amount
+            street_bet[seat] = amount
+            continue
+        if rest.startswith(("shows ", "mucks", "doesn't show")):
+            cards = CARDS.findall(rest)
+            if rest.startswith("shows ") and cards:
+                hole_cards[seat] = _cards(cards[0], 2)
+            continue
+        match = ACTION.match(rest)
+        if match is None:
+            continue
+        kind = VERB_TYPES[match.group("verb")]
+        if match.group("to"):
+            # "raises 2 to 3": the 3 is the seat's whole bet on this street
+            amount = _chips(match.group("to"), scale) - street_bet[seat]
+        elif match.group("amount"):
+            amount = _chips(match.group("amount"), scale)
+        else:
+            amount = 0
+        if match.group("all_in"):
+            kind = "allin"
+        street_bet[seat] += amount
+        actions.append(Action(seat=seat, street=STREETS[street], type=kind, amount=amount))
+
+    if set(posted) != {"SB", "BB"}:
+        raise ValueError("Both blinds must be posted")
+
+    return Hand(
+        id=str(uuid.uuid4()),
+        created_at=_played_at(header),
+        bb_size=bb_size,
+        seats=seats,
+        hole_cards=hole_cards,
+        board=board,
+        actions=actions,
+        short_line="",  # Will be generated
+        result={},  # Will be calculated
+    )
+
+
+def _player(line: str, seats: Dict[str, int], separator: str) -> Tuple[Optional[int], str]:
+    """The seat whose name starts the line, and the rest of the line"""
+    name, found, rest = line.partition(separator)
+    if not found:
+        return None, line
+    seat = seats.get(name)
+    if seat is not None:
+        return seat, rest
+    # Names may contain the separator themselves
+    for name, seat in seats.items():
+        if line.startswith(name + separator):
+            return seat, line[len(name) + len(separator):]
+    return None, line
+
+
+def _chips(text: str, scale: int) -> int:
+    try:
+        value = Decimal(text.strip("$€£").replace(",", "")) * scale
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {text}") from None
+    if value != value.to_integral_value():
+        raise ValueError(f"Amount {text} is not a whole number of chips")
+    return int(value)
+
+
+def _cards(text: str, count: int) -> str:
+    cards = text.split()
+    if len(cards) != count or any(card not in CARD_INDEX for card in cards):
+        raise ValueError(f"Expected {count} cards, got [{text}]")
+    return " ".join(cards)
+
+
+def _played_at(header: str) -> datetime:
+    """When the header says the hand was played, as naive UTC; now when it does not say"""
+    match = PLAYED_AT.search(header)
+    if match is None:
+        return utc_now()
+    played = datetime(*map(int, match.groups()[:6]))
+    try:
+        zone = ZoneInfo(ZONES.get(match.group("zone") or "UTC", "UTC"))
+    except ZoneInfoNotFoundError:
+        return played
+    return played.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,118 @@
+"""Hand search filters and the derived values they match against.
+
+The derived values (final pot, players at showdown, winning seats, board and
+hole cards, per-player action tokens) are stored as generated columns by
+migrations/0005_hand_search.sql; the functions here compute the same values
+in Python for the in-memory repository. Keep the two definitions in step.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .action import ACTION_TYPES, STREETS
+from .cards import CARD_INDEX, card_mask
+from .hand import Hand
+
+
+@dataclass(slots=True)
+class HandSearch:
+    player: Optional[str] = None
+    action: Optional[Tuple[str, str]] = None  # (street, type), by ``player`` when set
+    board_cards: List[str] = field(default_factory=list)
+    hole_cards: List[str] = field(default_factory=list)
+    min_pot_bb: Optional[float] = None
+    max_pot_bb: Optional[float] = None
+    showdown: Optional[bool] = None
+    winner_seat: Optional[int] = None
+    text: Optional[str] = None  # substring of the short line
+
+
+def parse_action(value: str) -> Tuple[str, str]:
+    """Parse a ``street:type`` pattern such as ``preflop:r``"""
+    street, _, action_type = value.partition(":")
+    if street not in STREETS or action_type not in ACTION_TYPES:
+        raise ValueError(
+            f"Invalid action pattern {value!r}; expected street:type, e.g. preflop:r"
+        )
+    return street, action_type
+
+
+def parse_card(value: str) -> str:
+    if value not in CARD_INDEX:
+        raise ValueError(f"Invalid card: {value}")
+    return value
+
+
+def hand_pot(hand: Hand) -> int:
+    """Chips in the final pot: posted blinds plus every action amount"""
+    blinds = sum(
+        min(hand.bb_size // 2 if seat.role == "SB" else hand.bb_size, seat.starting_stack)
+        for seat in hand.seats
+        if seat.role in ("SB", "BB")
+    )
+    return blinds + sum(action.amount for action in hand.actions)
+
+
+def showdown_players(hand: Hand) -> int:
+    """Players who reached showdown, or 0 when everyone else folded"""
+    live = len(hand.seats) - sum(1 for action in hand.actions if action.type == "f")
+    return live if live > 1 else 0
+
+
+def winner_seats(hand: Hand) -> List[int]:
+    return sorted(int(seat) for seat, amount in hand.result.items() if amount > 0)
+
+
+def board_cards(hand: Hand) -> List[str]:
+    board = hand.board
+    return " ".join(filter(None, (board.flop, board.turn, board.river))).split()
+
+
+def hole_cards(hand: Hand) -> List[str]:
+    return [card for cards in hand.hole_cards.values() for card in cards.split()]
+
+
+def _mask(cards: List[str]) -> int:
+    return card_mask(CARD_INDEX[card] for card in cards)
+
+
+def player_action_tokens(hand: Hand) -> List[str]:
+    """``name:street:type`` for every action, so one lookup finds who did what"""
+    names = {seat.seat: seat.name for seat in hand.seats}
+    return sorted({
+        f"{names[action.seat]}:{action.street}:{action.type}"
+        for action in hand.actions
+        if action.seat in names
+    })
+
+
+def matches(search: HandSearch, hand: Hand) -> bool:
+    """Whether ``hand`` satisfies every filter in ``search``"""
+    if search.player is not None and all(s.name != search.player for s in hand.seats):
+        return False
+    if search.action is not None:
+        street, action_type = search.action
+        if search.player is not None:
+            if f"{search.player}:{street}:{action_type}" not in player_action_tokens(hand):
+                return False
+        elif all(a.street != street or a.type != action_type for a in hand.actions):
+            return False
+    if search.board_cards or search.hole_cards:
+        dealt = hand.dealt()
+        board = card_mask(dealt.board)
+        if _mask(search.board_cards) & ~board:
+            return False
+        if _mask(search.hole_cards) & ~(dealt.mask ^ board):
+            return False
+    if search.min_pot_bb is not None or search.max_pot_bb is not None:
+        pot_bb = hand_pot(hand) / hand.bb_size
+        if search.min_pot_bb is not None and pot_bb < search.min_pot_bb:
+            return False
+        if search.max_pot_bb is not None and pot_bb > search.max_pot_bb:
+            return False
+    if search.showdown is not None and (showdown_players(hand) > 0) != search.showdown:
+        return False
+    if search.winner_seat is not None and search.winner_seat not in winner_seats(hand):
+        return False
+    if search.text is not None and search.text.lower() not in hand.short_line.lower():
+        return False
+    return True
@@ -0,0 +1,22 @@
+"""JSON encoding for domain objects.
+
+orjson serializes the slotted dataclasses in ``hand`` directly, so hands and
+summaries go to JSON bytes without building intermediate dicts. Integer dict
+keys (seat numbers) become strings, as with ``json.dumps``.
+"""
+from typing import Any
+
+import orjson
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+loads = orjson.loads
+
+
+def dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=OPTIONS)
+
+
+def dumps_text(value: Any) -> str:
+    """JSON as str, for text and JSONB columns"""
+    return orjson.dumps(value, option=OPTIONS).decode()
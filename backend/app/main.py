@@ -1,8 +1,81 @@
+# ruff: noqa: E402
+import time
+
+# Read before the imports below so the startup report covers them
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .api import hands
+from .api import equity, hands, players, tables
+from .api.responses import FastJSONResponse
+from .repository.archive import HandArchive
+from .repository.connection import DatabaseConnection
+from .repository.hands_repo import HandsRepository
+from .repository.partitions import HandPartitions
+from .repository.player_stats_repo import PlayerStatsRepository
+from .repository.write_behind import GroupCommitWriter
+from .services.equity import EquityCalculator
+from .services.hand_cache import HandResponseCache
+from .services.hand_imports import HandImports
+from .services.idempotency import RecentHandKeys
+from .services.live_tables import LiveTableRegistry
+from .services.metrics import MetricsMiddleware, metrics
+from .services.pending_ev import PendingEv
+from .services.replay import ReplayCache
+from .services.settlement_pool import SettlementExecutor
+from .services.startup import startup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db_connection = DatabaseConnection()
+    await db_connection.open()
+    app.state.db_connection = db_connection
+    app.state.player_stats_repo = PlayerStatsRepository(db_connection)
+    app.state.hands_repo = HandsRepository(
+        db_connection, app.state.player_stats_repo, HandArchive()
+    )
+    app.state.partitions = HandPartitions(db_connection)
+    app.state.partitions.start()
+    app.state.equity_calculator = EquityCalculator()
+    app.state.hand_cache = HandResponseCache()
+    app.state.replay_cache = ReplayCache()
+    app.state.hand_keys = RecentHandKeys()
+    app.state.hand_imports = HandImports()
+    app.state.live_tables = LiveTableRegistry()
+    app.state.settlement_executor = SettlementExecutor()
+    app.state.settlement_executor.start()
+    app.state.pending_ev = PendingEv(app.state.hands_repo)
+    app.state.hand_writer = None
+    if os.getenv("WRITE_BEHIND", "0") == "1":
+        app.state.hand_writer = GroupCommitWriter(app.state.hands_repo)
+        app.state.hand_writer.start()
+    await startup.warm_up(app.state.settlement_executor)
+    startup.mark("ready")
+    try:
+        yield
+    finally:
+        await startup.stop()
+        if app.state.hand_writer is not None:
+            await app.state.hand_writer.stop()
+        await app.state.partitions.stop()
+        await app.state.pending_ev.stop()
+        app.state.settlement_executor.shutdown()
+        app.state.equity_calculator.shutdown()
+        await db_connection.close()
+
 
-app = FastAPI(title="Poker API", version="1.0.0")
+app = FastAPI(
+    title="Poker API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -11,10 +84,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(MetricsMiddleware, on_first_success=startup.request_succeeded)
 
 # Include routers
 app.include_router(hands.router, prefix="/api")
+app.include_router(equity.router, prefix="/api")
+app.include_router(players.router, prefix="/api")
+app.include_router(tables.router, prefix="/api")
 
 
 @app.get("/")
@@ -26,3 +104,81 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/health/startup")
+async def startup_health_check():
+    """Seconds from the start of imports to readiness and the first successful response"""
+    return startup.stats()
+
+
+@app.get("/health/db")
+async def db_health_check():
+    return app.state.db_connection.stats()
+
+
+@app.get("/health/storage")
+async def storage_health_check():
+    return {
+        "partitions": app.state.partitions.stats(),
+        "archive": app.state.hands_repo.archive.stats(),
+    }
+
+
+@app.get("/health/writes")
+async def writes_health_check():
+    writer = app.state.hand_writer
+    return writer.stats() if writer is not None else {"write_behind": False}
+
+
+@app.get("/health/tables")
+async def tables_health_check():
+    return app.state.live_tables.stats()
+
+
+@app.get("/health/settlement")
+async def settlement_health_check():
+    return {
+        **app.state.settlement_executor.stats(),
+        "pending_ev": app.state.pending_ev.stats(),
+    }
+
+
+@app.get("/health/cache")
+async def cache_health_check():
+    return {
+        **app.state.hand_cache.stats(),
+        "replay": app.state.replay_cache.stats(),
+        "idempotency": app.state.hand_keys.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage, repository and request metrics in Prometheus text format"""
+    db = app.state.db_connection.stats()
+    cache = app.state.hand_cache.stats()
+    gauges = {
+        "poker_db_pool_size": ("Open pooled connections", db.get("size", 0)),
+        "poker_db_pool_in_use": ("Connections checked out", db["in_use"]),
+        "poker_db_pool_waiting": ("Requests waiting for a connection", db.get("waiting", 0)),
+        "poker_hand_cache_entries": ("Cached hand responses", cache["entries"]),
+        "poker_live_tables_open": ("Live hands in progress", app.state.live_tables.stats()["open"]),
+        "poker_settlement_in_flight": (
+            "Settlement jobs on the worker pool", app.state.settlement_executor.in_flight
+        ),
+        "poker_tracing_enabled": ("Whether stage timing is on", int(metrics.enabled)),
+    }
+    return PlainTextResponse(
+        metrics.render(gauges), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.put("/metrics/tracing")
+async def set_tracing(enabled: bool):
+    """Switch stage and request timing on or off without a restart"""
+    metrics.enabled = enabled
+    return {"enabled": metrics.enabled}
+
+
+startup.import_started = _import_started
+startup.mark("imported")
@@ -0,0 +1,458 @@
+"""Compressed columnar archive files for hands moved out of Postgres.
+
+``python -m app.commands.archive_hands`` writes one file per cold monthly
+partition and then drops the partition. Hands are stored oldest first, in the
+(created_at, id) order of the hot table, in blocks of ``BLOCK_SIZE``. A block
+holds its columns back to back (ids, created_at deltas, encoded-hand lengths,
+encoded hands from ``hand_codec``) and is zlib-compressed on its own, so a
+lookup inflates a single block. Two sparse indexes sit in the footer: the first
+and last timestamp of every block, and the first id key of every page of the
+sorted id directory that maps ids to blocks.
+
+Layout (little endian):
+
+    header   4s magic, u16 version, u16 reserved, u32 hand count
+    blocks   zlib(ids 16*n | created_at deltas i64*n | lengths u32*n | hands)
+    pages    zlib(id keys u64*k | block numbers u32*k), keys sorted
+    footer   block table (BLOCK_DTYPE), then page table (PAGE_DTYPE)
+    trailer  u32 blocks, u32 pages, u64 footer offset, 4s magic
+"""
+import logging
+import mmap
+import os
+import struct
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HCA1"
+VERSION = 1
+SUFFIX = ".hca"
+BLOCK_SIZE = 256
+PAGE_SIZE = 1024
+DEFAULT_DIR = Path(__file__).resolve().parents[2] / "data" / "archive"
+
+HEADER = struct.Struct("<4sHHI")
+TRAILER = struct.Struct("<IIQ4s")
+BLOCK_DTYPE = np.dtype([
+    ("offset", "<u8"), ("length", "<u4"), ("count", "<u4"),
+    ("first", "<i8"), ("last", "<i8"),
+])
+PAGE_DTYPE = np.dtype([
+    ("offset", "<u8"), ("length", "<u4"), ("count", "<u4"), ("key", "<u8"),
+])
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+_CACHED_BLOCKS = 8
+
+# (created_at in microseconds, id bytes): the hot table's ORDER BY created_at, id
+Position = Tuple[int, bytes]
+
+
+def to_micros(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def to_position(created_at: datetime, hand_id: Union[str, uuid.UUID]) -> Position:
+    return to_micros(created_at), uuid.UUID(str(hand_id)).bytes
+
+
+def _id_key(id_bytes: bytes) -> int:
+    return int.from_bytes(id_bytes[:8], "little")
+
+
+class _Block:
+    """One inflated block: per-row timestamps and slices of the payload"""
+
+    __slots__ = ("count", "payload", "times", "starts")
+
+    def __init__(self, payload: bytes, count: int):
+        ids_end = 16 * count
+        deltas = np.frombuffer(payload, "<i8", count, ids_end)
+        lengths = np.frombuffer(payload, "<u4", count, ids_end + 8 * count)
+        base = ids_end + 12 * count
+        self.count = count
+        self.payload = payload
+        self.times: List[int] = np.cumsum(deltas).tolist()
+        self.starts: List[int] = (
+            np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))) + base
+        ).tolist()
+
+    def id_at(self, i: int) -> bytes:
+        return self.payload[16 * i:16 * i + 16]
+
+    def hand_at(self, i: int) -> bytes:
+        return self.payload[self.starts[i]:self.starts[i + 1]]
+
+    def index(self, id_bytes: bytes) -> int:
+        ids_end = 16 * self.count
+        pos = self.payload.find(id_bytes, 0, ids_end)
+        while pos >= 0 and pos % 16:
+            pos = self.payload.find(id_bytes, pos + 1, ids_end)
+        return pos // 16 if pos >= 0 else -1
+
+
+class ArchiveWriter:
+    """Writes one archive file; rows must arrive oldest first.
+
+    The file is written under a temporary name and renamed into place by
+    ``close``, so readers never see a partial archive. It never replaces an
+    existing file: to add hands to one, write a new file with ``merge`` set to
+    it, and its hands are interleaved with the added ones.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        block_size: int = BLOCK_SIZE,
+        page_size: int = PAGE_SIZE,
+        level: int = 9,
+        merge: Optional["ArchiveFile"] = None,
+    ):
+        self.path = Path(path)
+        if self.path.exists():
+            raise FileExistsError(f"{self.path} already exists")
+        self.block_size = block_size
+        self.page_size = page_size
+        self.level = level
+        self.count = 0
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._ids: List[bytes] = []
+        self._times: List[int] = []
+        self._hands: List[bytes] = []
+        self._blocks: List[tuple] = []
+        self._keys: List[int] = []
+        self._key_blocks: List[int] = []
+        self._last: Optional[Position] = None
+        self._merge = merge.entries() if merge is not None else iter(())
+        self._next: Optional[Tuple[Position, bytes]] = next(self._merge, None)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, hand_id: Union[str, uuid.UUID], created_at: datetime, hand_bin: bytes) -> None:
+        position = to_position(created_at, hand_id)
+        self._merge_until(position)
+        if self._next is not None and self._next[0] == position:
+            # The same hand in both sources; the added copy wins
+            self._next = next(self._merge, None)
+        self._add(position, hand_bin)
+
+    def _merge_until(self, position: Optional[Position]) -> None:
+        """Write the merged file's hands that come before ``position`` (all when None)"""
+        while self._next is not None and (position is None or self._next[0] < position):
+            self._add(*self._next)
+            self._next = next(self._merge, None)
+
+    def _add(self, position: Position, hand_bin: bytes) -> None:
+        if self._last is not None and position <= self._last:
+            raise ValueError("Archive rows must be added in (created_at, id) order")
+        self._last = position
+        self._times.append(position[0])
+        self._ids.append(position[1])
+        self._hands.append(hand_bin)
+        self.count += 1
+        if len(self._ids) == self.block_size:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        times = np.array(self._times, dtype="<i8")
+        lengths = np.array([len(h) for h in self._hands], dtype="<u4")
+        payload = b"".join((
+            b"".join(self._ids),
+            np.diff(times, prepend=0).astype("<i8").tobytes(),
+            lengths.tobytes(),
+            b"".join(self._hands),
+        ))
+        data = zlib.compress(payload, self.level)
+        block = len(self._blocks)
+        self._blocks.append(
+            (self._file.tell(), len(data), len(self._ids), self._times[0], self._times[-1])
+        )
+        self._file.write(data)
+        self._keys.extend(_id_key(i) for i in self._ids)
+        self._key_blocks.extend([block] * len(self._ids))
+        self._ids, self._times, self._hands = [], [], []
+
+    def close(self) -> int:
+        """Finish the file, move it into place and return the hand count"""
+        self._merge_until(None)
+        if self._ids:
+            self._flush_block()
+        keys = np.array(self._keys, dtype="<u8")
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        blocks = np.array(self._key_blocks, dtype="<u4")[order]
+
+        pages = []
+        for start in range(0, len(keys), self.page_size):
+            page_keys = keys[start:start + self.page_size]
+            data = zlib.compress(
+                page_keys.tobytes() + blocks[start:start + self.page_size].tobytes(),
+                self.level,
+            )
+            pages.append((self._file.tell(), len(data), len(page_keys), int(page_keys[0])))
+            self._file.write(data)
+
+        footer = self._file.tell()
+        self._file.write(np.array(self._blocks, dtype=BLOCK_DTYPE).tobytes())
+        self._file.write(np.array(pages, dtype=PAGE_DTYPE).tobytes())
+        self._file.write(TRAILER.pack(len(self._blocks), len(pages), footer, MAGIC))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, self.count))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.link(self._tmp, self.path)
+        self._tmp.unlink()
+        return self.count
+
+    def abort(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class ArchiveFile:
+    """One memory-mapped archive file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} hand archive")
+        blocks, pages, footer, magic = TRAILER.unpack_from(
+            self._map, len(self._map) - TRAILER.size
+        )
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is truncated")
+        # Copied out so the map can be closed while the tables are still referenced
+        self.blocks = np.frombuffer(self._map, BLOCK_DTYPE, blocks, footer).copy()
+        self.pages = np.frombuffer(
+            self._map, PAGE_DTYPE, pages, footer + blocks * BLOCK_DTYPE.itemsize
+        ).copy()
+        self.first = int(self.blocks["first"][0]) if blocks else 0
+        self.last = int(self.blocks["last"][-1]) if blocks else 0
+        self._cache: "OrderedDict[int, _Block]" = OrderedDict()
+
+    def close(self) -> None:
+        self._cache.clear()
+        self._map.close()
+
+    def _inflate(self, offset: int, length: int) -> bytes:
+        return zlib.decompress(self._map[offset:offset + length])
+
+    def _block(self, number: int, cache: bool = True) -> _Block:
+        block = self._cache.get(number)
+        if block is not None:
+            self._cache.move_to_end(number)
+            return block
+        entry = self.blocks[number]
+        block = _Block(self._inflate(int(entry["offset"]), int(entry["length"])), int(entry["count"]))
+        if cache:
+            self._cache[number] = block
+            if len(self._cache) > _CACHED_BLOCKS:
+                self._cache.popitem(last=False)
+        return block
+
+    def get(self, id_bytes: bytes) -> Optional[bytes]:
+        """The encoded hand with this id, inflating one id page and one block"""
+        key = _id_key(id_bytes)
+        page_keys = self.pages["key"]
+        # Pages whose first key is at most ``key``, plus the one before in case
+        # equal keys straddle a page boundary
+        start = max(int(np.searchsorted(page_keys, key, "left")) - 1, 0)
+        end = int(np.searchsorted(page_keys, key, "right"))
+        for page in range(start, end):
+            entry = self.pages[page]
+            count = int(entry["count"])
+            data = self._inflate(int(entry["offset"]), int(entry["length"]))
+            keys = np.frombuffer(data, "<u8", count)
+            lo, hi = np.searchsorted(keys, key, "left"), np.searchsorted(keys, key, "right")
+            for number in dict.fromkeys(np.frombuffer(data, "<u4", count, 8 * count)[lo:hi].tolist()):
+                block = self._block(number)
+                i = block.index(id_bytes)
+                if i >= 0:
+                    return block.hand_at(i)
+        return None
+
+    def entries(self) -> Iterator[Tuple[Position, bytes]]:
+        """(position, encoded hand) pairs oldest first, for merging into a new file"""
+        for number in range(len(self.blocks)):
+            block = self._block(number, cache=False)
+            for i, created in enumerate(block.times):
+                yield (created, block.id_at(i)), block.hand_at(i)
+
+    def rows(
+        self,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        after: Optional[Position] = None,
+    ) -> Iterator[bytes]:
+        """Encoded hands oldest first, with created_at in [since, until) and past ``after``"""
+        lower = max(since or self.first, after[0] if after else self.first)
+        for number in range(len(self.blocks)):
+            entry = self.blocks[number]
+            if int(entry["last"]) < lower:
+                continue
+            if until is not None and int(entry["first"]) >= until:
+                return
+            block = self._block(number, cache=False)
+            for i, created in enumerate(block.times):
+                if created < lower:
+                    continue
+                if until is not None and created >= until:
+                    return
+                if after is not None and (created, block.id_at(i)) <= after:
+                    continue
+                yield block.hand_at(i)
+
+    def rows_desc(self, before: Optional[Position] = None) -> Iterator[bytes]:
+        """Encoded hands newest first, strictly before ``before``"""
+        for number in range(len(self.blocks) - 1, -1, -1):
+            entry = self.blocks[number]
+            if before is not None and int(entry["first"]) > before[0]:
+                continue
+            block = self._block(number)
+            for i in range(block.count - 1, -1, -1):
+                if before is not None and (block.times[i], block.id_at(i)) >= before:
+                    continue
+                yield block.hand_at(i)
+
+
+class HandArchive:
+    """The archive files in one directory, picked up as they appear"""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None):
+        self.directory = Path(directory or os.getenv("HANDS_ARCHIVE_DIR", str(DEFAULT_DIR)))
+        self._files: List[ArchiveFile] = []
+        self._mtime: Optional[int] = None
+
+        self.lookups = 0
+        self.hits = 0
+
+    def refresh(self) -> None:
+        """Rescan the directory when its contents changed; one stat otherwise"""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+
+        known: Dict[Path, ArchiveFile] = {f.path: f for f in self._files}
+        files = []
+        for path in sorted(self.directory.glob(f"*{SUFFIX}")) if mtime is not None else []:
+            current = known.pop(path, None)
+            if current is not None and current.inode == path.stat().st_ino:
+                files.append(current)
+                continue
+            if current is not None:
+                current.close()
+            try:
+                files.append(ArchiveFile(path))
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping unreadable hand archive %s: %s", path, e)
+        for stale in known.values():
+            stale.close()
+        self._files = sorted(files, key=lambda f: f.first)
+
+    def files(self) -> List[ArchiveFile]:
+        """Archive files oldest first"""
+        self.refresh()
+        return self._files
+
+    def get(self, hand_id: str) -> Optional[bytes]:
+        self.lookups += 1
+        id_bytes = uuid.UUID(str(hand_id)).bytes
+        for archive in self.files():
+            hand_bin = archive.get(id_bytes)
+            if hand_bin is not None:
+                self.hits += 1
+                return hand_bin
+        return None
+
+    def entries(self) -> Iterator[Tuple[Position, bytes]]:
+        """(position, encoded hand) pairs oldest first, for merging into a new file"""
+        for number in range(len(self.blocks)):
+            block = self._block(number, cache=False)
+            for i, created in enumerate(block.times):
+                yield (created, block.id_at(i)), block.hand_at(i)
+
+    def rows(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> Iterator[bytes]:
+        """Encoded hands oldest first across every file"""
+        since_us = to_micros(since) if since is not None else None
+        until_us = to_micros(until) if until is not None else None
+        position = to_position(*after) if after is not None else None
+        for archive in self.files():
+            if since_us is not None and archive.last < since_us:
+                continue
+            if until_us is not None and archive.first >= until_us:
+                break
+            yield from archive.rows(since_us, until_us, position)
+
+    def newest(
+        self,
+        limit: int,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[bytes]:
+        """Up to ``limit`` encoded hands newest first, skipping ``offset``"""
+        position = to_position(*before) if before is not None else None
+        found: List[bytes] = []
+        for archive in reversed(self.files()):
+            if position is not None and archive.first > position[0]:
+                continue
+            if offset >= archive.count and position is None:
+                offset -= archive.count
+                continue
+            for hand_bin in archive.rows_desc(position):
+                if offset:
+                    offset -= 1
+                    continue
+                found.append(hand_bin)
+                if len(found) == limit:
+                    return found
+        return found
+
+    def count(self) -> int:
+        return sum(archive.count for archive in self.files())
+
+    def stats(self) -> dict:
+        files = self.files()
+        return {
+            "directory": str(self.directory),
+            "files": len(files),
+            "hands": sum(archive.count for archive in files),
+            "bytes": sum(archive.path.stat().st_size for archive in files),
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
@@ -1,99 +1,489 @@
-import json
+import logging
 import uuid
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 
+from .archive import HandArchive
 from .connection import DatabaseConnection
-from ..domain.hand import Hand, PlayerSnapshot, Action, Board
+from ..domain.hand import Hand, HandSummary, PlayerSnapshot, Action, Board
+from ..domain.hand_codec import decode_hand, encode_hand
+from ..domain.search import HandSearch
+from ..domain.serialization import dumps_text, loads
+from ..services.metrics import REPOSITORY_SECONDS, timed
+from ..services.player_stats import aggregate_player_stats, hand_player_stats
+from .partitions import month_start
+from .player_stats_repo import PlayerStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+HAND_COLUMNS = (
+    "id, created_at, bb_size, seats_json, hole_cards_json, "
+    "board_json, actions_json, short_line, result_json, hand_bin"
+)
+JSON_COLUMNS = (
+    "id, created_at, bb_size, seats_json, hole_cards_json, "
+    "board_json, actions_json, short_line, result_json"
+)
+
+SUMMARY_COLUMNS = "id, created_at, bb_size, short_line, result_json"
+
+# An idempotency key and the response to replay when it is submitted again
+HandKey = Tuple[bytes, dict]
+
+
+def _valid_id(hand_id: str) -> bool:
+    """Ids that are not UUIDs cannot match a row; skip the query"""
+    try:
+        uuid.UUID(hand_id)
+    except ValueError:
+        return False
+    return True
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _search_conditions(search: HandSearch) -> Tuple[List[str], List[Any]]:
+    """SQL predicates for a search, each backed by an index from migration 0005"""
+    conditions: List[str] = []
+    params: List[Any] = []
+    if search.player is not None:
+        conditions.append("seats_json @> %s::jsonb")
+        params.append(dumps_text([{"name": search.player}]))
+    if search.action is not None:
+        street, action_type = search.action
+        if search.player is not None:
+            conditions.append("player_actions @> %s::TEXT[]")
+            params.append([f"{search.player}:{street}:{action_type}"])
+        else:
+            conditions.append("actions_json @> %s::jsonb")
+            params.append(dumps_text([{"street": street, "type": action_type}]))
+    if search.board_cards:
+        conditions.append("board_cards @> %s::TEXT[]")
+        params.append(list(search.board_cards))
+    if search.hole_cards:
+        conditions.append("hole_cards @> %s::TEXT[]")
+        params.append(list(search.hole_cards))
+    if search.min_pot_bb is not None:
+        conditions.append("pot::FLOAT8 / bb_size >= %s")
+        params.append(search.min_pot_bb)
+    if search.max_pot_bb is not None:
+        conditions.append("pot::FLOAT8 / bb_size <= %s")
+        params.append(search.max_pot_bb)
+    if search.showdown is not None:
+        conditions.append("showdown_players > 0" if search.showdown else "showdown_players = 0")
+    if search.winner_seat is not None:
+        conditions.append("winner_seats @> %s::INT[]")
+        params.append([search.winner_seat])
+    if search.text is not None:
+        conditions.append("short_line ILIKE %s")
+        params.append(_like_pattern(search.text))
+    return conditions, params
+
+
+def _json(value: Any) -> Any:
+    """psycopg already decodes JSONB; plain text columns still need parsing"""
+    return loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def summary_from_row(row: tuple) -> HandSummary:
+    """HandSummary from a row of SUMMARY_COLUMNS"""
+    return HandSummary(
+        id=str(row[0]),
+        created_at=row[1],
+        bb_size=row[2],
+        short_line=row[3],
+        result=_json(row[4]),
+    )
+
+
+def _summary(hand: Hand) -> HandSummary:
+    return HandSummary(
+        id=hand.id,
+        created_at=hand.created_at,
+        bb_size=hand.bb_size,
+        short_line=hand.short_line,
+        result=hand.result,
+    )
 
 
 class HandsRepository:
-    def __init__(self, db_connection: DatabaseConnection):
+    """Hands in Postgres, falling back to archive files for archived months.
+
+    Archived months are older than every row still in the table, so reads that
+    run out of table rows continue into the archive newest first (list paths)
+    or start with it oldest first (export). Search covers the table only.
+    """
+
+    def __init__(
+        self,
+        db_connection: DatabaseConnection,
+        player_stats: Optional[PlayerStatsRepository] = None,
+        archive: Optional[HandArchive] = None,
+    ):
         self.db = db_connection
+        self.player_stats = player_stats or PlayerStatsRepository(db_connection)
+        self.archive = archive or HandArchive()
+        # Months whose partition is known to exist, see _ensure_partitions
+        self._months: Set[datetime] = set()
     
-    async def save(self, hand: Hand) -> None:
-        """Save a hand to the database"""
+    @timed(REPOSITORY_SECONDS.labels("save"))
+    async def save(self, hand: Hand, key: Optional[HandKey] = None) -> Optional[dict]:
+        """Save a hand to the database.
+
+        With a key already taken the hand is not stored and the response saved
+        with the key is returned instead.
+        """
         async with self.db.get_connection() as conn:
             async with conn.cursor() as cur:
+                if key is not None:
+                    taken = await self._claim_keys(cur, [hand], [key])
+                    if taken[0] is not None:
+                        return taken[0]
                 await cur.execute(
-                    """
-                    INSERT INTO hands (id, created_at, bb_size, seats_json, hole_cards_json, 
-                                     board_json, actions_json, short_line, result_json)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        hand.id,
-                        hand.created_at,
-                        hand.bb_size,
-                        json.dumps([self._serialize_player(p) for p in hand.seats]),
-                        json.dumps(hand.hole_cards),
-                        json.dumps(self._serialize_board(hand.board)),
-                        json.dumps([self._serialize_action(a) for a in hand.actions]),
-                        hand.short_line,
-                        json.dumps(hand.result)
-                    )
+                    f"INSERT INTO hands ({HAND_COLUMNS}) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                    self._to_row(hand),
+                    prepare=True,
                 )
-    
+                await self.player_stats.record(cur, hand_player_stats(hand))
+        return None
+
+    @timed(REPOSITORY_SECONDS.labels("save_many"))
+    async def save_many(
+        self, hands: List[Hand], keys: Optional[List[Optional[HandKey]]] = None
+    ) -> List[Optional[dict]]:
+        """Save many hands in a single transaction using COPY.
+
+        Returns, per hand, the saved response of its key when the key was
+        already taken (that hand is skipped), else None.
+        """
+        if not hands:
+            return []
+        await self._ensure_partitions(hands)
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                taken: List[Optional[dict]] = [None] * len(hands)
+                if keys is not None:
+                    taken = await self._claim_keys(cur, hands, keys)
+                    hands = [hand for hand, t in zip(hands, taken) if t is None]
+                if hands:
+                    async with cur.copy(f"COPY hands ({HAND_COLUMNS}) FROM STDIN") as copy:
+                        for hand in hands:
+                            await copy.write_row(self._to_row(hand))
+                    await self.player_stats.record(cur, aggregate_player_stats(hands))
+        return taken
+
+    @timed(REPOSITORY_SECONDS.labels("save_ev_results"))
+    async def save_ev_results(self, hands: List[Hand]) -> None:
+        """Store the all-in EV of saved hands, sampled after they were saved"""
+        if not hands:
+            return
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                # created_at prunes the update to the hand's partition
+                await cur.executemany(
+                    "UPDATE hands SET hand_bin = %s WHERE id = %s AND created_at = %s",
+                    [(encode_hand(hand), hand.id, hand.created_at) for hand in hands],
+                )
+
+    async def _ensure_partitions(self, hands: List[Hand]) -> None:
+        """Create the monthly partitions of hands dated in months not seen before.
+
+        HandPartitions only keeps the coming months, so backdated imports would
+        otherwise land in hands_default, which is never archived. Runs in its own
+        transaction so the partition lock is not held during the COPY; on failure
+        the hands still go to hands_default.
+        """
+        months = {month_start(hand.created_at) for hand in hands} - self._months
+        if not months:
+            return
+        try:
+            async with self.db.get_connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        "SELECT hands_create_partition(month AT TIME ZONE 'UTC') "
+                        "FROM unnest(%s::TIMESTAMPTZ[]) AS month",
+                        (sorted(months),),
+                    )
+        except Exception as e:
+            # A concurrent creation of the same month lands here; the next batch retries
+            logger.warning("Could not create hand partitions: %s", e)
+            return
+        self._months |= months
+
+    async def _claim_keys(
+        self, cur, hands: List[Hand], keys: List[Optional[HandKey]]
+    ) -> List[Optional[dict]]:
+        """Insert the keys; a key held by another hand, here or in the table, maps to its response"""
+        first: Dict[bytes, int] = {}
+        for index, key in enumerate(keys):
+            if key is not None:
+                first.setdefault(key[0], index)
+        taken: List[Optional[dict]] = [None] * len(hands)
+        if not first:
+            return taken
+        # Inserted in key order, so two batches sharing keys lock them in the
+        # same order and wait on each other instead of deadlocking
+        first = dict(sorted(first.items()))
+
+        # Waits for a concurrent insert of the same key, then skips it
+        await cur.execute(
+            "INSERT INTO hand_keys (key, hand_id, response) "
+            "SELECT * FROM unnest(%s::BYTEA[], %s::UUID[], %s::JSONB[]) "
+            "ON CONFLICT (key) DO NOTHING RETURNING key",
+            (
+                list(first),
+                [hands[index].id for index in first.values()],
+                [dumps_text(keys[index][1]) for index in first.values()],
+            ),
+        )
+        claimed = {bytes(row[0]) for row in await cur.fetchall()}
+        stored: Dict[bytes, dict] = {}
+        lost = [key for key in first if key not in claimed]
+        if lost:
+            await cur.execute(
+                "SELECT key, response FROM hand_keys WHERE key = ANY(%s)", (lost,)
+            )
+            stored = {bytes(key): _json(response) for key, response in await cur.fetchall()}
+
+        for index, key in enumerate(keys):
+            if key is None:
+                continue
+            if key[0] in stored:
+                taken[index] = stored[key[0]]
+            elif first[key[0]] != index:
+                taken[index] = keys[first[key[0]]][1]
+        return taken
+
+    @timed(REPOSITORY_SECONDS.labels("get"))
     async def get(self, hand_id: str) -> Optional[Hand]:
         """Get a hand by ID"""
+        if not _valid_id(hand_id):
+            return None
         async with self.db.get_connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
-                    "SELECT * FROM hands WHERE id = %s",
-                    (hand_id,)
+                    "SELECT hand_bin FROM hands WHERE id = %s",
+                    (hand_id,),
+                    prepare=True,
                 )
                 row = await cur.fetchone()
-                if row:
-                    return self._deserialize_hand(row)
-                return None
-    
+                if not row:
+                    archived = self.archive.get(hand_id)
+                    return decode_hand(archived) if archived is not None else None
+                if row[0] is not None:
+                    return decode_hand(bytes(row[0]))
+                return await self._get_legacy(cur, hand_id)
+
+    @timed(REPOSITORY_SECONDS.labels("get_encoded"))
+    async def get_encoded(self, hand_id: str) -> Optional[bytes]:
+        """Get a hand in the binary encoding without decoding it"""
+        if not _valid_id(hand_id):
+            return None
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT hand_bin FROM hands WHERE id = %s",
+                    (hand_id,),
+                    prepare=True,
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return self.archive.get(hand_id)
+                if row[0] is not None:
+                    return bytes(row[0])
+                hand = await self._get_legacy(cur, hand_id)
+                return encode_hand(hand) if hand else None
+
+    async def _get_legacy(self, cur, hand_id: str) -> Optional[Hand]:
+        """Read a row written before hand_bin was backfilled"""
+        await cur.execute(f"SELECT {JSON_COLUMNS} FROM hands WHERE id = %s", (hand_id,))
+        row = await cur.fetchone()
+        return self._deserialize_hand(row) if row else None
+
+    @timed(REPOSITORY_SECONDS.labels("list"))
     async def list(self, limit: int = 50, offset: int = 0) -> List[Hand]:
         """List hands with pagination"""
         async with self.db.get_connection() as conn:
             async with conn.cursor() as cur:
                 await cur.execute(
-                    "SELECT * FROM hands ORDER BY created_at DESC LIMIT %s OFFSET %s",
-                    (limit, offset)
+                    "SELECT id, hand_bin FROM hands "
+                    "ORDER BY created_at DESC LIMIT %s OFFSET %s",
+                    (limit, offset),
+                    prepare=True,
                 )
+                hands = []
+                for hand_id, hand_bin in await cur.fetchall():
+                    if hand_bin is not None:
+                        hands.append(decode_hand(bytes(hand_bin)))
+                    else:
+                        hand = await self._get_legacy(cur, hand_id)
+                        if hand:
+                            hands.append(hand)
+                if len(hands) < limit:
+                    skip = await self._archive_offset(cur, offset, len(hands))
+                    hands.extend(
+                        decode_hand(hand_bin)
+                        for hand_bin in self.archive.newest(limit - len(hands), skip)
+                    )
+                return hands
+
+    async def _archive_offset(self, cur, offset: int, found: int) -> int:
+        """How far into the archive an offset page starts, given table rows found"""
+        if found or not offset:
+            return 0
+        await cur.execute("SELECT count(*) FROM hands")
+        return max(offset - (await cur.fetchone())[0], 0)
+
+    def archived_hands(self) -> Iterator[Hand]:
+        """Every archived hand, oldest first"""
+        for hand_bin in self.archive.rows():
+            yield decode_hand(hand_bin)
+
+    async def stream(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Hand]:
+        """Yield hands oldest first from a named server-side cursor.
+
+        Rows are fetched ``batch_size`` at a time, so memory use does not
+        depend on how many hands match. ``after`` resumes past a
+        (created_at, id) position. Archived hands come first.
+        """
+        for hand_bin in self.archive.rows(since, until, after):
+            yield decode_hand(hand_bin)
+
+        conditions = []
+        params: List[Any] = []
+        if since is not None:
+            conditions.append("created_at >= %s")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < %s")
+            params.append(until)
+        if after is not None:
+            conditions.append("(created_at, id) > (%s, %s)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+        async with self.db.get_connection() as conn:
+            async for hand in self.stream_in(conn, where, params, batch_size):
+                yield hand
+
+    async def stream_in(
+        self, conn, where: str = "", params: Optional[List[Any]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Hand]:
+        """Like stream, on a connection and transaction the caller holds"""
+        async with conn.cursor(name=f"hands_stream_{uuid.uuid4().hex}") as cur:
+            cur.itersize = batch_size
+            await cur.execute(
+                f"SELECT id, hand_bin FROM hands {where}ORDER BY created_at, id",
+                params or [],
+            )
+            async for hand_id, hand_bin in cur:
+                if hand_bin is not None:
+                    yield decode_hand(bytes(hand_bin))
+                    continue
+                async with conn.cursor() as legacy:
+                    hand = await self._get_legacy(legacy, hand_id)
+                if hand:
+                    yield hand
+
+    @timed(REPOSITORY_SECONDS.labels("list_summaries"))
+    async def list_summaries(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[HandSummary]:
+        """List hand summaries newest first, optionally after a keyset position"""
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                if before is not None:
+                    await cur.execute(
+                        f"SELECT {SUMMARY_COLUMNS} FROM hands "
+                        "WHERE (created_at, id) < (%s, %s) "
+                        "ORDER BY created_at DESC, id DESC LIMIT %s",
+                        (before[0], before[1], limit),
+                        prepare=True,
+                    )
+                else:
+                    await cur.execute(
+                        f"SELECT {SUMMARY_COLUMNS} FROM hands "
+                        "ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s",
+                        (limit, offset),
+                        prepare=True,
+                    )
                 rows = await cur.fetchall()
-                return [self._deserialize_hand(row) for row in rows]
-    
-    def _serialize_player(self, player: PlayerSnapshot) -> dict:
-        return {
-            "seat": player.seat,
-            "name": player.name,
-            "starting_stack": player.starting_stack,
-            "role": player.role
-        }
-    
-    def _serialize_board(self, board: Board) -> dict:
-        return {
-            "flop": board.flop,
-            "turn": board.turn,
-            "river": board.river
-        }
-    
-    def _serialize_action(self, action: Action) -> dict:
-        return {
-            "seat": action.seat,
-            "street": action.street,
-            "type": action.type,
-            "amount": action.amount
-        }
-    
+                summaries = [summary_from_row(row) for row in rows]
+                if len(summaries) < limit:
+                    skip = 0 if before else await self._archive_offset(cur, offset, len(rows))
+                    summaries.extend(
+                        _summary(decode_hand(hand_bin))
+                        for hand_bin in self.archive.newest(
+                            limit - len(summaries), skip, before
+                        )
+                    )
+                return summaries
+
+    @timed(REPOSITORY_SECONDS.labels("search"))
+    async def search(
+        self,
+        search: HandSearch,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[HandSummary]:
+        """Summaries of hands matching every filter, newest first"""
+        conditions, params = _search_conditions(search)
+        if before is not None:
+            conditions.append("(created_at, id) < (%s, %s)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        params.append(limit)
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT {SUMMARY_COLUMNS} FROM hands {where}"
+                    "ORDER BY created_at DESC, id DESC LIMIT %s",
+                    params,
+                )
+                return [summary_from_row(row) for row in await cur.fetchall()]
+
+    def _to_row(self, hand: Hand) -> tuple:
+        return (
+            hand.id,
+            hand.created_at,
+            hand.bb_size,
+            dumps_text(hand.seats),
+            dumps_text(hand.hole_cards),
+            dumps_text(hand.board),
+            dumps_text(hand.actions),
+            hand.short_line,
+            dumps_text(hand.result),
+            encode_hand(hand),
+        )
+
     def _deserialize_hand(self, row) -> Hand:
-        seats_data = json.loads(row[3])
+        seats_data = _json(row[3])
         seats = [PlayerSnapshot(**p) for p in seats_data]
         
-        hole_cards = json.loads(row[4])
+        hole_cards = _json(row[4])
         
-        board_data = json.loads(row[5])
+        board_data = _json(row[5])
         board = Board(**board_data)
         
-        actions_data = json.loads(row[6])
+        actions_data = _json(row[6])
         actions = [Action(**a) for a in actions_data]
         
-        result = json.loads(row[8])
+        result = _json(row[8])
         
         return Hand(
             id=row[0],
@@ -0,0 +1,103 @@
+import bisect
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from ..domain.hand import Hand, HandSummary
+from ..domain.hand_codec import encode_hand
+from ..domain.search import HandSearch, matches
+from .hands_repo import HandKey
+
+
+class InMemoryHandsRepository:
+    """Process-local stand-in for HandsRepository, for benchmarks and tests without Postgres"""
+
+    def __init__(self):
+        self._hands: Dict[str, Hand] = {}
+        # (created_at, id) keys, oldest first, mirroring the keyset index
+        self._order: List[Tuple[datetime, str]] = []
+        self._keys: Dict[bytes, dict] = {}
+
+    async def save(self, hand: Hand, key: Optional[HandKey] = None) -> Optional[dict]:
+        if key is not None:
+            if key[0] in self._keys:
+                return self._keys[key[0]]
+            self._keys[key[0]] = key[1]
+        self._hands[hand.id] = hand
+        bisect.insort(self._order, (hand.created_at, hand.id))
+        return None
+
+    async def save_many(
+        self, hands: List[Hand], keys: Optional[List[Optional[HandKey]]] = None
+    ) -> List[Optional[dict]]:
+        keys = keys or [None] * len(hands)
+        return [await self.save(hand, key) for hand, key in zip(hands, keys)]
+
+    async def save_ev_results(self, hands: List[Hand]) -> None:
+        for hand in hands:
+            stored = self._hands.get(hand.id)
+            if stored is not None:
+                stored.ev_result = hand.ev_result
+
+    async def get(self, hand_id: str) -> Optional[Hand]:
+        return self._hands.get(hand_id)
+
+    async def get_encoded(self, hand_id: str) -> Optional[bytes]:
+        hand = self._hands.get(hand_id)
+        return encode_hand(hand) if hand else None
+
+    async def list(self, limit: int = 50, offset: int = 0) -> List[Hand]:
+        keys = self._order[::-1][offset:offset + limit]
+        return [self._hands[hand_id] for _, hand_id in keys]
+
+    async def stream(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Hand]:
+        start = bisect.bisect_right(self._order, after) if after is not None else 0
+        for created_at, hand_id in self._order[start:]:
+            if since is not None and created_at < since:
+                continue
+            if until is not None and created_at >= until:
+                break
+            yield self._hands[hand_id]
+
+    async def list_summaries(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[HandSummary]:
+        end = bisect.bisect_left(self._order, before) if before is not None else len(self._order)
+        if before is None:
+            end -= offset
+        keys = self._order[max(end - limit, 0):max(end, 0)][::-1]
+        return [_summary(self._hands[hand_id]) for _, hand_id in keys]
+
+    async def search(
+        self,
+        search: HandSearch,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, str]] = None,
+    ) -> List[HandSummary]:
+        end = bisect.bisect_left(self._order, before) if before is not None else len(self._order)
+        found = []
+        for index in range(end - 1, -1, -1):
+            hand = self._hands[self._order[index][1]]
+            if matches(search, hand):
+                found.append(_summary(hand))
+                if len(found) == limit:
+                    break
+        return found
+
+
+def _summary(hand: Hand) -> HandSummary:
+    return HandSummary(
+        id=hand.id,
+        created_at=hand.created_at,
+        bb_size=hand.bb_size,
+        short_line=hand.short_line,
+        result=hand.result,
+    )
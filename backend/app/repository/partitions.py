@@ -0,0 +1,121 @@
+"""Monthly partitions of the hands table.
+
+Migration 0006 partitions ``hands`` by the UTC month of ``created_at`` into
+``hands_pYYYYMM`` tables and defines ``hands_ensure_partitions``.
+``HandPartitions`` calls it at startup and on a timer, so the coming months
+always exist before their first hand arrives. ``HandsRepository.save_many``
+creates the months of older hands, such as backdated imports, as they arrive
+(migration 0008 moves rows already in ``hands_default`` into the new month).
+Hands outside every monthly partition still land in ``hands_default``.
+"""
+import asyncio
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from .connection import DatabaseConnection
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^hands_p(\d{4})(\d{2})$")
+
+
+@dataclass(slots=True)
+class Partition:
+    name: str
+    start: datetime  # inclusive, UTC
+    end: datetime  # exclusive
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month ``months`` after the one holding ``value``"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+class HandPartitions:
+    """Creates upcoming monthly partitions and lists the existing ones"""
+
+    def __init__(
+        self,
+        db: DatabaseConnection,
+        months_ahead: Optional[int] = None,
+        check_seconds: Optional[float] = None,
+    ):
+        self.db = db
+        self.months_ahead = months_ahead or int(os.getenv("HANDS_PARTITIONS_AHEAD", "3"))
+        self.check_seconds = check_seconds or float(
+            os.getenv("HANDS_PARTITION_CHECK_SECONDS", "21600")
+        )
+        self._task: Optional[asyncio.Task] = None
+
+        self.checks = 0
+        self.failures = 0
+        self.created: List[str] = []
+
+    async def ensure(self) -> List[str]:
+        """Create this month's and the next ``months_ahead`` partitions; returns new names"""
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("SELECT hands_ensure_partitions(%s)", (self.months_ahead,))
+                created = [row[0] for row in await cur.fetchall()]
+        self.created.extend(created)
+        return created
+
+    async def list(self) -> List[Partition]:
+        """Monthly partitions oldest first; the default partition is left out"""
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "SELECT c.relname FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'hands'::regclass"
+                )
+                names = [row[0] for row in await cur.fetchall()]
+        partitions = []
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                start = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+                partitions.append(Partition(name, start, month_start(start, 1)))
+        return sorted(partitions, key=lambda p: p.start)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self.checks += 1
+            try:
+                created = await self.ensure()
+                if created:
+                    logger.info("Created hand partitions: %s", ", ".join(created))
+            except Exception as e:
+                # Retried on the next check; hands meanwhile go to hands_default
+                self.failures += 1
+                logger.warning("Could not create hand partitions: %s", e)
+            await asyncio.sleep(self.check_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "months_ahead": self.months_ahead,
+            "check_seconds": self.check_seconds,
+            "checks": self.checks,
+            "failures": self.failures,
+            "created": self.created[-12:],
+        }
@@ -0,0 +1,82 @@
+from typing import Dict, List, Optional, Tuple
+
+from .connection import DatabaseConnection
+from ..services.player_stats import STAT_COLUMNS, PlayerStats, aggregate_player_stats
+
+LEADERBOARD_ORDERS = ("net_result", "hands_played", "showdowns")
+
+_UPSERT = (
+    f"INSERT INTO player_stats (name, {', '.join(STAT_COLUMNS)}) "
+    f"VALUES (%s, {', '.join(['%s'] * len(STAT_COLUMNS))}) "
+    "ON CONFLICT (name) DO UPDATE SET "
+    + ", ".join(f"{c} = player_stats.{c} + EXCLUDED.{c}" for c in STAT_COLUMNS)
+    + ", updated_at = now()"
+)
+
+
+class PlayerStatsRepository:
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db = db_connection
+
+    async def record(self, cur, stats: Dict[str, PlayerStats]) -> None:
+        """Add per-player deltas inside the caller's transaction"""
+        # Sorted names give concurrent writers the same row lock order
+        await cur.executemany(
+            _UPSERT,
+            [
+                (name, *(getattr(stats[name], c) for c in STAT_COLUMNS))
+                for name in sorted(stats)
+            ],
+        )
+
+    async def get(self, name: str) -> Optional[PlayerStats]:
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT {', '.join(STAT_COLUMNS)} FROM player_stats WHERE name = %s",
+                    (name,),
+                    prepare=True,
+                )
+                row = await cur.fetchone()
+                return PlayerStats(*row) if row else None
+
+    async def leaderboard(
+        self, order_by: str = "net_result", limit: int = 20, min_hands: int = 0
+    ) -> List[Tuple[str, PlayerStats]]:
+        if order_by not in LEADERBOARD_ORDERS:
+            raise ValueError(f"Cannot order leaderboard by {order_by}")
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    f"SELECT name, {', '.join(STAT_COLUMNS)} FROM player_stats "
+                    f"WHERE hands_played >= %s ORDER BY {order_by} DESC, name LIMIT %s",
+                    (min_hands, limit),
+                )
+                return [(row[0], PlayerStats(*row[1:])) for row in await cur.fetchall()]
+
+    async def rebuild(self, hands_repo, batch_size: int = 1000) -> int:
+        """Recompute every aggregate from stored and archived hands in one transaction.
+
+        The stats table is locked for the duration, so hands inserted
+        meanwhile wait and are added on top of the rebuilt totals.
+        """
+        totals: Dict[str, PlayerStats] = {}
+        count = 0
+        async with self.db.get_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("LOCK TABLE player_stats IN EXCLUSIVE MODE")
+                async for hand in hands_repo.stream_in(conn, batch_size=batch_size):
+                    aggregate_player_stats([hand], into=totals)
+                    count += 1
+                for hand in hands_repo.archived_hands():
+                    aggregate_player_stats([hand], into=totals)
+                    count += 1
+                await cur.execute("TRUNCATE player_stats")
+                async with cur.copy(
+                    f"COPY player_stats (name, {', '.join(STAT_COLUMNS)}) FROM STDIN"
+                ) as copy:
+                    for name in sorted(totals):
+                        await copy.write_row(
+                            (name, *(getattr(totals[name], c) for c in STAT_COLUMNS))
+                        )
+        return count
@@ -0,0 +1,209 @@
+"""Write-behind group commit for hand inserts.
+
+Settled hands are queued and a single background task writes them with
+``HandsRepository.save_many`` (one COPY and one commit per group), flushing when
+``max_batch`` hands are waiting or ``max_delay_ms`` after the first one arrived.
+Callers wait for their group's commit, or return as soon as the hand is queued
+when ``ack_on_enqueue`` is set (a crash can then lose queued hands, and a read
+straight after the write may not find the hand yet).
+"""
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from ..domain.hand import Hand
+from .hands_repo import HandKey, HandsRepository
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueFull(Exception):
+    """The write queue stayed full for longer than the enqueue timeout"""
+
+
+# A queued hand, its idempotency key and the future its caller waits on
+_Item = Tuple[Hand, Optional[HandKey], Optional[asyncio.Future]]
+
+
+class GroupCommitWriter:
+    """Queues hands and commits them to the repository in groups"""
+
+    def __init__(
+        self,
+        repo: HandsRepository,
+        max_batch: Optional[int] = None,
+        max_delay_ms: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        ack_on_enqueue: Optional[bool] = None,
+        enqueue_timeout: Optional[float] = None,
+    ):
+        self.repo = repo
+        self.max_batch = max_batch or int(os.getenv("WRITE_BEHIND_MAX_BATCH", "256"))
+        self.max_delay = (
+            max_delay_ms if max_delay_ms is not None
+            else float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS", "5"))
+        ) / 1000
+        self.queue_size = queue_size or int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+        self.ack_on_enqueue = (
+            ack_on_enqueue if ack_on_enqueue is not None
+            else os.getenv("WRITE_BEHIND_ACK", "commit") == "enqueue"
+        )
+        self.enqueue_timeout = (
+            enqueue_timeout if enqueue_timeout is not None
+            else float(os.getenv("WRITE_BEHIND_ENQUEUE_TIMEOUT", "5"))
+        )
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Callers blocked until the queue has room
+        self._waiting = 0
+
+        self.flushes = 0
+        self.written = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.largest_batch = 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop accepting hands and wait until everything queued is written"""
+        if self._task is None:
+            return
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        # Callers that were waiting for room when stop began put their hands
+        # behind the sentinel; write those too, until none are left
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is not None:
+                    batch.append(item)
+            if batch:
+                await self._flush(batch)
+            elif self._waiting:
+                # The queue has room, so they put their hands shortly
+                await asyncio.sleep(0)
+            else:
+                break
+        self._task = None
+
+    async def save(self, hand: Hand, key: Optional[HandKey] = None) -> Optional[dict]:
+        """Queue a hand; returns once it is committed, or queued in ack-on-enqueue mode.
+
+        Like ``HandsRepository.save``, returns the saved response instead when
+        the key was already taken. In ack-on-enqueue mode that is not known
+        yet, so it always returns None.
+        """
+        if self._task is None or self._closing:
+            raise RuntimeError("Write-behind queue is not running")
+        done = None if self.ack_on_enqueue else asyncio.get_running_loop().create_future()
+        item = (hand, key, done)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Backpressure: wait for room, but not forever
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._queue.put(item), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                raise WriteQueueFull("Write queue is full") from None
+            finally:
+                self._waiting -= 1
+            if self._closing and self._task is None:
+                # Stop has already written the last hands; nothing will write this one
+                raise RuntimeError("Write-behind queue is not running")
+        if done is not None:
+            return await done
+        return None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        self.flushes += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            taken = await self.repo.save_many(
+                [hand for hand, _, _ in batch], [key for _, key, _ in batch]
+            )
+        except Exception as e:
+            if len(batch) == 1:
+                self._settle(batch[0], None, e)
+                return
+            # One bad hand must not fail its whole group; retry them one by one
+            for item in batch:
+                try:
+                    existing = await self.repo.save(item[0], item[1])
+                except Exception as e:
+                    self._settle(item, None, e)
+                else:
+                    self._settle(item, existing, None)
+            return
+        for item, existing in zip(batch, taken):
+            self._settle(item, existing, None)
+
+    def _settle(
+        self, item: _Item, existing: Optional[dict], error: Optional[Exception]
+    ) -> None:
+        hand, _, done = item
+        if error is None:
+            if existing is None:
+                self.written += 1
+            else:
+                self.duplicates += 1
+        else:
+            self.failed += 1
+            if done is None:
+                logger.error("Write-behind insert of hand %s failed: %s", hand.id, error)
+        if done is not None and not done.done():
+            if error is None:
+                done.set_result(existing)
+            else:
+                done.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "ack_on_enqueue": self.ack_on_enqueue,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "largest_batch": self.largest_batch,
+        }
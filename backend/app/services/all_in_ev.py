@@ -0,0 +1,87 @@
+"""All-in expected value: what each seat wins on average over the cards still
+to come when betting closes before the river.
+
+Heads-up preflop all-ins are a single lookup in the memory-mapped preflop
+table, postflop runouts (at most 990) are enumerated exactly, and multiway
+preflop all-ins, which no table covers, are sampled with a caller-chosen seed
+so the same hand always reports the same EV. Sampling takes milliseconds, so
+settlement leaves those to ``PendingEv`` (see ``needs_sampling``).
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..domain.cards import card_mask, remaining
+from .equity import all_runouts, rank_runouts, sample_runouts
+from .preflop_equity import PreflopEquityTable
+
+
+def side_pots(committed: Dict[int, int], live: Sequence[int]) -> List[Tuple[int, List[int]]]:
+    """(chips, eligible seats) for the main pot and each side pot, as award_pots splits them"""
+    pots = []
+    previous = 0
+    for level in sorted({committed[seat] for seat in live}):
+        amount = sum(min(c, level) - previous for c in committed.values() if c > previous)
+        pots.append((amount, [seat for seat in live if committed[seat] >= level]))
+        previous = level
+    # Chips above the deepest live commitment (folded overbets) join the top pot
+    dead = sum(c - previous for c in committed.values() if c > previous)
+    if dead:
+        amount, eligible = pots[-1]
+        pots[-1] = (amount + dead, eligible)
+    return pots
+
+
+def needs_sampling(
+    board: Sequence[int], live: Sequence[int], table: Optional[PreflopEquityTable]
+) -> bool:
+    """Whether expected_winnings samples runouts rather than enumerating or looking up"""
+    return not board and (len(live) > 2 or table is None)
+
+
+def expected_winnings(
+    board: Sequence[int],
+    holdings: Dict[int, Tuple[int, int]],
+    committed: Dict[int, int],
+    live: Sequence[int],
+    table: Optional[PreflopEquityTable] = None,
+    samples: int = 2000,
+    seed: int = 0,
+) -> Dict[int, float]:
+    """Chips each seat wins on average over every completion of ``board``"""
+    won = dict.fromkeys(committed, 0.0)
+    pots = side_pots(committed, live)
+
+    if not board and len(live) == 2 and table is not None:
+        first, second = live
+        equity = table.equity(holdings[first], holdings[second])
+        for amount, eligible in pots:
+            if len(eligible) == 1:
+                won[eligible[0]] += amount
+            else:
+                won[first] += amount * equity
+                won[second] += amount * (1 - equity)
+        return won
+
+    known = card_mask(board)
+    for cards in holdings.values():
+        known |= card_mask(cards)
+    deck = np.array(remaining(known), dtype=np.int64)
+    board_arr = np.array(board, dtype=np.int64)
+    boards = (
+        all_runouts(board_arr, deck) if len(board) >= 3
+        else sample_runouts(board_arr, deck, samples, seed)
+    )
+    ranks = rank_runouts(np.array([holdings[seat] for seat in live], dtype=np.int64), boards)
+    column = {seat: i for i, seat in enumerate(live)}
+
+    for amount, eligible in pots:
+        if len(eligible) == 1:
+            won[eligible[0]] += amount
+            continue
+        contest = ranks[:, [column[seat] for seat in eligible]]
+        best = contest == contest.max(axis=1, keepdims=True)
+        shares = (best / best.sum(axis=1, keepdims=True)).mean(axis=0)
+        for seat, share in zip(eligible, shares.tolist()):
+            won[seat] += amount * share
+    return won
@@ -0,0 +1,270 @@
+"""Vectorized all-in equity: exact enumeration postflop, Monte Carlo preflop.
+
+Hands are evaluated in NumPy batches against the same lookup tables as
+``evaluator``: the non-flush table is flattened into sorted key/value arrays
+searched with ``np.searchsorted`` and the flush table becomes a dense array.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..domain.cards import card_mask, remaining
+from . import evaluator
+
+CHUNK_SIZE = 50_000
+POOL_THRESHOLD = 200_000
+
+_np_tables: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+_CARD_PRIME = np.array(evaluator.CARD_PRIME, dtype=np.int64)
+_CARD_RANK_BIT = np.array(evaluator.CARD_RANK_BIT, dtype=np.int64)
+
+
+def warm_tables() -> None:
+    """Build the NumPy lookup tables; used as the process pool initializer"""
+    global _np_tables
+    if _np_tables is not None:
+        return
+    non_flush, flush = evaluator.tables()
+    keys = np.fromiter(sorted(non_flush), dtype=np.int64, count=len(non_flush))
+    values = np.array([non_flush[k] for k in keys.tolist()], dtype=np.int64)
+    _np_tables = (keys, values, np.array(flush, dtype=np.int64))
+
+
+def evaluate_batch(cards: np.ndarray) -> np.ndarray:
+    """Rank an (N, 7) array of card integers; larger is stronger"""
+    warm_tables()
+    keys, values, flush = _np_tables  # type: ignore[misc]
+
+    products = _CARD_PRIME[cards].prod(axis=1)
+    ranks = values[np.searchsorted(keys, products)]
+
+    suits = cards & 3
+    counts = np.stack([(suits == s).sum(axis=1) for s in range(4)], axis=1)
+    flush_suit = counts.argmax(axis=1)
+    flushed = counts.max(axis=1) >= 5
+    if flushed.any():
+        rows = np.nonzero(flushed)[0]
+        in_suit = suits[rows] == flush_suit[rows, None]
+        masks = np.bitwise_or.reduce(
+            np.where(in_suit, _CARD_RANK_BIT[cards[rows]], 0), axis=1
+        )
+        ranks[rows] = flush[masks]
+    return ranks
+
+
+def rank_runouts(holdings: np.ndarray, boards: np.ndarray) -> np.ndarray:
+    """Hand values as a (boards, seats) array for every holding on every full board"""
+    warm_tables()
+    keys, values, flush = _np_tables  # type: ignore[misc]
+
+    # Board-only work is shared by every seat: prime product, suit counts
+    # and the rank mask held in each suit
+    board_products = _CARD_PRIME[boards].prod(axis=1)
+    board_suits = boards & 3
+    board_bits = _CARD_RANK_BIT[boards]
+    board_counts = np.empty((boards.shape[0], 4), dtype=np.int64)
+    board_masks = np.empty((boards.shape[0], 4), dtype=np.int64)
+    for suit in range(4):
+        in_suit = board_suits == suit
+        board_counts[:, suit] = in_suit.sum(axis=1)
+        board_masks[:, suit] = np.bitwise_or.reduce(np.where(in_suit, board_bits, 0), axis=1)
+    flush_rows = np.nonzero(board_counts.max(axis=1) >= 3)[0]
+
+    ranks = np.empty((boards.shape[0], holdings.shape[0]), dtype=np.int64)
+    for i, (first, second) in enumerate(holdings.tolist()):
+        products = board_products * (_CARD_PRIME[first] * _CARD_PRIME[second])
+        seat_ranks = values[np.searchsorted(keys, products)]
+
+        counts = board_counts[flush_rows].copy()
+        counts[:, first & 3] += 1
+        counts[:, second & 3] += 1
+        flush_suit = counts.argmax(axis=1)
+        flushed = counts[np.arange(len(flush_rows)), flush_suit] >= 5
+        rows = flush_rows[flushed]
+        if rows.size:
+            suit = flush_suit[flushed]
+            masks = board_masks[rows, suit]
+            masks |= np.where(suit == (first & 3), _CARD_RANK_BIT[first], 0)
+            masks |= np.where(suit == (second & 3), _CARD_RANK_BIT[second], 0)
+            seat_ranks[rows] = flush[masks]
+        ranks[:, i] = seat_ranks
+    return ranks
+
+
+def _tally(holdings: np.ndarray, boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Wins, ties and tie-weighted equity per seat over a batch of full boards"""
+    ranks = rank_runouts(holdings, boards)
+    best = ranks == ranks.max(axis=1, keepdims=True)
+    winners = best.sum(axis=1, keepdims=True)
+    wins = (best & (winners == 1)).sum(axis=0)
+    ties = (best & (winners > 1)).sum(axis=0)
+    shares = (best / winners).sum(axis=0)
+    return wins, ties, shares
+
+
+def simulate_chunk(
+    holdings: np.ndarray,
+    board: np.ndarray,
+    deck: np.ndarray,
+    samples: int,
+    seed: Optional[int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Monte Carlo over ``samples`` random runouts of the missing board cards"""
+    return (*_tally(holdings, sample_runouts(board, deck, samples, seed)), samples)
+
+
+def sample_runouts(
+    board: np.ndarray, deck: np.ndarray, samples: int, seed: Optional[int]
+) -> np.ndarray:
+    """``samples`` random completions of ``board`` from ``deck``, as (samples, 5)"""
+    rng = np.random.default_rng(seed)
+    missing = 5 - board.shape[0]
+    # Draw with replacement and redraw only the rows that hit a repeat
+    picks = rng.integers(0, deck.shape[0], size=(samples, missing))
+    while True:
+        ordered = np.sort(picks, axis=1)
+        repeated = np.nonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))[0]
+        if not repeated.size:
+            break
+        picks[repeated] = rng.integers(0, deck.shape[0], size=(repeated.size, missing))
+    boards = np.empty((samples, 5), dtype=np.int64)
+    boards[:, :board.shape[0]] = board
+    boards[:, board.shape[0]:] = deck[picks]
+    return boards
+
+
+def enumerate_runouts(
+    holdings: np.ndarray, board: np.ndarray, deck: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Exact tally over every completion of the board"""
+    boards = all_runouts(board, deck)
+    return (*_tally(holdings, boards), boards.shape[0])
+
+
+def all_runouts(board: np.ndarray, deck: np.ndarray) -> np.ndarray:
+    """Every completion of ``board`` from ``deck``, as (runouts, 5)"""
+    missing = 5 - board.shape[0]
+    runouts = np.array(list(combinations(deck.tolist(), missing)), dtype=np.int64)
+    runouts = runouts.reshape(-1, missing)
+    boards = np.empty((runouts.shape[0], 5), dtype=np.int64)
+    boards[:, :board.shape[0]] = board
+    boards[:, board.shape[0]:] = runouts
+    return boards
+
+
+@dataclass
+class EquityResult:
+    method: str
+    samples: int
+    win: Dict[int, float]
+    tie: Dict[int, float]
+    equity: Dict[int, float]
+
+
+class EquityCalculator:
+    """Runs equity queries inline, in a thread, or across a process pool"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or int(os.getenv("EQUITY_WORKERS", str(os.cpu_count() or 1)))
+        self._pool: Optional[Executor] = None
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=warm_tables)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def calculate(
+        self,
+        hole_cards: Dict[int, List[int]],
+        board: Sequence[int],
+        samples: int = 100_000,
+        max_time_ms: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> EquityResult:
+        seats = sorted(hole_cards)
+        holdings = np.array([hole_cards[seat] for seat in seats], dtype=np.int64)
+        board_arr = np.array(board, dtype=np.int64)
+        known = card_mask(board)
+        for cards in hole_cards.values():
+            known |= card_mask(cards)
+        deck = np.array(remaining(known), dtype=np.int64)
+        loop = asyncio.get_running_loop()
+
+        if len(board) >= 3:
+            method = "exact"
+            tally = await loop.run_in_executor(
+                None, enumerate_runouts, holdings, board_arr, deck
+            )
+        else:
+            method = "monte_carlo"
+            tally = await self._simulate(
+                loop, holdings, board_arr, deck, samples, max_time_ms, seed
+            )
+
+        wins, ties, shares, total = tally
+        return EquityResult(
+            method=method,
+            samples=total,
+            win={seat: float(wins[i]) / total for i, seat in enumerate(seats)},
+            tie={seat: float(ties[i]) / total for i, seat in enumerate(seats)},
+            equity={seat: float(shares[i]) / total for i, seat in enumerate(seats)},
+        )
+
+    async def _simulate(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        holdings: np.ndarray,
+        board: np.ndarray,
+        deck: np.ndarray,
+        samples: int,
+        max_time_ms: Optional[int],
+        seed: Optional[int],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        if samples <= POOL_THRESHOLD and max_time_ms is None:
+            return await loop.run_in_executor(
+                None, simulate_chunk, holdings, board, deck, samples, seed
+            )
+
+        # Fan fixed-size chunks out to the pool, keeping every worker busy,
+        # until the sample count or the time budget runs out
+        executor = self._executor() if samples > POOL_THRESHOLD else None
+        in_flight = self.workers if executor is not None else 1
+        deadline = (
+            time.monotonic() + max_time_ms / 1000 if max_time_ms is not None else None
+        )
+        seeds = np.random.SeedSequence(seed).spawn(samples // CHUNK_SIZE + 1)
+        pending: set = set()
+        submitted = 0
+        totals = [np.zeros(len(holdings)), np.zeros(len(holdings)), np.zeros(len(holdings)), 0]
+
+        def submit() -> None:
+            nonlocal submitted
+            size = min(CHUNK_SIZE, samples - submitted)
+            chunk_seed = int(seeds[submitted // CHUNK_SIZE].generate_state(1)[0])
+            pending.add(loop.run_in_executor(
+                executor, simulate_chunk, holdings, board, deck, size, chunk_seed
+            ))
+            submitted += size
+
+        while submitted < samples and len(pending) < in_flight:
+            submit()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                for i, value in enumerate(future.result()):
+                    totals[i] += value
+            expired = deadline is not None and time.monotonic() >= deadline
+            while not expired and submitted < samples and len(pending) < in_flight:
+                submit()
+        return totals[0], totals[1], totals[2], totals[3]
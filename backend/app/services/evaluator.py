@@ -0,0 +1,247 @@
+"""Table-driven 5-7 card hold'em hand evaluator.
+
+Cards are integers 0-51 (``rank * 4 + suit``). A hand is ranked with a single
+lookup: hands without a flush are keyed by the product of one prime per rank,
+hands with a flush by the 13-bit rank mask of the flush suit. Both tables are
+built once, on first use, and larger values always mean stronger hands.
+"""
+import threading
+from itertools import combinations_with_replacement
+from math import prod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Card parsing lives in the domain; re-exported for existing callers
+from ..domain.cards import (  # noqa: F401
+    CARD_INDEX,
+    CARD_NAMES,
+    RANKS,
+    SUITS,
+    format_cards,
+    parse_cards,
+)
+
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = (
+    range(9)
+)
+CATEGORY_NAMES = (
+    "high card", "pair", "two pair", "three of a kind", "straight",
+    "flush", "full house", "four of a kind", "straight flush",
+)
+
+# Per-card lookup columns used by the hot path
+CARD_PRIME = tuple(PRIMES[c >> 2] for c in range(52))
+CARD_RANK_BIT = tuple(1 << (c >> 2) for c in range(52))
+# One nibble per suit; starting every nibble at 3 makes bit 3 flip at five cards
+CARD_SUIT_ADD = tuple(1 << (4 * (c & 3)) for c in range(52))
+SUIT_BASE = 0x3333
+FLUSH_BITS = 0x8888
+
+_non_flush: Optional[Dict[int, int]] = None
+_flush: Optional[List[int]] = None
+_build_lock = threading.Lock()
+
+
+def _score(category: int, ranks: Sequence[int]) -> int:
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+
+def _straight_top(mask: int) -> int:
+    """Top rank of the best straight in a rank mask, or -1"""
+    for top in range(12, 3, -1):
+        window = 0b11111 << (top - 4)
+        if mask & window == window:
+            return top
+    wheel = 0b1000000001111
+    if mask & wheel == wheel:
+        return 3
+    return -1
+
+
+def _rank_counts_value(counts: Sequence[int]) -> int:
+    """Best non-flush value for a multiset of ranks given as 13 counts"""
+    by_count: List[List[int]] = [[], [], [], [], []]
+    mask = 0
+    for rank in range(12, -1, -1):
+        n = counts[rank]
+        if n:
+            by_count[n].append(rank)
+            mask |= 1 << rank
+    quads, trips, pairs = by_count[4], by_count[3], by_count[2]
+    present = [r for r in range(12, -1, -1) if counts[r]]
+
+    if quads:
+        kicker = [r for r in present if r != quads[0]][:1]
+        return _score(QUADS, [quads[0]] * 4 + kicker)
+    if trips and (len(trips) > 1 or pairs):
+        pair = max(trips[1:] + pairs)
+        return _score(FULL_HOUSE, [trips[0]] * 3 + [pair] * 2)
+    top = _straight_top(mask)
+    if top >= 0:
+        return _score(STRAIGHT, [top])
+    if trips:
+        kickers = [r for r in present if r != trips[0]][:2]
+        return _score(TRIPS, [trips[0]] * 3 + kickers)
+    if len(pairs) >= 2:
+        high, low = pairs[0], pairs[1]
+        kicker = [r for r in present if r not in (high, low)][:1]
+        return _score(TWO_PAIR, [high, high, low, low] + kicker)
+    if pairs:
+        kickers = [r for r in present if r != pairs[0]][:3]
+        return _score(PAIR, [pairs[0]] * 2 + kickers)
+    return _score(HIGH_CARD, present[:5])
+
+
+def _flush_value(mask: int) -> int:
+    top = _straight_top(mask)
+    if top >= 0:
+        return _score(STRAIGHT_FLUSH, [top])
+    ranks = [r for r in range(12, -1, -1) if mask >> r & 1][:5]
+    return _score(FLUSH, ranks)
+
+
+def _has_five_of_a_kind(primes: Sequence[int]) -> bool:
+    """Whether a sorted multiset repeats a rank more than four times"""
+    return any(primes[i] == primes[i + 4] for i in range(len(primes) - 4))
+
+
+def build_tables() -> None:
+    """Build the prime-product and flush lookup tables (idempotent, thread-safe)"""
+    global _non_flush, _flush
+    with _build_lock:
+        if _flush is not None:
+            return
+
+        non_flush: Dict[int, int] = {}
+        for ranks in combinations_with_replacement(range(13), 5):
+            if ranks[0] == ranks[4]:
+                continue
+            counts = [0] * 13
+            for r in ranks:
+                counts[r] += 1
+            non_flush[prod(PRIMES[r] for r in ranks)] = _rank_counts_value(counts)
+        # The best five of six or seven ranks is the best over dropping one
+        # rank, so larger hands are lookups into the smaller table
+        for size in (6, 7):
+            for primes in combinations_with_replacement(PRIMES, size):
+                if _has_five_of_a_kind(primes):
+                    continue
+                product = prod(primes)
+                non_flush[product] = max([non_flush[product // p] for p in set(primes)])
+
+        flush = [0] * 8192
+        for mask in range(8192):
+            if mask.bit_count() >= 5:
+                flush[mask] = _flush_value(mask)
+
+        _non_flush, _flush = non_flush, flush
+
+
+def tables() -> Tuple[Dict[int, int], List[int]]:
+    if _flush is None:
+        build_tables()
+    return _non_flush, _flush  # type: ignore[return-value]
+
+
+def evaluate(cards: Sequence[int]) -> int:
+    """Rank 5 to 7 cards; larger is stronger"""
+    non_flush, flush = tables()
+    product = 1
+    suits = SUIT_BASE
+    for c in cards:
+        product *= CARD_PRIME[c]
+        suits += CARD_SUIT_ADD[c]
+    flushed = suits & FLUSH_BITS
+    if flushed:
+        suit = (flushed.bit_length() - 4) >> 2
+        mask = 0
+        for c in cards:
+            if c & 3 == suit:
+                mask |= CARD_RANK_BIT[c]
+        return flush[mask]
+    return non_flush[product]
+
+
+class BoardEvaluator:
+    """Ranks two-card holdings against one fixed five-card board.
+
+    The board's prime product and its flush suit, if any, are computed once
+    so each holding costs two multiplies and one lookup.
+    """
+
+    __slots__ = ("_product", "_suit", "_mask", "_need", "_non_flush", "_flush")
+
+    def __init__(self, board: Sequence[int]):
+        if _flush is None:
+            build_tables()
+        self._non_flush, self._flush = _non_flush, _flush
+        product = 1
+        suits = SUIT_BASE
+        for c in board:
+            product *= CARD_PRIME[c]
+            suits += CARD_SUIT_ADD[c]
+        self._product = product
+        # Five cards hold three of at most one suit, the only suit a holding
+        # can complete a flush in; -1 when there is none
+        flushed = (suits + 0x2222) & FLUSH_BITS
+        self._suit = suit = (flushed.bit_length() - 4) >> 2 if flushed else -1
+        self._mask = 0
+        self._need = 0
+        if flushed:
+            for c in board:
+                if c & 3 == suit:
+                    self._mask |= CARD_RANK_BIT[c]
+            self._need = 5 - self._mask.bit_count()
+
+    def rank(self, first: int, second: int) -> int:
+        suit = self._suit
+        if suit >= 0 and (first & 3 == suit) + (second & 3 == suit) >= self._need:
+            mask = self._mask
+            if first & 3 == suit:
+                mask |= CARD_RANK_BIT[first]
+            if second & 3 == suit:
+                mask |= CARD_RANK_BIT[second]
+            return self._flush[mask]
+        return self._non_flush[self._product * CARD_PRIME[first] * CARD_PRIME[second]]
+
+    def rank_all(
+        self, holdings: Dict[int, Tuple[int, int]], seats: Iterable[int]
+    ) -> Dict[int, int]:
+        """Rank the holdings of several seats at once"""
+        non_flush = self._non_flush
+        product = self._product
+        suit = self._suit
+        prime = CARD_PRIME
+        if suit < 0:
+            ranks = {}
+            for seat in seats:
+                first, second = holdings[seat]
+                ranks[seat] = non_flush[product * prime[first] * prime[second]]
+            return ranks
+
+        ranks = {}
+        need = self._need
+        for seat in seats:
+            first, second = holdings[seat]
+            if (first & 3 == suit) + (second & 3 == suit) >= need:
+                mask = self._mask
+                if first & 3 == suit:
+                    mask |= CARD_RANK_BIT[first]
+                if second & 3 == suit:
+                    mask |= CARD_RANK_BIT[second]
+                ranks[seat] = self._flush[mask]
+            else:
+                ranks[seat] = non_flush[product * prime[first] * prime[second]]
+        return ranks
+
+
+def category(value: int) -> int:
+    return value >> 20
+
+
+def describe(value: int) -> str:
+    return CATEGORY_NAMES[value >> 20]
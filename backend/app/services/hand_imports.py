@@ -0,0 +1,86 @@
+"""Progress of hand history imports.
+
+``POST /api/hands/import`` reads its upload as it arrives, so a large file can
+take minutes. Each upload registers an ``ImportProgress`` here that the handler
+updates batch by batch; ``GET /api/hands/imports`` shows running imports and
+the most recent finished ones while the upload is still in flight.
+"""
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+MAX_ERRORS = 1000
+
+
+class ImportProgress:
+    """Counters and the first ``MAX_ERRORS`` per-hand errors of one upload"""
+
+    def __init__(self, name: str):
+        self.id = str(uuid.uuid4())
+        self.name = name
+        self.status = "running"
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.bytes_read = 0
+        self.hands = 0
+        self.accepted = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+        self.failure: Optional[str] = None
+
+    def reject(self, reference: str, line: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append({"hand": reference, "line": line, "error": error})
+
+    def finish(self, failure: Optional[str] = None) -> None:
+        self.status = "failed" if failure else "done"
+        self.failure = failure
+        self.finished = time.time()
+
+    def stats(self, errors: bool = True) -> dict:
+        elapsed = (self.finished or time.time()) - self.started
+        stats = {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "seconds": round(elapsed, 3),
+            "bytes": self.bytes_read,
+            "hands": self.hands,
+            "accepted": self.accepted,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+            "hands_per_sec": round(self.hands / elapsed, 1) if elapsed else 0.0,
+            "failure": self.failure,
+        }
+        if errors:
+            stats["errors"] = self.errors
+            stats["errors_truncated"] = self.rejected > len(self.errors)
+        return stats
+
+
+class HandImports:
+    """Running imports plus the last ``history`` finished ones"""
+
+    def __init__(self, history: Optional[int] = None, batch_size: Optional[int] = None):
+        self.history = history or int(os.getenv("HAND_IMPORT_HISTORY", "20"))
+        self.batch_size = batch_size or int(os.getenv("HAND_IMPORT_BATCH_SIZE", "500"))
+        self._imports: "OrderedDict[str, ImportProgress]" = OrderedDict()
+
+    def start(self, name: str) -> ImportProgress:
+        progress = ImportProgress(name)
+        self._imports[progress.id] = progress
+        finished = [key for key, p in self._imports.items() if p.status != "running"]
+        for key in finished[: max(0, len(finished) - self.history)]:
+            del self._imports[key]
+        return progress
+
+    def get(self, import_id: str) -> Optional[ImportProgress]:
+        return self._imports.get(import_id)
+
+    def list(self) -> List[ImportProgress]:
+        """Newest first"""
+        return list(reversed(self._imports.values()))
@@ -0,0 +1,127 @@
+"""Idempotent hand submission.
+
+Clients retry ``POST /api/hands`` on timeouts, so every submission gets a key:
+a digest of the ``Idempotency-Key`` header when the client sends one, else a
+canonical digest of the hand itself (stakes, seats, hole cards, board and
+actions). The ``hand_keys`` table (migration 0007) stores each key with the
+response it got, and its primary key decides which submission wins, so a
+retry is never stored twice. ``RecentHandKeys`` sits in front of it and
+answers recent retries without settling again, including a retry that
+arrives while the original is still being settled.
+"""
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from ..domain.hand import Hand
+
+MAX_HEADER_LENGTH = 255
+
+
+def header_key(value: str, index: Optional[int] = None) -> bytes:
+    """Key for a client's Idempotency-Key; batch hands add their index"""
+    if index is not None:
+        value = f"{value}\0{index}"
+    return hashlib.sha256(b"header\0" + value.encode()).digest()
+
+
+def content_key(hand: Hand) -> bytes:
+    """Key for what was dealt and played, whatever the JSON key order"""
+    # Plain tuples: orjson encodes them about twice as fast as the dataclasses
+    canonical = orjson.dumps([
+        hand.bb_size,
+        [(s.seat, s.name, s.starting_stack, s.role) for s in hand.seats],
+        sorted((str(seat), cards) for seat, cards in hand.hole_cards.items()),
+        (hand.board.flop, hand.board.turn, hand.board.river),
+        [(a.seat, a.street, a.type, a.amount) for a in hand.actions],
+    ])
+    return hashlib.sha256(b"content\0" + canonical).digest()
+
+
+class RecentHandKeys:
+    """Bounded LRU of recent keys and their responses, plus keys being settled"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+        self._entries: "OrderedDict[bytes, dict]" = OrderedDict()
+        self._pending: Dict[bytes, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get(self, key: bytes) -> Optional[dict]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: bytes, response: dict) -> None:
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def claim(self, key: bytes) -> Optional[dict]:
+        """The response recorded for a key, or None once the caller owns it.
+
+        A key still being settled by another request is waited for. The owner
+        must call ``finish`` with the outcome.
+        """
+        while True:
+            response = self.get(key)
+            if response is not None:
+                return response
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = asyncio.get_running_loop().create_future()
+                return None
+            self.waits += 1
+            # Shielded so a cancelled retry does not cancel the owner's future;
+            # None means the owner failed, so try to take the key over
+            response = await asyncio.shield(pending)
+            if response is not None:
+                return response
+
+    def claim_nowait(self, key: bytes) -> Tuple[Optional[dict], bool]:
+        """The response recorded for a key and whether the caller now owns it, without waiting.
+
+        A key another request is settling is neither answered nor owned. Batches
+        use this so two of them never wait on each other's keys; they settle the
+        hand and let the ``hand_keys`` insert decide.
+        """
+        response = self.get(key)
+        if response is not None:
+            return response, False
+        if key in self._pending:
+            return None, False
+        self._pending[key] = asyncio.get_running_loop().create_future()
+        return None, True
+
+    def finish(self, key: bytes, response: Optional[dict]) -> None:
+        """Record the response, or None when the submission failed"""
+        pending = self._pending.pop(key, None)
+        if response is not None:
+            self.put(key, response)
+        if pending is not None and not pending.done():
+            pending.set_result(response)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "pending": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "waits": self.waits,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,126 @@
+"""Hands played live, one action at a time.
+
+Each open hand keeps its ``GameState``, so every action is checked and applied
+in constant time no matter how long the hand runs. Open hands live in an
+LRU keyed by hand id, which lets a dropped connection resume its hand and lets
+idle hands expire after ``idle_seconds``. A hand is attached to one connection
+at a time; it can only be resumed once that connection has let go of it.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from ..domain.action import GameState
+from ..domain.hand import Action, Board, Hand, utc_now
+from .replay import state_view
+
+
+class TableLimitReached(Exception):
+    """Every live table slot is taken by a hand that has not gone idle"""
+
+
+class LiveTable:
+    """One hand in progress: its table setup, actions so far and betting state"""
+
+    __slots__ = ("hand", "state", "touched", "owner")
+
+    def __init__(self, hand: Hand):
+        self.hand = hand
+        self.state = GameState(hand.seats, hand.bb_size)
+        self.touched = time.monotonic()
+        self.owner: Optional[object] = None
+
+    def attach(self, owner: object) -> bool:
+        """Give the hand to ``owner`` (a connection); False while another one holds it"""
+        if self.owner is not None and self.owner is not owner:
+            return False
+        self.owner = owner
+        return True
+
+    def detach(self, owner: object) -> None:
+        if self.owner is owner:
+            self.owner = None
+
+    def act(self, action: Action) -> int:
+        """Apply the next action, raising ActionError when it is illegal; returns its index"""
+        index = len(self.hand.actions)
+        self.state.apply(action, index)
+        self.hand.actions.append(action)
+        return index
+
+    def deal(self, board: Board) -> None:
+        """Record newly dealt board cards; streets not given are left as they were"""
+        current = self.hand.board
+        self.hand.board = Board(
+            board.flop or current.flop,
+            board.turn or current.turn,
+            board.river or current.river,
+        )
+
+    def view(self) -> dict:
+        state = self.state
+        return {
+            "hand_id": self.hand.id,
+            "actions": len(self.hand.actions),
+            **state_view(state),
+            "complete": state.live == 1 or state.closed,
+        }
+
+    def finish(self) -> Hand:
+        """The finished hand, ready to settle; raises ActionError while betting is open"""
+        self.state.finish(len(self.hand.actions))
+        self.hand.created_at = utc_now()
+        return self.hand
+
+
+class LiveTableRegistry:
+    """Open live hands by id, least recently used first"""
+
+    def __init__(self, max_tables: Optional[int] = None, idle_seconds: Optional[float] = None):
+        self.max_tables = max_tables or int(os.getenv("LIVE_TABLES_MAX", "10000"))
+        self.idle_seconds = idle_seconds or float(os.getenv("LIVE_TABLE_IDLE_SECONDS", "900"))
+        self._tables: "OrderedDict[str, LiveTable]" = OrderedDict()
+
+        self.opened = 0
+        self.finished = 0
+        self.expired = 0
+
+    def open(self, hand: Hand) -> LiveTable:
+        self._expire()
+        if len(self._tables) >= self.max_tables:
+            raise TableLimitReached(f"All {self.max_tables} live tables are in use")
+        table = self._tables[hand.id] = LiveTable(hand)
+        self.opened += 1
+        return table
+
+    def get(self, hand_id: str) -> Optional[LiveTable]:
+        table = self._tables.get(hand_id)
+        if table is not None:
+            table.touched = time.monotonic()
+            self._tables.move_to_end(hand_id)
+        return table
+
+    def close(self, hand_id: str, finished: bool = False) -> None:
+        if self._tables.pop(hand_id, None) is not None and finished:
+            self.finished += 1
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._tables:
+            table = next(iter(self._tables.values()))
+            if table.touched > cutoff:
+                break
+            self._tables.popitem(last=False)
+            self.expired += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "open": len(self._tables),
+            "max_tables": self.max_tables,
+            "idle_seconds": self.idle_seconds,
+            "opened": self.opened,
+            "finished": self.finished,
+            "expired": self.expired,
+        }
+
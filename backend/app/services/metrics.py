@@ -0,0 +1,219 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Observing a value is a bisect and three additions. Stage timings are taken as
+
+    started = metrics.now()
+    ...
+    SOME_HISTOGRAM.observe_since(started)
+
+so switching tracing off at runtime (``metrics.enabled = False``) reduces each
+timing point to a single attribute check.
+"""
+import bisect
+import functools
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers microsecond stages up to slow database round trips
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def observe_since(self, started: float) -> None:
+        """Record the time since ``started``; a zero start means tracing was off"""
+        if started:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], HistogramChild] = {}
+
+    def labels(self, *values: str) -> HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = HistogramChild(self.bounds)
+        return child
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {child.sum}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {child.count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and the runtime tracing switch"""
+
+    def __init__(self):
+        self.enabled = os.getenv("METRICS_ENABLED", "1") != "0"
+        self._metrics: List = []
+
+    def now(self) -> float:
+        """Start time for observe_since, or 0 while tracing is off"""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(histogram)
+        return histogram
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        counter = Counter(name, documentation, labelnames)
+        self._metrics.append(counter)
+        return counter
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """Prometheus text format; ``gauges`` maps name to (help, value)"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, (documentation, value) in sorted((gauges or {}).items()):
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "poker_stage_seconds", "Time spent in each hand processing stage", ["stage"]
+)
+REPOSITORY_SECONDS = metrics.histogram(
+    "poker_repository_seconds", "Time spent in each repository method", ["method"]
+)
+DB_ACQUIRE_SECONDS = metrics.histogram(
+    "poker_db_acquire_seconds", "Time waiting for a pooled database connection"
+)
+REQUEST_SECONDS = metrics.histogram(
+    "poker_request_seconds", "HTTP request latency by route", ["method", "route"]
+)
+REQUESTS_TOTAL = metrics.counter(
+    "poker_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+)
+
+
+def timed(child: HistogramChild) -> Callable:
+    """Time an async method into ``child`` while tracing is on"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = metrics.now()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                child.observe_since(started)
+        return wrapper
+    return decorator
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests by matched route and status.
+
+    ``on_first_success`` is called once, after the first response below 400.
+    """
+
+    def __init__(self, app, on_first_success: Optional[Callable[[], None]] = None):
+        self.app = app
+        self.on_first_success = on_first_success
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUESTS_TOTAL.inc(scope["method"], path, str(status))
+            if self.on_first_success is not None and status < 400:
+                self.on_first_success()
+                self.on_first_success = None
+            if metrics.enabled:
+                REQUEST_SECONDS.labels(scope["method"], path).observe(
+                    time.perf_counter() - started
+                )
@@ -0,0 +1,107 @@
+"""All-in EV sampled after the response.
+
+Multiway preflop all-ins have no equity table to look up, and sampling their
+runouts takes milliseconds, so settlement returns their ``ev_result`` as
+pending. The create endpoints answer with ``ev_pending: true`` and hand those
+hands to ``PendingEv``, which samples them on the settlement executor once the
+response is out and stores the outcome with the hand. Until then the hand is
+reported as pending; ``GET /api/hands/{id}/ev`` reads the outcome from here
+while the hand is among the last ``max_entries`` scheduled, and from the stored
+hand after that.
+"""
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from ..domain.hand import Hand
+from ..repository.hands_repo import HandsRepository
+from .settlement_pool import SettlementExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class PendingEv:
+    """Sampled EV by hand id, None while sampling, plus the tasks doing it"""
+
+    def __init__(
+        self,
+        hands_repo: Optional[HandsRepository] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.hands_repo = hands_repo
+        self.max_entries = max_entries or int(os.getenv("ALL_IN_EV_CACHE_SIZE", "10000"))
+        self._results: "OrderedDict[str, Optional[Dict[int, float]]]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.sampled = 0
+        self.failed = 0
+
+    def schedule(self, executor: SettlementExecutor, hands: List[Hand]) -> None:
+        """Start sampling settled hands whose ``ev_result`` was pending"""
+        if not hands:
+            return
+        for hand in hands:
+            self._put(hand.id, None)
+        task = asyncio.create_task(self._sample(executor, hands))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _sample(self, executor: SettlementExecutor, hands: List[Hand]) -> None:
+        try:
+            results = await executor.sampled_ev(hands)
+        except Exception as e:
+            logger.warning("Sampling all-in EV of %d hands failed: %s", len(hands), e)
+            results = [None] * len(hands)
+        sampled = []
+        for hand, ev_result in zip(hands, results):
+            if ev_result is None:
+                self.failed += 1
+                self._results.pop(hand.id, None)
+            else:
+                # A hand still queued for a write-behind flush is stored with it
+                hand.ev_result = ev_result
+                sampled.append(hand)
+        if sampled and self.hands_repo is not None:
+            try:
+                await self.hands_repo.save_ev_results(sampled)
+            except Exception as e:
+                logger.warning("Storing all-in EV of %d hands failed: %s", len(sampled), e)
+        # Pending until stored, so a read in between does not cache the hand without it
+        for hand in sampled:
+            self.sampled += 1
+            self._put(hand.id, hand.ev_result)
+
+    def _put(self, hand_id: str, ev_result: Optional[Dict[int, float]]) -> None:
+        self._results[hand_id] = ev_result
+        self._results.move_to_end(hand_id)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def sampling(self, hand_id: str) -> bool:
+        """Whether the hand's EV is still being sampled here"""
+        return hand_id in self._results and self._results[hand_id] is None
+
+    def get(self, hand_id: str) -> Optional[dict]:
+        """The hand's sampled EV or that it is still pending; None when not known here"""
+        if hand_id not in self._results:
+            return None
+        ev_result = self._results[hand_id]
+        return {"id": hand_id, "ev_result": ev_result, "ev_pending": ev_result is None}
+
+    async def stop(self) -> None:
+        """Cancel sampling still running"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._results),
+            "max_entries": self.max_entries,
+            "running": len(self._tasks),
+            "sampled": self.sampled,
+            "failed": self.failed,
+        }
@@ -0,0 +1,93 @@
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Optional
+
+from ..domain.hand import Hand
+
+AGGRESSIVE = {"b", "r", "allin"}
+VOLUNTARY = {"c", "b", "r", "allin"}
+
+
+@dataclass
+class PlayerStats:
+    """Additive per-player counters; ratios are derived when read"""
+    hands_played: int = 0
+    vpip_hands: int = 0
+    pfr_hands: int = 0
+    postflop_aggressive: int = 0
+    postflop_calls: int = 0
+    showdowns: int = 0
+    net_result: int = 0
+
+    def merge(self, other: "PlayerStats") -> None:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def as_dict(self) -> dict:
+        hands = self.hands_played or 1
+        return {
+            "hands_played": self.hands_played,
+            "vpip": self.vpip_hands / hands,
+            "pfr": self.pfr_hands / hands,
+            "af": (
+                self.postflop_aggressive / self.postflop_calls
+                if self.postflop_calls else None
+            ),
+            "showdowns": self.showdowns,
+            "net_result": self.net_result,
+            "vpip_hands": self.vpip_hands,
+            "pfr_hands": self.pfr_hands,
+            "postflop_aggressive": self.postflop_aggressive,
+            "postflop_calls": self.postflop_calls,
+        }
+
+
+STAT_COLUMNS = tuple(field.name for field in fields(PlayerStats))
+
+
+def hand_player_stats(hand: Hand) -> Dict[str, PlayerStats]:
+    """Counters contributed by one settled hand, keyed by player name"""
+    by_seat = {seat.seat: PlayerStats(hands_played=1) for seat in hand.seats}
+    folded = set()
+    for action in hand.actions:
+        stats = by_seat.get(action.seat)
+        if stats is None:
+            continue
+        if action.type == "f":
+            folded.add(action.seat)
+        elif action.street == "preflop":
+            if action.type in VOLUNTARY:
+                stats.vpip_hands = 1
+            if action.type in AGGRESSIVE:
+                stats.pfr_hands = 1
+        elif action.type in AGGRESSIVE:
+            stats.postflop_aggressive += 1
+        elif action.type == "c":
+            stats.postflop_calls += 1
+
+    live = [seat for seat in by_seat if seat not in folded]
+    result = {int(seat): amount for seat, amount in hand.result.items()}
+    for seat, stats in by_seat.items():
+        stats.net_result = result.get(seat, 0)
+        if len(live) > 1 and seat in live:
+            stats.showdowns = 1
+
+    totals: Dict[str, PlayerStats] = {}
+    for seat in hand.seats:
+        if seat.name in totals:
+            totals[seat.name].merge(by_seat[seat.seat])
+        else:
+            totals[seat.name] = by_seat[seat.seat]
+    return totals
+
+
+def aggregate_player_stats(
+    hands: Iterable[Hand], into: Optional[Dict[str, PlayerStats]] = None
+) -> Dict[str, PlayerStats]:
+    totals = into if into is not None else {}
+    for hand in hands:
+        for name, stats in hand_player_stats(hand).items():
+            if name in totals:
+                totals[name].merge(stats)
+            else:
+                totals[name] = stats
+    return totals
@@ -0,0 +1,88 @@
+"""Heads-up preflop equity for every pair of starting hands, memory-mapped.
+
+File layout (little endian):
+
+    4 bytes   magic b"PFEQ"
+    u16       version
+    u16       reserved
+    u32       runouts sampled per matchup (0 when enumerated exactly)
+    u16 * N   equity of the lower-indexed hand, scaled to 0-65535, for every
+              pair of starting hands i < j in triangular order
+
+Starting hands are indexed 0-1325 in colex order of their two cards, so a
+lookup is two index calculations and one array read. The file is written by
+``python -m app.commands.build_preflop_equity``.
+"""
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PFEQ"
+VERSION = 1
+COMBOS = 1326
+PAIRS = COMBOS * (COMBOS - 1) // 2
+SCALE = 0xFFFF
+
+HEADER = struct.Struct("<4sHHI")
+DEFAULT_PATH = Path(__file__).resolve().parents[2] / "data" / "preflop_equity.bin"
+
+
+def combo_index(first: int, second: int) -> int:
+    """Index 0-1325 of a two-card starting hand"""
+    low, high = (first, second) if first < second else (second, first)
+    return high * (high - 1) // 2 + low
+
+
+def pair_index(low: int, high: int) -> int:
+    """Position of the combo pair ``low < high`` in the triangular table"""
+    return low * (2 * COMBOS - low - 1) // 2 + high - low - 1
+
+
+class PreflopEquityTable:
+    """Read-only view over a preflop equity file"""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.samples = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} preflop equity table")
+        if len(self._mmap) != HEADER.size + PAIRS * 2:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated")
+        self._values = memoryview(self._mmap)[HEADER.size:].cast("H")
+
+    def equity(self, first: Sequence[int], second: Sequence[int]) -> float:
+        """All-in equity of ``first`` against ``second``; ties count half"""
+        a = combo_index(first[0], first[1])
+        b = combo_index(second[0], second[1])
+        if a < b:
+            return self._values[pair_index(a, b)] / SCALE
+        return 1 - self._values[pair_index(b, a)] / SCALE
+
+    def close(self) -> None:
+        self._values.release()
+        self._mmap.close()
+
+
+_table: Optional[PreflopEquityTable] = None
+_loaded = False
+
+
+def preflop_table() -> Optional[PreflopEquityTable]:
+    """The shared table from PREFLOP_EQUITY_PATH, mapped on first use; None when absent"""
+    global _table, _loaded
+    if not _loaded:
+        _loaded = True
+        path = Path(os.getenv("PREFLOP_EQUITY_PATH", str(DEFAULT_PATH)))
+        try:
+            _table = PreflopEquityTable(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Preflop equity table unavailable, sampling instead: %s", e)
+    return _table
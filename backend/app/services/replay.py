@@ -0,0 +1,138 @@
+"""Street-by-street table state for stored hands.
+
+Snapshots are built lazily and memoized per hand. ``GameState`` copies are
+kept every ``checkpoint_interval`` actions, so any single step is reached by
+replaying at most that many actions.
+"""
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from ..domain.action import GameState
+from ..domain.hand import Hand
+
+
+def state_view(state: GameState) -> dict:
+    """Street, pot, stacks, commitments, seat to act and folds of a betting state"""
+    return {
+        "street": state.street,
+        "pot": state.pot,
+        "stacks": dict(state.stacks),
+        "committed": dict(state.committed),
+        "to_act": state.current_player,
+        "folded": sorted(state.folded),
+    }
+
+
+class HandReplay:
+    """Memoized snapshots of one hand after the blinds and after each action"""
+
+    def __init__(self, hand: Hand, checkpoint_interval: int = 8):
+        self.hand = hand
+        self.checkpoint_interval = checkpoint_interval
+        self.steps = len(hand.actions) + 1
+        self._checkpoints: Dict[int, GameState] = {0: GameState(hand.seats, hand.bb_size)}
+        self._snapshots: List[Optional[dict]] = [None] * self.steps
+
+    def snapshot(self, step: int) -> dict:
+        """State after ``step`` actions; step 0 is the table after the blinds"""
+        cached = self._snapshots[step]
+        if cached is not None:
+            return cached
+        base = step - step % self.checkpoint_interval
+        while base not in self._checkpoints:
+            base -= self.checkpoint_interval
+        state = self._checkpoints[base].copy()
+        for index in range(base, step):
+            self._advance(state, index)
+        snapshot = self._snapshots[step] = self._describe(state, step)
+        return snapshot
+
+    def snapshots(self) -> List[dict]:
+        """Every snapshot, filled in one forward pass"""
+        if any(snapshot is None for snapshot in self._snapshots):
+            state = self._checkpoints[0].copy()
+            for step in range(self.steps):
+                if step:
+                    self._advance(state, step - 1)
+                if self._snapshots[step] is None:
+                    self._snapshots[step] = self._describe(state, step)
+        return self._snapshots  # type: ignore[return-value]
+
+    def _advance(self, state: GameState, index: int) -> None:
+        state.apply(self.hand.actions[index], index)
+        step = index + 1
+        if step % self.checkpoint_interval == 0 and step not in self._checkpoints:
+            self._checkpoints[step] = state.copy()
+
+    def _describe(self, state: GameState, step: int) -> dict:
+        action = self.hand.actions[step - 1] if step else None
+        # Once the betting closes with players left, the rest of the board runs out
+        dealt = 3 if state.closed and state.live > 1 else state.street_index
+        board = self.hand.board
+        return {
+            "step": step,
+            "action": (
+                {
+                    "seat": action.seat,
+                    "street": action.street,
+                    "type": action.type,
+                    "amount": action.amount,
+                }
+                if action else None
+            ),
+            **state_view(state),
+            "board": {
+                "flop": board.flop if dealt >= 1 else None,
+                "turn": board.turn if dealt >= 2 else None,
+                "river": board.river if dealt >= 3 else None,
+            },
+        }
+
+
+class ReplayCache:
+    """Entry-bounded LRU of HandReplay objects keyed by hand id"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        checkpoint_interval: Optional[int] = None,
+    ):
+        self.max_entries = max_entries or int(os.getenv("REPLAY_CACHE_MAX_ENTRIES", "1000"))
+        self.checkpoint_interval = checkpoint_interval or int(
+            os.getenv("REPLAY_CHECKPOINT_INTERVAL", "8")
+        )
+        self._entries: "OrderedDict[str, HandReplay]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, hand_id: str) -> Optional[HandReplay]:
+        replay = self._entries.get(hand_id)
+        if replay is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(hand_id)
+        self.hits += 1
+        return replay
+
+    def load(self, hand_id: str, hand: Hand) -> HandReplay:
+        """Start memoizing a replay of ``hand``"""
+        replay = HandReplay(hand, self.checkpoint_interval)
+        self._entries[hand_id] = replay
+        self._entries.move_to_end(hand_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return replay
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "checkpoint_interval": self.checkpoint_interval,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,20 +1,206 @@
-from typing import Dict, List, Tuple
-import pokerkit
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..domain.action import POSITION_ORDER, GameState, replay
+from ..domain.cards import DealtCards, format_cards
 from ..domain.hand import Hand, PlayerSnapshot, Action, Board
+from .all_in_ev import expected_winnings, needs_sampling
+from .evaluator import BoardEvaluator
+from .metrics import STAGE_SECONDS, metrics
+from .preflop_equity import PreflopEquityTable, preflop_table
+
+_VALIDATE_SECONDS = STAGE_SECONDS.labels("validate")
+_SETTLE_SECONDS = STAGE_SECONDS.labels("settle")
+_SHORT_LINE_SECONDS = STAGE_SECONDS.labels("short_line")
+_EV_SECONDS = STAGE_SECONDS.labels("ev")
+
+# Board cards already dealt when betting closes on each street
+_KNOWN_BOARD = (0, 3, 4)
+
+
+def award_pots(
+    committed: Dict[int, int],
+    live: Sequence[int],
+    ranks: Dict[int, int],
+) -> Dict[int, int]:
+    """Split main and side pots between live seats, returning chips won per seat.
+
+    ``live`` lists the seats still in the hand in position order and
+    ``ranks`` holds their hand values (higher wins).
+    """
+    won = dict.fromkeys(committed, 0)
+    cap = committed[live[0]]
+    for seat in live:
+        if committed[seat] != cap:
+            return _award_side_pots(won, committed, committed.values(), live, ranks)
+
+    # No side pots, the usual showdown: one pot up to the live commitment,
+    # then any folded overbet above it, split the same way as side pots are.
+    # Plain loops: this runs for nearly every showdown
+    best = -1
+    winners: List[int] = []
+    for seat in live:
+        rank = ranks[seat]
+        if rank > best:
+            best = rank
+            winners = [seat]
+        elif rank == best:
+            winners.append(seat)
+    pot = 0
+    dead = 0
+    for amount in committed.values():
+        if amount > cap:
+            pot += cap
+            dead += amount - cap
+        else:
+            pot += amount
+    _split(won, winners, pot)
+    if dead:
+        _split(won, winners, dead)
+    return won
+
+
+def _award_side_pots(
+    won: Dict[int, int],
+    committed: Dict[int, int],
+    amounts: Iterable[int],
+    live: Sequence[int],
+    ranks: Dict[int, int],
+) -> Dict[int, int]:
+    """Main and side pots for live seats with different commitments"""
+    # Largest first, so the sums below stop at the first amount already paid out
+    amounts = sorted(amounts, reverse=True)
+    top = amounts[0]
+    # Best hand first, equal hands deepest first
+    scored = sorted([(ranks[seat], committed[seat], seat) for seat in live], reverse=True)
+    last = len(scored) - 1
+    taken = 0
+    winners: List[int] = []
+    for i, (rank, cap, seat) in enumerate(scored):
+        if cap <= taken:
+            # Covered by the better hands already paid
+            continue
+        if i < last and scored[i + 1][0] == rank and scored[i + 1][1] > taken:
+            contenders = [s for s in live if committed[s] > taken]
+            winners = [s for s in contenders if ranks[s] == rank]
+            taken = _award_levels(won, committed, amounts, contenders, ranks, taken)
+            break
+
+        # A sole best hand wins every pot up to its own commitment; whatever
+        # lies above is contested by the deeper stacks that remain
+        pot = 0
+        for amount in amounts:
+            if amount <= taken:
+                break
+            pot += (cap if amount > cap else amount) - taken
+        won[seat] += pot
+        taken = cap
+        winners = [seat]
+        if taken >= top:
+            break
+
+    # Chips above the deepest live commitment (folded overbets) join the top pot
+    dead = 0
+    for amount in amounts:
+        if amount <= taken:
+            break
+        dead += amount - taken
+    if dead:
+        _split(won, winners, dead)
+    return won
+
+
+def _award_levels(
+    won: Dict[int, int],
+    committed: Dict[int, int],
+    amounts: List[int],
+    contenders: List[int],
+    ranks: Dict[int, int],
+    previous: int,
+) -> int:
+    """Level-by-level side pots above ``previous``; used when hands tie"""
+    order = sorted(contenders, key=committed.__getitem__)
+    for i, seat in enumerate(order):
+        level = committed[seat]
+        if level == previous:
+            continue
+        pot = 0
+        for amount in amounts:
+            if amount > previous:
+                pot += (level if amount > level else amount) - previous
+        previous = level
+        eligible = order[i:]
+        best = max(ranks[s] for s in eligible)
+        winners = [s for s in eligible if ranks[s] == best]
+        if len(winners) > 1:
+            winners.sort(key=contenders.index)
+        _split(won, winners, pot)
+    return previous
+
+
+def settle_showdown(
+    board: Sequence[int],
+    holdings: Dict[int, Tuple[int, int]],
+    committed: Dict[int, int],
+    live: Sequence[int],
+) -> Dict[int, int]:
+    """Rank live holdings on a complete board and award the pots"""
+    ranks = BoardEvaluator(board).rank_all(holdings, live)
+    return award_pots(committed, live, ranks)
+
+
+def _split(won: Dict[int, int], winners: List[int], pot: int) -> None:
+    if len(winners) == 1:
+        won[winners[0]] += pot
+        return
+    share, odd = divmod(pot, len(winners))
+    for i, seat in enumerate(winners):
+        won[seat] += share + 1 if i < odd else share
 
 
 class SettlementService:
-    """Service for settling poker hands using pokerkit"""
-    
-    def validate_and_settle_hand(self, hand: Hand) -> Tuple[Dict[int, int], str]:
-        """Validate hand and settle it, returning winnings and short line"""
-        self._validate_hand(hand)
-        winnings = self._settle_hand(hand)
-        short_line = self._generate_short_line(hand)
-        return winnings, short_line
+    """Service for validating and settling poker hands"""
+
+    def __init__(
+        self,
+        equity_table: Optional[PreflopEquityTable] = None,
+        ev_samples: Optional[int] = None,
+    ):
+        self.equity_table = equity_table or preflop_table()
+        self.ev_samples = ev_samples or int(os.getenv("ALL_IN_EV_SAMPLES", "2000"))
+
+    def validate_and_settle_hand(
+        self, hand: Hand
+    ) -> Tuple[Dict[int, int], str, Optional[Dict[int, float]]]:
+        """Validate hand and settle it, returning winnings, short line and all-in EV.
+
+        The EV is None when it needs sampled runouts; ``sampled_ev`` computes it.
+        """
+        started = metrics.now()
+        state, dealt = self._validate_hand(hand)
+        _VALIDATE_SECONDS.observe_since(started)
+
+        started = metrics.now()
+        winnings = self._settle_hand(hand, state, dealt)
+        _SETTLE_SECONDS.observe_since(started)
+
+        started = metrics.now()
+        short_line = self._generate_short_line(hand, dealt)
+        _SHORT_LINE_SECONDS.observe_since(started)
+
+        started = metrics.now()
+        ev_result = self._ev_result(state, winnings, dealt, hand.id)
+        _EV_SECONDS.observe_since(started)
+        return winnings, short_line, ev_result
+
+    def sampled_ev(self, hand: Hand) -> Dict[int, float]:
+        """All-in EV of a hand whose settlement left it pending, from sampled runouts"""
+        state, dealt = self._validate_hand(hand)
+        winnings = self._settle_hand(hand, state, dealt)
+        return self._ev_result(state, winnings, dealt, hand.id, sample=True)  # type: ignore[return-value]
     
-    def _validate_hand(self, hand: Hand) -> None:
-        """Validate hand structure and actions"""
+    def _validate_hand(self, hand: Hand) -> Tuple[GameState, DealtCards]:
+        """Validate hand structure, cards and actions"""
         # Validate 6 players
         if len(hand.seats) != 6:
             raise ValueError("Hand must have exactly 6 players")
@@ -24,86 +210,126 @@ class SettlementService:
         required_roles = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
         if sorted(roles) != sorted(required_roles):
             raise ValueError("Invalid player roles")
+
+        if sorted(seat.seat for seat in hand.seats) != list(range(6)):
+            raise ValueError("Seats must be numbered 0-5")
         
         # Validate blind postings - we'll assume blinds are posted correctly
         # since we don't track committed amounts in PlayerSnapshot
         pass
         
+        # Parse every card once; settlement and the short line reuse the result
+        dealt = hand.dealt()
+
         # Validate actions
-        self._validate_actions(hand)
-        
-        # Validate board consistency
-        self._validate_board(hand)
+        return self._validate_actions(hand), dealt
     
-    def _validate_actions(self, hand: Hand) -> None:
-        """Validate action legality - simplified validation"""
-        # Basic validation - check that actions are reasonable
+    def _validate_actions(self, hand: Hand) -> GameState:
+        """Replay the betting in one pass; raises ActionError at the first illegal action"""
+        return replay(hand.seats, hand.bb_size, hand.actions)
+    
+    def _settle_hand(
+        self,
+        hand: Hand,
+        state: Optional[GameState] = None,
+        dealt: Optional[DealtCards] = None,
+    ) -> Dict[int, int]:
+        """Settle the hand, returning each seat's net result.
+
+        A ``state`` and ``dealt`` from validation already hold the commitments,
+        folds and parsed cards.
+        """
+        stacks = {seat.seat: seat.starting_stack for seat in hand.seats}
+        order = self._position_order(hand)
+        if state is not None:
+            committed, folded = state.committed, state.folded
+        else:
+            committed = self._committed_chips(hand, stacks)
+            folded = {action.seat for action in hand.actions if action.type == "f"}
+        live = [seat for seat in order if seat not in folded]
+        if not live:
+            raise ValueError("Every player folded")
+
+        if len(live) == 1:
+            won = dict.fromkeys(committed, 0)
+            won[live[0]] = sum(committed.values())
+        else:
+            board, holdings = self._showdown_cards(dealt or hand.dealt(), live)
+            won = settle_showdown(board, holdings, committed, live)
+        return {seat: won[seat] - committed[seat] for seat in sorted(stacks)}
+
+    def _ev_result(
+        self,
+        state: GameState,
+        winnings: Dict[int, int],
+        dealt: DealtCards,
+        hand_id: str,
+        sample: bool = False,
+    ) -> Optional[Dict[int, float]]:
+        """Net result per seat with all-in pots paid out at equity.
+
+        Equal to the actual result unless betting closed before the river
+        with more than one player left, i.e. someone was all-in and called.
+        None when that takes sampled runouts and ``sample`` is off.
+        """
+        if state.street_index >= 3 or state.live < 2:
+            return dict(winnings)
+        live = [seat for seat in state.order if seat not in state.folded]
+        board, holdings = self._showdown_cards(dealt, live)
+        known = board[:_KNOWN_BOARD[state.street_index]]
+        if not sample and needs_sampling(known, live, self.equity_table):
+            return None
+        won = expected_winnings(
+            known,
+            holdings,
+            state.committed,
+            live,
+            table=self.equity_table,
+            samples=self.ev_samples,
+            seed=zlib.crc32(str(hand_id).encode()),
+        )
+        return {
+            seat: round(won[seat] - state.committed[seat], 2) for seat in winnings
+        }
+
+    def _position_order(self, hand: Hand) -> List[int]:
+        seat_by_role = {seat.role: seat.seat for seat in hand.seats}
+        return [seat_by_role[role] for role in POSITION_ORDER]
+
+    def _committed_chips(self, hand: Hand, stacks: Dict[int, int]) -> Dict[int, int]:
+        """Total chips each seat put in, including blinds"""
+        committed = dict.fromkeys(stacks, 0)
+        for seat in hand.seats:
+            if seat.role == "SB":
+                committed[seat.seat] = min(hand.bb_size // 2, seat.starting_stack)
+            elif seat.role == "BB":
+                committed[seat.seat] = min(hand.bb_size, seat.starting_stack)
+
         for action in hand.actions:
-            if action.type not in ["f", "x", "c", "b", "r", "allin"]:
-                raise ValueError(f"Invalid action type: {action.type}")
-            if action.amount < 0:
-                raise ValueError(f"Negative action amount: {action.amount}")
-            if action.seat < 0 or action.seat >= 6:
+            if action.seat not in committed:
                 raise ValueError(f"Invalid seat: {action.seat}")
-            if action.street not in ["preflop", "flop", "turn", "river"]:
-                raise ValueError(f"Invalid street: {action.street}")
-    
-    def _validate_board(self, hand: Hand) -> None:
-        """Validate board card consistency"""
-        all_cards = set()
-        
-        # Check hole cards
-        for cards_str in hand.hole_cards.values():
-            cards = cards_str.split()
-            for card in cards:
-                if card in all_cards:
-                    raise ValueError(f"Duplicate card: {card}")
-                all_cards.add(card)
-        
-        # Check board cards
-        board_cards = []
-        if hand.board.flop:
-            board_cards.extend(hand.board.flop.split())
-        if hand.board.turn:
-            board_cards.append(hand.board.turn)
-        if hand.board.river:
-            board_cards.append(hand.board.river)
-        
-        for card in board_cards:
-            if card in all_cards:
-                raise ValueError(f"Duplicate card: {card}")
-            all_cards.add(card)
-    
-    def _settle_hand(self, hand: Hand) -> Dict[int, int]:
-        """Settle hand - simplified implementation"""
-        # For now, return zero winnings for all players
-        # This is a placeholder - in a real implementation, we'd use pokerkit
-        # to properly calculate hand rankings and winnings
-        winnings = {}
-        for i in range(6):
-            winnings[i] = 0
-        
-        return winnings
-    
-    def _apply_street_actions(self, state: pokerkit.State, hand: Hand, street: str) -> None:
-        """Apply actions for a specific street"""
-        street_actions = [action for action in hand.actions if action.street == street]
-        
-        for action in street_actions:
-            if action.type == "f":  # fold
-                state.fold()
-            elif action.type == "x":  # check
-                state.check_or_call()
-            elif action.type == "c":  # call
-                state.check_or_call()
-            elif action.type == "b":  # bet
-                state.complete_bet_or_raise_to(action.amount)
-            elif action.type == "r":  # raise
-                state.complete_bet_or_raise_to(action.amount)
-            elif action.type == "allin":
-                state.complete_bet_or_raise_to(action.amount)
-    
-    def _generate_short_line(self, hand: Hand) -> str:
+            committed[action.seat] += action.amount
+
+        for seat, amount in committed.items():
+            if amount > stacks[seat]:
+                raise ValueError(
+                    f"Seat {seat} commits {amount} with a stack of {stacks[seat]}"
+                )
+        return committed
+
+    def _showdown_cards(
+        self, dealt: DealtCards, live: List[int]
+    ) -> Tuple[List[int], Dict[int, Tuple[int, int]]]:
+        if len(dealt.board) != 5:
+            raise ValueError("Showdown requires a complete board")
+        holdings = {}
+        for seat in live:
+            if seat not in dealt.holdings:
+                raise ValueError(f"Seat {seat} needs two hole cards at showdown")
+            holdings[seat] = dealt.holdings[seat]
+        return dealt.board, holdings
+
+    def _generate_short_line(self, hand: Hand, dealt: Optional[DealtCards] = None) -> str:
         """Generate canonical short line"""
         action_summary = []
         
@@ -122,12 +348,13 @@ class SettlementService:
             elif action.type == "allin":
                 action_summary.append(f"{player_name}:allin")
         
+        board = (dealt or hand.dealt()).board
         board_parts = []
-        if hand.board.flop:
-            board_parts.append(f"Flop:{hand.board.flop}")
-        if hand.board.turn:
-            board_parts.append(f"Turn:{hand.board.turn}")
-        if hand.board.river:
-            board_parts.append(f"River:{hand.board.river}")
+        if board:
+            board_parts.append(f"Flop:{format_cards(board[:3])}")
+        if len(board) > 3:
+            board_parts.append(f"Turn:{format_cards(board[3:4])}")
+        if len(board) > 4:
+            board_parts.append(f"River:{format_cards(board[4:])}")
         
         return f"{' '.join(action_summary)} {' '.join(board_parts)}".strip()
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""Settlement off the event loop.
+
+``SettlementExecutor`` runs ``SettlementService.validate_and_settle_hand``
+inline, on a thread pool, or on a process pool whose workers build the
+evaluator tables and map the preflop equity table once, when they start.
+``start`` only creates the pool; ``warm`` (run by the startup warm-up) builds
+the tables and starts process workers before the first hand needs them. At most
+``max_in_flight`` jobs run at a time; single hands are refused with
+``SettlementBusy`` rather than queued, and each job is given ``timeout``
+seconds. Batches go to the pool ``chunk_size`` hands per job so the IPC round
+trip is paid per chunk, not per hand, and hands cross the process boundary as
+plain tuples, which pickle several times faster than the slotted dataclasses.
+``sampled_ev`` runs the all-in EV that settlement left pending on the same
+workers (a thread when settling inline), waiting for slots instead of refusing.
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ..domain.hand import Action, Board, Hand, PlayerSnapshot
+from .evaluator import build_tables
+from .settlement import SettlementService
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+Settlement = Tuple[Dict[int, int], str, Optional[Dict[int, float]]]
+
+_service: Optional[SettlementService] = None
+
+
+class SettlementBusy(Exception):
+    """Every settlement slot is taken, or a job ran past its timeout"""
+
+
+def warm_worker() -> None:
+    """Pool initializer: build lookup tables before the first job arrives"""
+    global _service
+    if _service is None:
+        build_tables()
+        _service = SettlementService()
+
+
+def settle_chunk(hands: List[Hand]) -> List[Tuple[Optional[str], Optional[Settlement]]]:
+    """(error, settlement) per hand; errors travel as text so they always pickle"""
+    warm_worker()
+    outcomes: List[Tuple[Optional[str], Optional[Settlement]]] = []
+    for hand in hands:
+        try:
+            outcomes.append((None, _service.validate_and_settle_hand(hand)))
+        except ValueError as e:
+            outcomes.append((str(e), None))
+    return outcomes
+
+
+def sample_ev_chunk(hands: List[Hand]) -> List[Optional[Dict[int, float]]]:
+    """Sampled all-in EV per hand; None for a hand that does not settle"""
+    warm_worker()
+    results: List[Optional[Dict[int, float]]] = []
+    for hand in hands:
+        try:
+            results.append(_service.sampled_ev(hand))
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def _pack(hand: Hand) -> tuple:
+    board = hand.board
+    return (
+        hand.id,
+        hand.created_at,
+        hand.bb_size,
+        [(s.seat, s.name, s.starting_stack, s.role) for s in hand.seats],
+        hand.hole_cards,
+        (board.flop, board.turn, board.river),
+        [(a.seat, a.street, a.type, a.amount) for a in hand.actions],
+    )
+
+
+def _unpack(packed: tuple) -> Hand:
+    hand_id, created_at, bb_size, seats, hole_cards, board, actions = packed
+    return Hand(
+        id=hand_id,
+        created_at=created_at,
+        bb_size=bb_size,
+        seats=[PlayerSnapshot(*seat) for seat in seats],
+        hole_cards=hole_cards,
+        board=Board(*board),
+        actions=[Action(*action) for action in actions],
+        short_line="",
+        result={},
+    )
+
+
+def settle_packed(packed: List[tuple]) -> List[Tuple[Optional[str], Optional[Settlement]]]:
+    """settle_chunk for hands sent to a worker process as tuples"""
+    return settle_chunk([_unpack(hand) for hand in packed])
+
+
+def sample_ev_packed(packed: List[tuple]) -> List[Optional[Dict[int, float]]]:
+    """sample_ev_chunk for hands sent to a worker process as tuples"""
+    return sample_ev_chunk([_unpack(hand) for hand in packed])
+
+
+class SettlementExecutor:
+    """Runs settlement inline or on a bounded worker pool"""
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        timeout: Optional[float] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.mode = mode or os.getenv("SETTLEMENT_EXECUTOR", "inline")
+        if self.mode not in EXECUTOR_MODES:
+            raise ValueError(f"SETTLEMENT_EXECUTOR must be one of: {', '.join(EXECUTOR_MODES)}")
+        self.workers = workers or int(os.getenv("SETTLEMENT_WORKERS", str(os.cpu_count() or 1)))
+        self.max_in_flight = max_in_flight or int(
+            os.getenv("SETTLEMENT_MAX_IN_FLIGHT", str(self.workers * 4))
+        )
+        self.timeout = timeout or float(os.getenv("SETTLEMENT_TIMEOUT_SECONDS", "5"))
+        self.chunk_size = chunk_size or int(os.getenv("SETTLEMENT_CHUNK_SIZE", "256"))
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.jobs = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def start(self) -> None:
+        if self.mode == "process":
+            self._pool = ProcessPoolExecutor(self.workers, initializer=warm_worker)
+        elif self.mode == "thread":
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="settlement")
+
+    async def warm(self) -> None:
+        """Build the lookup tables where hands are settled, starting process workers"""
+        if self.mode != "process" or self._pool is None:
+            await asyncio.to_thread(warm_worker)
+            return
+        # Process workers spawn on demand; one job each starts them all
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, warm_worker) for _ in range(self.workers))
+        )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    @property
+    def in_flight(self) -> int:
+        if self._slots is None:
+            return 0
+        return self.max_in_flight - self._slots._value
+
+    async def settle(self, hand: Hand) -> Settlement:
+        """Settle one hand, raising ValueError when it is invalid"""
+        if self._pool is None:
+            outcomes = settle_chunk([hand])
+        else:
+            if self._semaphore().locked():
+                self.rejected += 1
+                raise SettlementBusy("Settlement workers are busy")
+            outcomes = await self._run(settle_chunk, settle_packed, [hand])
+        error, settlement = outcomes[0]
+        if error is not None:
+            raise ValueError(error)
+        return settlement  # type: ignore[return-value]
+
+    async def settle_many(self, hands: List[Hand]) -> List[Union[Settlement, ValueError]]:
+        """Settle hands in pool-sized chunks; invalid hands come back as ValueError"""
+        if self._pool is None:
+            outcomes = settle_chunk(hands)
+        else:
+            if self._semaphore().locked():
+                self.rejected += 1
+                raise SettlementBusy("Settlement workers are busy")
+            # Later chunks wait for a slot instead of failing the whole batch
+            outcomes = await self._run_chunks(settle_chunk, settle_packed, hands)
+        return [
+            ValueError(error) if error is not None else settlement
+            for error, settlement in outcomes
+        ]
+
+    async def sampled_ev(self, hands: List[Hand]) -> List[Optional[Dict[int, float]]]:
+        """All-in EV of settled hands whose ``ev_result`` was pending; None where it failed"""
+        if self._pool is None:
+            # Never on the event loop: a multiway hand samples for milliseconds
+            return await asyncio.to_thread(sample_ev_chunk, hands)
+        return await self._run_chunks(sample_ev_chunk, sample_ev_packed, hands)
+
+    async def _run_chunks(self, job: Callable, packed_job: Callable, hands: List[Hand]) -> list:
+        chunks = [
+            hands[start:start + self.chunk_size]
+            for start in range(0, len(hands), self.chunk_size)
+        ]
+        parts = await asyncio.gather(*(self._run(job, packed_job, chunk) for chunk in chunks))
+        return [outcome for part in parts for outcome in part]
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        return self._slots
+
+    async def _run(self, job: Callable, packed_job: Callable, hands: List[Hand]) -> list:
+        """``job(hands)`` on the pool, or ``packed_job`` on packed hands in worker processes"""
+        slots = self._semaphore()
+        await slots.acquire()
+        self.jobs += 1
+        loop = asyncio.get_running_loop()
+        try:
+            if self.mode == "process":
+                future = loop.run_in_executor(
+                    self._pool, packed_job, [_pack(h) for h in hands]
+                )
+            else:
+                future = loop.run_in_executor(self._pool, job, hands)
+        except BaseException:
+            # Not submitted, e.g. the pool already shut down during teardown
+            slots.release()
+            raise
+        # The slot frees when the job really ends, even after a timeout
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise SettlementBusy(f"Settlement took longer than {self.timeout:g}s") from None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self._pool is not None else 0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "timeout_seconds": self.timeout,
+            "chunk_size": self.chunk_size,
+            "jobs": self.jobs,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
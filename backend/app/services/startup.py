@@ -0,0 +1,101 @@
+"""Startup timing and warm-up.
+
+``app.main`` marks when its imports started and finished, the lifespan when the
+app was ready to serve, and the metrics middleware the first successful
+response; ``GET /health/startup`` reports them in seconds since imports began.
+
+The first settlement would otherwise pay for the evaluator's lookup tables, the
+preflop equity mapping and, with a process pool, starting the settlement
+workers. ``STARTUP_WARMUP`` decides when that happens:
+``background`` (default) in a thread while the app already serves, ``blocking``
+before the lifespan yields, so the first request is fast but readiness comes
+later, or ``off`` to leave them to the first request.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from .evaluator import build_tables
+from .preflop_equity import preflop_table
+from .settlement_pool import SettlementExecutor
+
+logger = logging.getLogger(__name__)
+
+WARMUP_MODES = ("background", "blocking", "off")
+
+
+def warm_caches() -> None:
+    """Build what the first settlement would otherwise build"""
+    build_tables()
+    preflop_table()
+
+
+class StartupTimes:
+    """Startup milestones as perf_counter readings, plus the warm-up task"""
+
+    def __init__(self):
+        self.import_started: Optional[float] = None
+        self.imported: Optional[float] = None
+        self.ready: Optional[float] = None
+        self.first_success: Optional[float] = None
+        self.warmup_mode: Optional[str] = None
+        self.warmup_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, milestone: str) -> None:
+        setattr(self, milestone, time.perf_counter())
+
+    def request_succeeded(self) -> None:
+        if self.first_success is None:
+            self.first_success = time.perf_counter()
+
+    async def warm_up(
+        self, executor: Optional[SettlementExecutor] = None, mode: Optional[str] = None
+    ) -> None:
+        """Warm caches and the executor per STARTUP_WARMUP; background warm-ups return at once"""
+        mode = mode or os.getenv("STARTUP_WARMUP", "background")
+        if mode not in WARMUP_MODES:
+            raise ValueError(f"STARTUP_WARMUP must be one of {WARMUP_MODES}")
+        self.warmup_mode = mode
+        if mode == "off":
+            return
+        self._task = asyncio.create_task(self._warm(executor))
+        if mode == "blocking":
+            await self._task
+
+    async def _warm(self, executor: Optional[SettlementExecutor]) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(warm_caches)
+            if executor is not None:
+                await executor.warm()
+        except Exception as e:
+            logger.warning("Startup warm-up failed: %s", e)
+            return
+        self.warmup_seconds = time.perf_counter() - started
+
+    async def stop(self) -> None:
+        """Wait for a background warm-up; its thread cannot be cancelled"""
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    def _since_import(self, value: Optional[float]) -> Optional[float]:
+        if value is None or self.import_started is None:
+            return None
+        return value - self.import_started
+
+    def stats(self) -> dict:
+        return {
+            "import_seconds": self._since_import(self.imported),
+            "ready_seconds": self._since_import(self.ready),
+            "first_success_seconds": self._since_import(self.first_success),
+            "warmup_mode": self.warmup_mode,
+            "warmup_seconds": self.warmup_seconds,
+            "warm": self.warmup_seconds is not None,
+        }
+
+
+startup = StartupTimes()
@@ -0,0 +1,266 @@
+"""Random but legal 6-max hands in the ``HandRequest`` shape.
+
+``HandGenerator.generate(count)`` deals cards, picks stacks, names and the
+button, and draws every decision's random numbers for a whole chunk of hands at
+once with numpy. The betting itself is a lean loop that follows the same rules
+as ``GameState`` (``app/domain/action.py``). Aggression profiles set how often
+players enter pots, bet, raise and fold to bets; ``all_in`` is the chance that
+any bet or raise is a shove instead. Boards are dealt up to the street the hand
+reached, and hole cards are shown for the players at showdown (every seat with
+``show_all``).
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.domain.cards import CARD_NAMES
+
+STREETS = ("preflop", "flop", "turn", "river")
+# Role by seat offset from the button
+ROLES_FROM_BUTTON = ("BTN", "SB", "BB", "UTG", "MP", "CO")
+MAX_RAISES = 4
+DECISIONS = 64
+
+
+@dataclass(frozen=True)
+class Profile:
+    """How a table plays; all values are probabilities"""
+
+    vpip: float  # enter an unopened pot preflop
+    aggression: float  # bet when checked to, raise when entering
+    fold_to_bet: float  # fold facing a bet or raise
+    reraise: float  # raise rather than call when not folding to a bet
+
+
+PROFILES: Dict[str, Profile] = {
+    "passive": Profile(vpip=0.35, aggression=0.15, fold_to_bet=0.35, reraise=0.05),
+    "standard": Profile(vpip=0.25, aggression=0.45, fold_to_bet=0.5, reraise=0.15),
+    "aggressive": Profile(vpip=0.4, aggression=0.7, fold_to_bet=0.4, reraise=0.3),
+}
+
+# Postflop bet sizes as a share of the pot, and preflop raise sizes in big blinds
+BET_SIZES = (0.33, 0.5, 0.75, 1.0)
+OPEN_SIZES = (2.0, 2.5, 3.0)
+
+
+class HandGenerator:
+    """Generates hands as dicts ready to post to ``/api/hands``"""
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        bb_size: int = 40,
+        stacks: Tuple[int, int] = (20, 200),
+        profile: str = "standard",
+        all_in: float = 0.02,
+        players: int = 1000,
+        show_all: bool = False,
+    ):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown profile {profile!r}; choose from {sorted(PROFILES)}")
+        if bb_size < 2 or bb_size % 2:
+            raise ValueError("bb_size must be an even number of chips")
+        if not 1 <= stacks[0] <= stacks[1]:
+            raise ValueError("Stack depths must be at least one big blind")
+        if players < 6:
+            raise ValueError("Need at least six players")
+        self.rng = np.random.default_rng(seed)
+        self.bb_size = bb_size
+        self.stacks = stacks
+        self.profile = PROFILES[profile]
+        self.all_in = all_in
+        self.players = players
+        self.show_all = show_all
+        self._names = [f"Player{i}" for i in range(players)]
+
+    def generate(self, count: int) -> List[dict]:
+        """``count`` hands, dealt and drawn together"""
+        rng = self.rng
+        # Dealing: the first 17 cards of a shuffled deck per hand
+        deck = np.argsort(rng.random((count, 52)), axis=1)[:, :17].tolist()
+        stacks = (
+            rng.integers(self.stacks[0], self.stacks[1] + 1, (count, 6)) * self.bb_size
+        ).tolist()
+        buttons = rng.integers(0, 6, count).tolist()
+        # Six distinct names per table: evenly spaced from a random start
+        stride = self.players // 6
+        names = ((rng.integers(0, self.players, count)[:, None] + np.arange(6) * stride)
+                 % self.players).tolist()
+        decisions = rng.random((count, DECISIONS)).tolist()
+        return [
+            self._hand(deck[i], stacks[i], buttons[i], names[i], decisions[i])
+            for i in range(count)
+        ]
+
+    def stream(self, count: int, chunk: int = 10_000) -> Iterator[dict]:
+        while count > 0:
+            size = min(chunk, count)
+            yield from self.generate(size)
+            count -= size
+
+    def _hand(
+        self,
+        deck: List[int],
+        stack_list: List[int],
+        button: int,
+        name_ids: List[int],
+        randoms: List[float],
+    ) -> dict:
+        bb = self.bb_size
+        profile = self.profile
+        # Positions follow POSITION_ORDER (SB first, BTN last); order maps them to seats
+        order = [(button + 1 + i) % 6 for i in range(6)]
+        stacks = [stack_list[seat] for seat in order]
+        street_bet = [0] * 6
+        committed = [0] * 6
+        folded = [False] * 6
+        all_in = [False] * 6
+        actions: List[dict] = []
+        draw = 0
+
+        def put(p: int, amount: int) -> None:
+            stacks[p] -= amount
+            committed[p] += amount
+            street_bet[p] += amount
+            if not stacks[p]:
+                all_in[p] = True
+
+        put(0, min(bb // 2, stacks[0]))
+        put(1, min(bb, stacks[1]))
+        last_raise_to = bb
+        min_raise = bb
+        raises = 0
+        street = 0
+        live = 6
+        pending = {p for p in range(6) if not all_in[p]}
+        current = _next_pending(pending, 2)
+        closed = False
+
+        while True:
+            if current is None:
+                able = [p for p in range(6) if not folded[p] and not all_in[p]]
+                if street >= 3 or len(able) < 2:
+                    closed = True
+                    break
+                street += 1
+                street_bet = [0] * 6
+                last_raise_to = 0
+                min_raise = bb
+                raises = 0
+                pending = set(able)
+                current = able[0]
+
+            p = current
+            to_call = last_raise_to - street_bet[p]
+            stack = stacks[p]
+            roll = randoms[draw % DECISIONS]
+            size_roll = randoms[(draw + 1) % DECISIONS]
+            shove_roll = randoms[(draw + 2) % DECISIONS]
+            draw += 3
+
+            kind = "x"
+            if to_call:
+                if street == 0 and raises == 0 and p != 1:
+                    # Unopened pot (limps aside): enter or fold
+                    if roll >= profile.vpip:
+                        kind = "f"
+                    elif roll < profile.vpip * profile.aggression:
+                        kind = "r"
+                    else:
+                        kind = "c"
+                elif roll < profile.fold_to_bet:
+                    kind = "f"
+                elif roll < profile.fold_to_bet + (1 - profile.fold_to_bet) * profile.reraise:
+                    kind = "r"
+                else:
+                    kind = "c"
+            elif roll < profile.aggression:
+                kind = "r" if last_raise_to else "b"
+
+            if kind in ("r", "b") and (raises >= MAX_RAISES or stack <= to_call):
+                kind = "c" if to_call else "x"
+
+            amount = 0
+            if kind == "c":
+                amount = min(to_call, stack)
+            elif kind in ("r", "b"):
+                pot = sum(committed)
+                if street == 0:
+                    # Opens in big blinds, re-raises to 2.5-3.5 times the last raise
+                    raise_to = int(
+                        OPEN_SIZES[int(size_roll * 3)] * bb if not raises
+                        else last_raise_to * (2.5 + size_roll)
+                    )
+                    size = max(raise_to - last_raise_to, min_raise)
+                else:
+                    size = max(int(pot * BET_SIZES[int(size_roll * 4)]), min_raise)
+                amount = to_call + size
+                if amount >= stack or shove_roll < self.all_in:
+                    kind, amount = "allin", stack
+
+            seat = order[p]
+            actions.append({"seat": seat, "street": STREETS[street], "type": kind, "amount": amount})
+
+            if kind == "f":
+                folded[p] = True
+                pending.discard(p)
+                live -= 1
+                if live == 1:
+                    break
+            elif amount:
+                put(p, amount)
+                bet = street_bet[p]
+                if bet > last_raise_to:
+                    able = [s for s in range(6) if not folded[s] and not all_in[s]]
+                    if bet - last_raise_to >= min_raise:
+                        min_raise = bet - last_raise_to
+                        pending = set(able)
+                        raises += 1
+                    else:
+                        pending.update(s for s in able if street_bet[s] < bet)
+                    last_raise_to = bet
+                pending.discard(p)
+            else:
+                pending.discard(p)
+            current = _next_pending(pending, p + 1)
+
+        board_streets = 3 if closed else street
+        board = {}
+        if board_streets >= 1:
+            board["flop"] = " ".join(CARD_NAMES[c] for c in deck[12:15])
+        if board_streets >= 2:
+            board["turn"] = CARD_NAMES[deck[15]]
+        if board_streets >= 3:
+            board["river"] = CARD_NAMES[deck[16]]
+
+        shown = range(6) if self.show_all else (
+            [p for p in range(6) if not folded[p]] if live > 1 else []
+        )
+        return {
+            "bb_size": bb,
+            "seats": [
+                {
+                    "seat": seat,
+                    "name": self._names[name_ids[seat]],
+                    "starting_stack": stack_list[seat],
+                    "role": ROLES_FROM_BUTTON[(seat - button) % 6],
+                }
+                for seat in range(6)
+            ],
+            "hole_cards": {
+                str(order[p]): f"{CARD_NAMES[deck[2 * order[p]]]} {CARD_NAMES[deck[2 * order[p] + 1]]}"
+                for p in shown
+            },
+            "board": board,
+            "actions": actions,
+        }
+
+
+def _next_pending(pending: set, start: int) -> Optional[int]:
+    for i in range(6):
+        p = (start + i) % 6
+        if p in pending:
+            return p
+    return None
+
@@ -0,0 +1,352 @@
+"""Synthetic hands and ingest load tests.
+
+    python -m benchmarks.loadgen generate --hands 1000000 --out hands.ndjson
+        [--workers 4] [generator options]
+    python -m benchmarks.loadgen run (--url http://localhost:8000 | --asgi)
+        [--input hands.ndjson | --hands 10000 [generator options]]
+        [--endpoint single|batch] [--batch-size 500]
+        [--concurrency 32] [--rate 0] [--no-keys] [--report report.json]
+
+Generator options: --seed, --bb-size, --stacks MIN:MAX (big blinds), --profile
+passive|standard|aggressive, --all-in (shove probability per bet or raise),
+--players (name pool) and --show-all (hole cards for every seat).
+
+``generate`` writes one ``HandRequest`` per line, using ``--workers`` processes
+for large files. ``run`` posts hands to ``/api/hands`` (one per request) or
+``/api/hands/batch`` (``--batch-size`` per NDJSON request) from
+``--concurrency`` concurrent clients, optionally paced to ``--rate`` requests
+per second. Paced runs measure latency from each request's scheduled start, so
+a server that falls behind shows up in the percentiles. ``--asgi`` drives the
+app in-process against an in-memory repository, with no network or database,
+and starts sending once the startup warm-up has finished.
+Each request carries a fresh Idempotency-Key, so replaying a file settles every
+hand again; ``--no-keys`` leaves duplicates to the content hash instead.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+import httpx
+import orjson
+
+from .generator import PROFILES, HandGenerator
+
+CHUNK = 10_000
+
+
+def _generator(args: argparse.Namespace, seed: Optional[int]) -> HandGenerator:
+    low, _, high = args.stacks.partition(":")
+    return HandGenerator(
+        seed=seed,
+        bb_size=args.bb_size,
+        stacks=(int(low), int(high or low)),
+        profile=args.profile,
+        all_in=args.all_in,
+        players=args.players,
+        show_all=args.show_all,
+    )
+
+
+def _chunk_seed(seed: Optional[int], index: int) -> Optional[int]:
+    return None if seed is None else seed * 1_000_003 + index
+
+
+def _ndjson_chunk(args: argparse.Namespace, index: int, count: int) -> bytes:
+    """One chunk of hands as NDJSON; runs in a worker process"""
+    hands = _generator(args, _chunk_seed(args.seed, index)).generate(count)
+    return b"".join(orjson.dumps(hand) + b"\n" for hand in hands)
+
+
+def _chunks(total: int) -> List[Tuple[int, int]]:
+    return [(i, min(CHUNK, total - start)) for i, start in enumerate(range(0, total, CHUNK))]
+
+
+def generate(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    chunks = _chunks(args.hands)
+    with open(args.out, "wb") as out:
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers) as pool:
+                for data in pool.map(
+                    _ndjson_chunk,
+                    [args] * len(chunks),
+                    [index for index, _ in chunks],
+                    [count for _, count in chunks],
+                ):
+                    out.write(data)
+        else:
+            for index, count in chunks:
+                out.write(_ndjson_chunk(args, index, count))
+    elapsed = time.perf_counter() - started
+    print(
+        f"wrote {args.hands:,} hands to {args.out} in {elapsed:.1f}s "
+        f"({args.hands / elapsed * 60:,.0f} hands/min)"
+    )
+    return 0
+
+
+def _hand_lines(args: argparse.Namespace) -> Iterator[bytes]:
+    if args.input:
+        with open(args.input, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield line.rstrip(b"\n")
+        return
+    for index, count in _chunks(args.hands):
+        for hand in _generator(args, _chunk_seed(args.seed, index)).generate(count):
+            yield orjson.dumps(hand)
+
+
+def _bodies(args: argparse.Namespace) -> Iterator[Tuple[bytes, int]]:
+    """(request body, hands in it) in send order"""
+    lines = _hand_lines(args)
+    if args.endpoint == "single":
+        for line in lines:
+            yield line, 1
+        return
+    batch: List[bytes] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == args.batch_size:
+            yield b"\n".join(batch), len(batch)
+            batch = []
+    if batch:
+        yield b"\n".join(batch), len(batch)
+
+
+class Report:
+    """Latency samples, status counts and error reasons for one run"""
+
+    def __init__(self):
+        self.latencies: List[int] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.hands_sent = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.replayed = 0
+        self.elapsed = 0.0
+
+    def record(self, latency_ns: int, hands: int, response: Optional[httpx.Response], error: str = "") -> None:
+        self.latencies.append(latency_ns)
+        self.hands_sent += hands
+        if response is None:
+            self.statuses["error"] += 1
+            self.errors[error] += 1
+            self.rejected += hands
+            return
+        self.statuses[str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errors[f"{response.status_code} {_detail(response)}"] += 1
+            self.rejected += hands
+        elif hands == 1 and response.status_code == 201:
+            self.accepted += 1
+            self.replayed += response.headers.get("idempotent-replayed") == "true"
+        else:
+            body = response.json()
+            self.accepted += body["accepted"]
+            self.rejected += body["rejected"]
+            self.replayed += body.get("replayed", 0)
+            for result in body["results"]:
+                if "error" in result:
+                    self.errors[f"hand: {_reason(result['error'])}"] += 1
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(requests - 1, int(requests * p))] / 1e6
+
+        return {
+            "seconds": self.elapsed,
+            "requests": requests,
+            "requests_per_sec": requests / self.elapsed if self.elapsed else 0.0,
+            "hands_sent": self.hands_sent,
+            "hands_accepted": self.accepted,
+            "hands_rejected": self.rejected,
+            "hands_replayed": self.replayed,
+            "hands_per_sec": self.accepted / self.elapsed if self.elapsed else 0.0,
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "p999": percentile(0.999),
+                "max": latencies[-1] / 1e6 if latencies else 0.0,
+            },
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors.most_common(20)),
+        }
+
+
+def _detail(response: httpx.Response) -> str:
+    try:
+        detail = response.json().get("detail")
+    except ValueError:
+        return response.text[:80]
+    if isinstance(detail, list):
+        detail = "; ".join(str(error.get("msg")) for error in detail)
+    return _reason(str(detail))
+
+
+def _reason(message: str) -> str:
+    """Error text without the action index, so equal reasons group together"""
+    if message.startswith("Action ") and ": " in message:
+        message = message.split(": ", 1)[1]
+    return message[:80]
+
+
+@asynccontextmanager
+async def _client(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    timeout = httpx.Timeout(args.timeout)
+    if not args.asgi:
+        limits = httpx.Limits(
+            max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+        )
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout) as client:
+            yield client
+        return
+
+    from app.api.dependencies import get_hands_repo
+    from app.main import app
+    from app.repository.memory_repo import InMemoryHandsRepository
+    from app.services.startup import startup
+
+    repo = InMemoryHandsRepository()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    try:
+        async with app.router.lifespan_context(app):
+            # A background warm-up would compete with the first requests
+            await startup.stop()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadgen", timeout=timeout
+            ) as client:
+                yield client
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+
+
+async def run_load(args: argparse.Namespace) -> Report:
+    report = Report()
+    bodies = _bodies(args)
+    if not args.input:
+        # Generating mid-run would stall the event loop and skew latencies
+        bodies = iter(list(bodies))
+    path = "/api/hands" if args.endpoint == "single" else "/api/hands/batch"
+    content_type = "application/json" if args.endpoint == "single" else "application/x-ndjson"
+    run_id = uuid.uuid4().hex[:12]
+    sent = 0
+
+    async with _client(args) as client:
+        started = time.perf_counter()
+        clock = time.perf_counter_ns
+        start_ns = clock()
+
+        async def worker() -> None:
+            nonlocal sent
+            for body, hands in bodies:
+                number = sent
+                sent += 1
+                scheduled = clock()
+                if args.rate:
+                    scheduled = start_ns + int(number * 1e9 / args.rate)
+                    delay = (scheduled - clock()) / 1e9
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                headers = {"Content-Type": content_type}
+                if not args.no_keys:
+                    headers["Idempotency-Key"] = f"loadgen-{run_id}-{number}"
+                try:
+                    response = await client.post(path, content=body, headers=headers)
+                except httpx.HTTPError as e:
+                    report.record(clock() - scheduled, hands, None, type(e).__name__)
+                    continue
+                report.record(clock() - scheduled, hands, response)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        report.elapsed = time.perf_counter() - started
+    return report
+
+
+def run(args: argparse.Namespace) -> int:
+    if not args.asgi and not args.url:
+        print("run needs --url or --asgi", file=sys.stderr)
+        return 2
+    summary = asyncio.run(run_load(args)).summary()
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['requests']:,} requests in {summary['seconds']:.1f}s: "
+        f"{summary['requests_per_sec']:,.0f} req/s, {summary['hands_per_sec']:,.0f} hands/s"
+    )
+    print(
+        f"hands: {summary['hands_accepted']:,} accepted ({summary['hands_replayed']:,} replayed), "
+        f"{summary['hands_rejected']:,} rejected"
+    )
+    print(
+        "latency ms: "
+        + "  ".join(f"{name} {value:.1f}" for name, value in latency.items())
+    )
+    print("statuses: " + ", ".join(f"{k}={v:,}" for k, v in sorted(summary["statuses"].items())))
+    for reason, count in summary["errors"].items():
+        print(f"  {count:>8,}  {reason}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+def _add_generator_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--hands", type=int, default=10_000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--bb-size", type=int, default=40)
+    parser.add_argument("--stacks", default="20:200", help="stack depths in big blinds, MIN:MAX")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="standard")
+    parser.add_argument("--all-in", type=float, default=0.02)
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--show-all", action="store_true")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="write hands to an NDJSON file")
+    _add_generator_options(gen)
+    gen.add_argument("--out", required=True)
+    gen.add_argument("--workers", type=int, default=1)
+
+    load = commands.add_parser("run", help="post hands to the API")
+    _add_generator_options(load)
+    target = load.add_mutually_exclusive_group()
+    target.add_argument("--url")
+    target.add_argument("--asgi", action="store_true")
+    load.add_argument("--input", help="NDJSON file from generate")
+    load.add_argument("--endpoint", choices=("single", "batch"), default="single")
+    load.add_argument("--batch-size", type=int, default=500)
+    load.add_argument("--concurrency", type=int, default=32)
+    load.add_argument("--rate", type=float, default=0, help="requests per second; 0 sends as fast as possible")
+    load.add_argument("--timeout", type=float, default=30)
+    load.add_argument("--no-keys", action="store_true")
+    load.add_argument("--report", help="write the summary as JSON")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.command == "generate":
+        return generate(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Showdown throughput benchmark for the settlement engine.
+
+    python -m benchmarks.settlement_bench [--hands 5000] [--min-rate 100000]
+
+Reports showdowns/sec for the pot-award core (``settle_showdown``), for
+the full ``SettlementService._settle_hand`` and for the betting replay that
+validates every submitted hand, per scenario, and exits non-zero when the
+core rate of any scenario falls below --min-rate.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from app.domain.action import replay
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.services.evaluator import build_tables, format_cards
+from app.services.settlement import SettlementService, settle_showdown
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+PREFLOP_ORDER = (3, 4, 5, 0, 1, 2)
+POSTFLOP_ORDER = (1, 2, 3, 4, 5, 0)
+BLINDS = {1: 20, 2: 40}
+
+
+def _hand(rnd: random.Random, index: int, stacks: List[int], actions: List[Action]) -> Hand:
+    deck = rnd.sample(range(52), 17)
+    return Hand(
+        id=str(index),
+        created_at=datetime(2024, 1, 1),
+        bb_size=40,
+        seats=[
+            PlayerSnapshot(seat, f"Player{seat}", stacks[seat], ROLES[seat])
+            for seat in range(6)
+        ],
+        hole_cards={
+            str(seat): format_cards(deck[2 * seat:2 * seat + 2])
+            for seat in range(6)
+        },
+        board=Board(
+            flop=format_cards(deck[12:15]),
+            turn=format_cards(deck[15:16]),
+            river=format_cards(deck[16:17]),
+        ),
+        actions=actions,
+        short_line="",
+        result={},
+    )
+
+
+def make_called_hands(count: int, players: int, seed: int = 7) -> List[Hand]:
+    """Showdowns where one player raises to 120, the rest call and check down"""
+    rnd = random.Random(seed)
+    hands = []
+    for i in range(count):
+        in_hand = set(rnd.sample(range(6), players))
+        raiser = next(seat for seat in PREFLOP_ORDER if seat in in_hand)
+        actions = [
+            Action(seat, "preflop", "r" if seat == raiser else "c",
+                   120 - BLINDS.get(seat, 0))
+            if seat in in_hand else Action(seat, "preflop", "f", 0)
+            for seat in PREFLOP_ORDER
+        ]
+        live = [seat for seat in POSTFLOP_ORDER if seat in in_hand]
+        for street in ("flop", "turn", "river"):
+            actions.extend(Action(seat, street, "x", 0) for seat in live)
+        hands.append(_hand(rnd, i, [1000] * 6, actions))
+    return hands
+
+
+def make_all_in_hands(count: int, seed: int = 7) -> List[Hand]:
+    """Preflop all-ins with 3-6 players and unequal stacks (side pots)"""
+    rnd = random.Random(seed)
+    hands = []
+    for i in range(count):
+        stacks = [rnd.choice((400, 800, 1000, 1500, 2000)) for _ in range(6)]
+        in_hand = set(rnd.sample(range(6), rnd.randint(3, 6)))
+        actions = [
+            Action(seat, "preflop", "allin", stacks[seat] - BLINDS.get(seat, 0))
+            if seat in in_hand else Action(seat, "preflop", "f", 0)
+            for seat in PREFLOP_ORDER
+        ]
+        hands.append(_hand(rnd, i, stacks, actions))
+    return hands
+
+
+def _rate(fn: Callable[[], None], count: int, repeat: int) -> float:
+    best = 0.0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = max(best, count / (time.perf_counter() - started))
+    return best
+
+
+def run(hands: List[Hand], repeat: int = 7) -> Dict[str, float]:
+    """Best-of-N hands per second for the core, full settlement and validation"""
+    service = SettlementService()
+    build_tables()
+
+    prepared = []
+    for hand in hands:
+        stacks = {seat.seat: seat.starting_stack for seat in hand.seats}
+        committed = service._committed_chips(hand, stacks)
+        folded = {a.seat for a in hand.actions if a.type == "f"}
+        live = [s for s in service._position_order(hand) if s not in folded]
+        board, holdings = service._showdown_cards(hand.dealt(), live)
+        prepared.append((board, holdings, committed, live))
+
+    def core() -> None:
+        for args in prepared:
+            settle_showdown(*args)
+
+    def full() -> None:
+        for hand in hands:
+            service._settle_hand(hand)
+
+    def validate() -> None:
+        for hand in hands:
+            replay(hand.seats, hand.bb_size, hand.actions)
+
+    return {
+        "settle_showdown": _rate(core, len(hands), repeat),
+        "settle_hand": _rate(full, len(hands), repeat),
+        "validate": _rate(validate, len(hands), repeat),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=5000)
+    parser.add_argument("--min-rate", type=float, default=100_000)
+    args = parser.parse_args()
+
+    scenarios = {
+        "heads_up": make_called_hands(args.hands, 2),
+        "four_way": make_called_hands(args.hands, 4),
+        "multi_all_in": make_all_in_hands(args.hands),
+    }
+    failed = False
+    for name, hands in scenarios.items():
+        rates = run(hands)
+        print(
+            f"{name:>14}: settle_showdown {rates['settle_showdown']:>10,.0f}/s"
+            f"   settle_hand {rates['settle_hand']:>10,.0f}/s"
+            f"   validate {rates['validate']:>10,.0f}/s"
+        )
+        if rates["settle_showdown"] < args.min_rate:
+            failed = True
+    if failed:
+        print(f"below target of {args.min_rate:,.0f} showdowns/sec", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
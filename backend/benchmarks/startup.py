@@ -0,0 +1,146 @@
+"""Cold start benchmark: import time and time to the first successful requests.
+
+    python -m benchmarks.startup [--runs 5] [--warmup background|blocking|off]
+        [--save-baseline startup.json] [--baseline startup.json] [--threshold 0.2]
+
+Each run starts a fresh interpreter that imports ``app.main``, runs the
+lifespan, then sends ``GET /health`` and a showdown to ``POST /api/hands``
+against an in-memory repository, so no database is needed. Reported timings
+are medians in seconds since the child started importing the app, plus the
+whole child process from spawn to exit. With --baseline the run exits non-zero
+when any timing grows more than --threshold above the saved value.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+SHOWDOWN = {
+    "bb_size": 40,
+    "seats": [
+        {"seat": seat, "name": f"Player{seat}", "starting_stack": 1000, "role": role}
+        for seat, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+    ],
+    "hole_cards": {"2": "Tc 9c", "3": "8h 7h"},
+    "board": {"flop": "Ac Kh Qc", "turn": "Js", "river": "Td"},
+    "actions": [
+        {"seat": 3, "street": "preflop", "type": "r", "amount": 120},
+        *(
+            {"seat": seat, "street": "preflop", "type": "f", "amount": 0}
+            for seat in (4, 5, 0, 1)
+        ),
+        {"seat": 2, "street": "preflop", "type": "c", "amount": 80},
+        *(
+            {"seat": seat, "street": street, "type": "x", "amount": 0}
+            for street in ("flop", "turn", "river")
+            for seat in (2, 3)
+        ),
+    ],
+}
+
+
+async def _child() -> Dict[str, float]:
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    import httpx
+
+    from app.api.dependencies import get_hands_repo
+    from app.repository.memory_repo import InMemoryHandsRepository
+
+    repo = InMemoryHandsRepository()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            response.raise_for_status()
+            first_request = time.perf_counter()
+            response = await client.post("/api/hands", json=SHOWDOWN)
+            response.raise_for_status()
+            first_hand = time.perf_counter()
+    return {
+        "import": imported - started,
+        "ready": ready - started,
+        "first_request": first_request - started,
+        "first_hand": first_hand - started,
+    }
+
+
+def run_once(warmup: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "STARTUP_WARMUP": warmup},
+        check=True,
+    )
+    timings = json.loads(child.stdout.strip().splitlines()[-1])
+    timings["process"] = time.perf_counter() - started
+    return timings
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Timings that grew more than ``threshold`` above the baseline"""
+    return [
+        f"{name}: {value:.3f}s vs baseline {baseline[name]:.3f}s"
+        for name, value in results.items()
+        if name in baseline and value > baseline[name] * (1 + threshold)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", default="background", choices=("background", "blocking", "off"))
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_child())))
+        return 0
+
+    runs = [run_once(args.warmup) for _ in range(args.runs)]
+    results = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    print(f"{'milestone':<16}{'median s':>10}{'min s':>10}{'max s':>10}")
+    for name, value in results.items():
+        values = [run[name] for run in runs]
+        print(f"{name:<16}{value:>10.3f}{min(values):>10.3f}{max(values):>10.3f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "warmup": args.warmup, "timings": results},
+                f,
+                indent=2,
+            )
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["timings"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"regressed by more than {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Per-stage benchmark suite for settlement, serialization and the API hot path.
+
+    python -m benchmarks.suite [--hands 2000] [--requests 500]
+        [--save-baseline baseline.json] [--baseline baseline.json] [--threshold 0.2]
+
+Every stage runs over deterministic fixtures (typical three-way pots, long
+raise wars and multi-way all-ins) and reports ops/sec with p50/p99 latency.
+API stages go through the ASGI app with an in-memory repository, so no
+database is needed. With --baseline the run exits non-zero when any stage's
+ops/sec falls more than --threshold below the saved value.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from app.api.dependencies import get_hands_repo
+from app.domain.action import GameState
+from app.domain.hand import Action, Hand, PlayerSnapshot
+from app.domain.hand_codec import decode_hand, encode_hand
+from app.domain.serialization import dumps, loads
+from app.main import app
+from app.repository.hands_repo import HandsRepository, summary_from_row
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.evaluator import build_tables
+from app.services.settlement import SettlementService
+
+from .settlement_bench import ROLES, _hand, make_all_in_hands, make_called_hands
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+REQUEST_FIELDS = ("bb_size", "seats", "hole_cards", "board", "actions")
+
+
+def _next_action(state: GameState, kind: str) -> Action:
+    """The minimum legal fold, bet/raise or call for the player to act"""
+    seat = state.current_player
+    to_call = state.last_raise_to - state.street_bet[seat]
+    if kind == "f":
+        return Action(seat, state.street, "f", 0)
+    if kind == "c":
+        return Action(seat, state.street, "c", to_call)
+    if not state.last_raise_to:
+        return Action(seat, state.street, "b", state.bb_size)
+    return Action(seat, state.street, "r", to_call + state.min_raise)
+
+
+def make_long_hands(count: int, raises: int = 4, seed: int = 11) -> List[Hand]:
+    """Heads-up min-raise wars on every street (about 30 actions per hand)"""
+    rnd = random.Random(seed)
+    stacks = [100_000] * 6
+    seats = [PlayerSnapshot(s, f"Player{s}", stacks[s], ROLES[s]) for s in range(6)]
+    script = ["r", "f", "f", "f", "f"] + ["r"] * raises + ["c"]
+    script += (["r"] * (raises + 1) + ["c"]) * 3
+
+    hands = []
+    for i in range(count):
+        state = GameState(seats, 40)
+        actions = []
+        for index, kind in enumerate(script):
+            action = _next_action(state, kind)
+            state.apply(action, index)
+            actions.append(action)
+        state.finish(len(actions))
+        hands.append(_hand(rnd, i, stacks, actions))
+    return hands
+
+
+def make_fixtures(count: int) -> Dict[str, List[Hand]]:
+    fixtures = {
+        "typical": make_called_hands(count, 3),
+        "long": make_long_hands(count),
+        "multi_all_in": make_all_in_hands(count),
+    }
+    # Stored hands carry UUIDs and distinct timestamps
+    for offset, hands in enumerate(fixtures.values()):
+        for i, hand in enumerate(hands):
+            hand.id = str(uuid.UUID(int=offset * count + i + 1))
+            hand.created_at = EPOCH + timedelta(seconds=offset * count + i)
+    return fixtures
+
+
+def _summarize(latencies: List[int], elapsed: float) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] / 1000,
+    }
+
+
+def measure(fn: Callable[[object], object], inputs: List[object]) -> Dict[str, float]:
+    latencies = []
+    clock = time.perf_counter_ns
+    started = time.perf_counter()
+    for item in inputs:
+        t0 = clock()
+        fn(item)
+        latencies.append(clock() - t0)
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+async def measure_async(
+    fn: Callable[[object], Awaitable[object]], inputs: List[object]
+) -> Dict[str, float]:
+    latencies = []
+    clock = time.perf_counter_ns
+    started = time.perf_counter()
+    for item in inputs:
+        t0 = clock()
+        await fn(item)
+        latencies.append(clock() - t0)
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+def run_core(fixtures: Dict[str, List[Hand]]) -> Dict[str, Dict[str, float]]:
+    service = SettlementService()
+    repo = HandsRepository(None)  # type: ignore[arg-type]
+    build_tables()
+
+    results = {}
+    for name, hands in fixtures.items():
+        rows = []
+        for hand in hands:
+            row = repo._to_row(hand)
+            # psycopg hands JSONB columns back already decoded
+            rows.append(row[:3] + tuple(json.loads(v) for v in row[3:7]) + (row[7], json.loads(row[8])))
+        encoded = [encode_hand(hand) for hand in hands]
+        # A list_hands page of 100 from summary rows to response bytes: the
+        # part of the request that is ours rather than the framework's
+        summary_rows = [
+            (uuid.UUID(hand.id), hand.created_at, hand.bb_size, hand.short_line, hand.result)
+            for hand in hands
+        ]
+        pages = [summary_rows[start:start + 100] for start in range(0, len(hands) - 99, 100)]
+
+        results[f"settle.{name}"] = measure(service.validate_and_settle_hand, hands)
+        results[f"short_line.{name}"] = measure(service._generate_short_line, hands)
+        if name == "multi_all_in":
+            # Multiway preflop EV is sampled after the response, off settle
+            results[f"sampled_ev.{name}"] = measure(service.sampled_ev, hands[:200])
+        results[f"deserialize.{name}"] = measure(repo._deserialize_hand, rows)
+        results[f"decode.{name}"] = measure(decode_hand, encoded)
+        results[f"list_page.{name}"] = measure(
+            lambda page: dumps([summary_from_row(row) for row in page]), pages
+        )
+    return results
+
+
+async def run_api(hands: List[Hand], requests: int) -> Dict[str, Dict[str, float]]:
+    repo = InMemoryHandsRepository()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    payloads = []
+    for hand in hands[:requests]:
+        payload = loads(dumps(hand))
+        payloads.append({field: payload[field] for field in REQUEST_FIELDS})
+
+    async def create(payload: object) -> None:
+        response = await client.post("/api/hands", json=payload)
+        if response.status_code != 201:
+            raise RuntimeError(f"create_hand returned {response.status_code}: {response.text}")
+
+    async def list_page(_: object) -> None:
+        response = await client.get("/api/hands?limit=100")
+        if response.status_code != 200:
+            raise RuntimeError(f"list_hands returned {response.status_code}")
+
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return {
+                "api.create_hand": await measure_async(create, payloads),
+                "api.list_hands": await measure_async(list_page, list(range(requests))),
+            }
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Stages whose ops/sec fell more than ``threshold`` below the baseline"""
+    regressions = []
+    for stage, stats in results.items():
+        expected = baseline.get(stage)
+        if expected is None:
+            continue
+        floor = expected["ops_per_sec"] * (1 - threshold)
+        if stats["ops_per_sec"] < floor:
+            regressions.append(
+                f"{stage}: {stats['ops_per_sec']:,.0f}/s vs baseline "
+                f"{expected['ops_per_sec']:,.0f}/s"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    fixtures = make_fixtures(args.hands)
+    results = run_core(fixtures)
+    results.update(asyncio.run(run_api(fixtures["typical"], args.requests)))
+
+    print(f"{'stage':<26}{'ops/sec':>12}{'p50 us':>10}{'p99 us':>10}")
+    for stage, stats in results.items():
+        print(
+            f"{stage:<26}{stats['ops_per_sec']:>12,.0f}"
+            f"{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"python": platform.python_version(), "stages": results}, f, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["stages"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"regressed by more than {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+-- Composite index for keyset pagination on (created_at, id)
+CREATE INDEX IF NOT EXISTS ix_hands_created_at_id ON hands(created_at DESC, id DESC);
@@ -0,0 +1,4 @@
+-- Compact binary encoding of each hand (see app/domain/hand_codec.py).
+-- Existing rows are filled in by `python -m app.commands.backfill_hand_bin`,
+-- which scripts/migrate.sh runs after the SQL migrations.
+ALTER TABLE hands ADD COLUMN IF NOT EXISTS hand_bin BYTEA;
@@ -0,0 +1,15 @@
+-- Per-player aggregates maintained in the same transaction as each hand insert
+CREATE TABLE IF NOT EXISTS player_stats (
+  name TEXT PRIMARY KEY,
+  hands_played BIGINT NOT NULL DEFAULT 0,
+  vpip_hands BIGINT NOT NULL DEFAULT 0,
+  pfr_hands BIGINT NOT NULL DEFAULT 0,
+  postflop_aggressive BIGINT NOT NULL DEFAULT 0,
+  postflop_calls BIGINT NOT NULL DEFAULT 0,
+  showdowns BIGINT NOT NULL DEFAULT 0,
+  net_result BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_player_stats_net_result ON player_stats(net_result DESC);
+CREATE INDEX IF NOT EXISTS ix_player_stats_hands_played ON player_stats(hands_played DESC);
@@ -0,0 +1,89 @@
+-- Derived columns and indexes for GET /api/hands/search.
+-- The expressions mirror app/domain/search.py; keep the two in step.
+-- Adding STORED generated columns rewrites the table once, holding an
+-- exclusive lock on hands for the duration; run it in a maintenance window.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Posted blinds plus every action amount
+CREATE OR REPLACE FUNCTION hand_pot(bb_size INT, seats JSONB, actions JSONB)
+RETURNS BIGINT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT (COALESCE((
+    SELECT sum(LEAST(
+      CASE s->>'role' WHEN 'SB' THEN bb_size / 2 ELSE bb_size END,
+      (s->>'starting_stack')::BIGINT
+    ))
+    FROM jsonb_array_elements(seats) s
+    WHERE s->>'role' IN ('SB', 'BB')
+  ), 0) + COALESCE((
+    SELECT sum((a->>'amount')::BIGINT) FROM jsonb_array_elements(actions) a
+  ), 0))::BIGINT
+$$;
+
+-- Players left at showdown, 0 when everyone else folded
+CREATE OR REPLACE FUNCTION hand_showdown_players(seats JSONB, actions JSONB)
+RETURNS INT LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT CASE WHEN live > 1 THEN live ELSE 0 END
+  FROM (
+    SELECT jsonb_array_length(seats)
+      - (SELECT count(*) FROM jsonb_array_elements(actions) a WHERE a->>'type' = 'f')::INT
+      AS live
+  ) t
+$$;
+
+CREATE OR REPLACE FUNCTION hand_winner_seats(result JSONB)
+RETURNS INT[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT COALESCE(array_agg(key::INT ORDER BY key::INT), '{}')
+  FROM jsonb_each_text(result)
+  WHERE value::BIGINT > 0
+$$;
+
+CREATE OR REPLACE FUNCTION hand_board_cards(board JSONB)
+RETURNS TEXT[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT array_remove(string_to_array(
+    COALESCE(board->>'flop', '') || ' ' || COALESCE(board->>'turn', '') || ' '
+      || COALESCE(board->>'river', ''),
+    ' '
+  ), '')
+$$;
+
+CREATE OR REPLACE FUNCTION hand_hole_cards(hole_cards JSONB)
+RETURNS TEXT[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT COALESCE(array_agg(card), '{}')
+  FROM jsonb_each_text(hole_cards) h, unnest(string_to_array(h.value, ' ')) card
+  WHERE card <> ''
+$$;
+
+-- 'name:street:type' per action, so "Player3 raised preflop" is one lookup
+CREATE OR REPLACE FUNCTION hand_player_actions(seats JSONB, actions JSONB)
+RETURNS TEXT[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+  SELECT COALESCE(array_agg(DISTINCT (s->>'name') || ':' || (a->>'street') || ':' || (a->>'type')), '{}')
+  FROM jsonb_array_elements(actions) a
+  JOIN jsonb_array_elements(seats) s ON s->'seat' = a->'seat'
+$$;
+
+ALTER TABLE hands
+  ADD COLUMN IF NOT EXISTS pot BIGINT
+    GENERATED ALWAYS AS (hand_pot(bb_size, seats_json, actions_json)) STORED,
+  ADD COLUMN IF NOT EXISTS showdown_players INT
+    GENERATED ALWAYS AS (hand_showdown_players(seats_json, actions_json)) STORED,
+  ADD COLUMN IF NOT EXISTS winner_seats INT[]
+    GENERATED ALWAYS AS (hand_winner_seats(result_json)) STORED,
+  ADD COLUMN IF NOT EXISTS board_cards TEXT[]
+    GENERATED ALWAYS AS (hand_board_cards(board_json)) STORED,
+  ADD COLUMN IF NOT EXISTS hole_cards TEXT[]
+    GENERATED ALWAYS AS (hand_hole_cards(hole_cards_json)) STORED,
+  ADD COLUMN IF NOT EXISTS player_actions TEXT[]
+    GENERATED ALWAYS AS (hand_player_actions(seats_json, actions_json)) STORED;
+
+-- Containment lookups: seats_json @> '[{"name": ...}]', actions_json @> '[{"street": ..., "type": ...}]'
+CREATE INDEX IF NOT EXISTS ix_hands_seats_gin ON hands USING GIN (seats_json jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_hands_actions_gin ON hands USING GIN (actions_json jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS ix_hands_player_actions_gin ON hands USING GIN (player_actions);
+CREATE INDEX IF NOT EXISTS ix_hands_board_cards_gin ON hands USING GIN (board_cards);
+CREATE INDEX IF NOT EXISTS ix_hands_hole_cards_gin ON hands USING GIN (hole_cards);
+CREATE INDEX IF NOT EXISTS ix_hands_winner_seats_gin ON hands USING GIN (winner_seats);
+CREATE INDEX IF NOT EXISTS ix_hands_short_line_trgm ON hands USING GIN (short_line gin_trgm_ops);
+
+-- Range filters in big blinds; queries use this exact expression
+CREATE INDEX IF NOT EXISTS ix_hands_pot_bb ON hands ((pot::FLOAT8 / bb_size));
+CREATE INDEX IF NOT EXISTS ix_hands_showdown ON hands (showdown_players) WHERE showdown_players > 0;
@@ -0,0 +1,94 @@
+-- Monthly range partitions of hands on created_at (UTC months), named
+-- hands_pYYYYMM, plus hands_default for rows outside every month.
+-- The app creates upcoming months via hands_ensure_partitions (see
+-- app/repository/partitions.py); cold months are moved to archive files by
+-- `python -m app.commands.archive_hands`.
+--
+-- The first run rewrites an existing unpartitioned hands table into
+-- partitions, holding an exclusive lock throughout; run it in a maintenance
+-- window. The primary key becomes (id, created_at), since a partitioned table
+-- can only enforce uniqueness that includes the partition key. Later runs
+-- change nothing.
+
+CREATE OR REPLACE FUNCTION hands_create_partition(month TIMESTAMP)
+RETURNS TEXT LANGUAGE plpgsql AS $$
+DECLARE
+  start_at TIMESTAMP := date_trunc('month', month);
+  part_name TEXT := 'hands_p' || to_char(start_at, 'YYYYMM');
+BEGIN
+  IF to_regclass(part_name) IS NOT NULL THEN
+    RETURN NULL;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE %I PARTITION OF hands FOR VALUES FROM (%L) TO (%L)',
+    part_name,
+    start_at AT TIME ZONE 'UTC',
+    (start_at + INTERVAL '1 month') AT TIME ZONE 'UTC'
+  );
+  RETURN part_name;
+END $$;
+
+CREATE OR REPLACE FUNCTION hands_ensure_partitions(months_ahead INT)
+RETURNS SETOF TEXT LANGUAGE plpgsql AS $$
+DECLARE
+  this_month TIMESTAMP := date_trunc('month', now() AT TIME ZONE 'UTC');
+  created TEXT;
+BEGIN
+  FOR i IN 0..months_ahead LOOP
+    created := hands_create_partition(this_month + make_interval(months => i));
+    IF created IS NOT NULL THEN
+      RETURN NEXT created;
+    END IF;
+  END LOOP;
+END $$;
+
+DO $$
+DECLARE
+  index_defs TEXT[];
+  index_def TEXT;
+  month TIMESTAMP;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = 'hands'::regclass) = 'p' THEN
+    RETURN;
+  END IF;
+
+  -- Indexes from earlier migrations; their definitions name "hands", so they
+  -- apply unchanged to the new table once the old one is dropped
+  index_defs := ARRAY(
+    SELECT indexdef FROM pg_indexes
+    WHERE schemaname = current_schema()
+      AND tablename = 'hands'
+      AND indexname <> 'hands_pkey'
+  );
+
+  ALTER TABLE hands RENAME TO hands_unpartitioned;
+  ALTER TABLE hands_unpartitioned
+    RENAME CONSTRAINT hands_pkey TO hands_unpartitioned_pkey;
+  CREATE TABLE hands (
+    LIKE hands_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED,
+    PRIMARY KEY (id, created_at)
+  ) PARTITION BY RANGE (created_at);
+  CREATE TABLE hands_default PARTITION OF hands DEFAULT;
+
+  SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC')
+    INTO month FROM hands_unpartitioned;
+  WHILE month < date_trunc('month', now() AT TIME ZONE 'UTC') LOOP
+    PERFORM hands_create_partition(month);
+    month := month + INTERVAL '1 month';
+  END LOOP;
+  PERFORM hands_ensure_partitions(3);
+
+  INSERT INTO hands (
+    id, created_at, bb_size, seats_json, hole_cards_json, board_json,
+    actions_json, short_line, result_json, hand_bin
+  )
+  SELECT
+    id, created_at, bb_size, seats_json, hole_cards_json, board_json,
+    actions_json, short_line, result_json, hand_bin
+  FROM hands_unpartitioned;
+  DROP TABLE hands_unpartitioned;
+
+  FOREACH index_def IN ARRAY index_defs LOOP
+    EXECUTE index_def;
+  END LOOP;
+END $$;
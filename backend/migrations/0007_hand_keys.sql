@@ -0,0 +1,11 @@
+-- Idempotency keys of submitted hands (see app/services/idempotency.py): a
+-- digest of the client's Idempotency-Key header or of the hand's content,
+-- with the response to replay when the key is submitted again.
+-- A separate table, since the partitioned hands table can only enforce
+-- uniqueness that includes created_at.
+CREATE TABLE IF NOT EXISTS hand_keys (
+  key BYTEA PRIMARY KEY,
+  hand_id UUID NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  response JSONB NOT NULL
+);
@@ -0,0 +1,49 @@
+-- hands_create_partition from migration 0006 fails once hands_default holds
+-- rows of the month it creates, e.g. hands from a backdated hand history
+-- import. This version moves those rows into the new partition: it builds the
+-- month as a plain table, moves the rows out of hands_default and attaches it,
+-- all in the caller's transaction. HandsRepository.save_many calls it for the
+-- months of every batch, so imported months get partitions (and are archived
+-- like any other month) instead of piling up in hands_default.
+
+CREATE OR REPLACE FUNCTION hands_create_partition(month TIMESTAMP)
+RETURNS TEXT LANGUAGE plpgsql AS $$
+DECLARE
+  start_at TIMESTAMP := date_trunc('month', month);
+  part_name TEXT := 'hands_p' || to_char(start_at, 'YYYYMM');
+  from_at TIMESTAMPTZ := start_at AT TIME ZONE 'UTC';
+  to_at TIMESTAMPTZ := (start_at + INTERVAL '1 month') AT TIME ZONE 'UTC';
+BEGIN
+  IF to_regclass(part_name) IS NOT NULL THEN
+    RETURN NULL;
+  END IF;
+  IF NOT EXISTS (
+    SELECT 1 FROM hands_default WHERE created_at >= from_at AND created_at < to_at
+  ) THEN
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF hands FOR VALUES FROM (%L) TO (%L)',
+      part_name, from_at, to_at
+    );
+    RETURN part_name;
+  END IF;
+
+  EXECUTE format(
+    'CREATE TABLE %I (LIKE hands INCLUDING DEFAULTS INCLUDING GENERATED)', part_name
+  );
+  -- Generated columns are left out; the new table computes them again
+  EXECUTE format(
+    'WITH moved AS ('
+    '  DELETE FROM hands_default WHERE created_at >= %L AND created_at < %L'
+    '  RETURNING id, created_at, bb_size, seats_json, hole_cards_json, board_json,'
+    '    actions_json, short_line, result_json, hand_bin'
+    ') INSERT INTO %I (id, created_at, bb_size, seats_json, hole_cards_json,'
+    '  board_json, actions_json, short_line, result_json, hand_bin) '
+    'SELECT * FROM moved',
+    from_at, to_at, part_name
+  );
+  EXECUTE format(
+    'ALTER TABLE hands ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+    part_name, from_at, to_at
+  );
+  RETURN part_name;
+END $$;
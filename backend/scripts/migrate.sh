@@ -21,5 +21,8 @@ for migration in migrations/*.sql; do
   fi
 done
 
+echo "Backfilling binary hand encodings..."
+python -m app.commands.backfill_hand_bin
+
 echo "Migrations completed!"
 
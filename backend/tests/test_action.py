@@ -0,0 +1,147 @@
+import pytest
+
+from app.domain.action import ActionError, ActionType, GameState, replay, validate_action
+from app.domain.hand import Action, PlayerSnapshot
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+SEATS = [PlayerSnapshot(seat, f"Player{seat}", 1000, ROLES[seat]) for seat in range(6)]
+
+# UTG raises, the big blind calls and both check it down
+RAISED_POT = [
+    (3, "preflop", "r", 120),
+    (4, "preflop", "f", 0),
+    (5, "preflop", "f", 0),
+    (0, "preflop", "f", 0),
+    (1, "preflop", "f", 0),
+    (2, "preflop", "c", 80),
+    (2, "flop", "x", 0),
+    (3, "flop", "x", 0),
+    (2, "turn", "x", 0),
+    (3, "turn", "x", 0),
+    (2, "river", "x", 0),
+    (3, "river", "x", 0),
+]
+
+
+def play(actions, stacks=None):
+    seats = SEATS if stacks is None else [
+        PlayerSnapshot(seat, f"Player{seat}", stacks[seat], ROLES[seat]) for seat in range(6)
+    ]
+    return replay(seats, 40, [Action(*a) for a in actions])
+
+
+def failure(actions, stacks=None):
+    with pytest.raises(ActionError) as excinfo:
+        play(actions, stacks)
+    return excinfo.value
+
+
+def test_complete_hand_replays():
+    state = play(RAISED_POT)
+    assert state.closed
+    assert state.committed == {0: 0, 1: 20, 2: 120, 3: 120, 4: 0, 5: 0}
+    assert state.pot == 260
+
+
+def test_blinds_and_first_to_act():
+    state = GameState(SEATS, 40)
+    assert state.current_player == 3
+    assert state.last_raise_to == 40
+    assert validate_action(ActionType.CALL, 40, state)
+    assert not validate_action(ActionType.CHECK, 0, state)
+
+
+def test_walk_ends_the_hand():
+    state = play([(seat, "preflop", "f", 0) for seat in (3, 4, 5, 0, 1)])
+    assert state.live == 1
+    assert state.committed[2] == 40
+
+
+def test_big_blind_gets_the_option():
+    limps = [(seat, "preflop", "c", 40) for seat in (3, 4, 5, 0)] + [(1, "preflop", "c", 20)]
+    state = GameState(SEATS, 40)
+    for index, action in enumerate(limps):
+        state.apply(Action(*action), index)
+    assert state.current_player == 2
+    state.apply(Action(2, "preflop", "x", 0), 5)
+    assert state.street == "flop"
+    assert state.current_player == 1
+
+
+def test_rejects_out_of_turn():
+    error = failure([(4, "preflop", "f", 0)])
+    assert error.index == 0
+    assert "out of turn" in str(error)
+
+
+def test_rejects_acting_first_postflop_out_of_position():
+    actions = RAISED_POT[:6] + [(3, "flop", "b", 80)]
+    assert failure(actions).index == 6
+
+
+def test_rejects_check_facing_a_bet():
+    error = failure(RAISED_POT[:7] + [(3, "flop", "b", 80), (2, "flop", "x", 0)])
+    assert error.index == 8
+    assert "facing a bet" in error.reason
+
+
+def test_rejects_under_min_raise():
+    error = failure([(3, "preflop", "r", 60)])
+    assert error.index == 0
+    assert "minimum of 80" in error.reason
+
+
+def test_min_raise_tracks_the_last_raise_size():
+    actions = [(3, "preflop", "r", 120), (4, "preflop", "r", 180)]
+    assert failure(actions).index == 1
+    play_ok = GameState(SEATS, 40)
+    play_ok.apply(Action(3, "preflop", "r", 120), 0)
+    play_ok.apply(Action(4, "preflop", "r", 200), 1)
+    assert play_ok.min_raise == 80
+    assert play_ok.last_raise_to == 200
+
+
+def test_rejects_overbet_beyond_stack():
+    error = failure([(3, "preflop", "r", 1200)])
+    assert "with 1000 behind" in error.reason
+
+
+def test_short_all_in_does_not_reopen_min_raise():
+    stacks = [1000, 1000, 1000, 1000, 150, 1000]
+    state = GameState(
+        [PlayerSnapshot(s, f"Player{s}", stacks[s], ROLES[s]) for s in range(6)], 40
+    )
+    state.apply(Action(3, "preflop", "r", 120), 0)
+    state.apply(Action(4, "preflop", "allin", 150), 1)
+    assert state.last_raise_to == 150
+    assert state.min_raise == 80
+
+
+def test_all_in_runs_out_without_further_actions():
+    actions = [
+        (3, "preflop", "allin", 1000),
+        (4, "preflop", "f", 0),
+        (5, "preflop", "f", 0),
+        (0, "preflop", "f", 0),
+        (1, "preflop", "f", 0),
+        (2, "preflop", "allin", 960),
+    ]
+    assert play(actions).closed
+    assert failure(actions + [(2, "flop", "x", 0)]).reason == "Betting is complete"
+
+
+def test_rejects_wrong_call_amount():
+    assert "Call must add 40" in failure([(3, "preflop", "c", 30)]).reason
+
+
+def test_rejects_incomplete_hand():
+    error = failure(RAISED_POT[:8])
+    assert error.index == 8
+    assert "to act on the turn" in error.reason
+
+
+def test_rejects_action_after_hand_is_over():
+    actions = [(seat, "preflop", "f", 0) for seat in (3, 4, 5, 0, 1)]
+    error = failure(actions + [(2, "preflop", "x", 0)])
+    assert error.index == 5
+    assert error.reason == "Hand is already over"
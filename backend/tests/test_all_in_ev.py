@@ -0,0 +1,214 @@
+import asyncio
+import uuid
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import (
+    get_hand_cache, get_hand_keys, get_hands_repo, get_pending_ev,
+)
+from app.domain.hand_codec import decode_hand, encode_hand
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.all_in_ev import side_pots
+from app.services.equity import enumerate_runouts
+from app.services.evaluator import parse_cards
+from app.services.preflop_equity import (
+    DEFAULT_PATH, HEADER, MAGIC, PAIRS, SCALE, VERSION,
+    PreflopEquityTable, combo_index, pair_index,
+)
+from app.services.hand_cache import HandResponseCache
+from app.services.idempotency import RecentHandKeys
+from app.services.pending_ev import PendingEv
+from app.services.settlement import SettlementService
+from app.services.settlement_pool import SettlementExecutor
+from test_settlement import ROLES, folds, make_hand
+
+
+def write_table(path, entries):
+    values = np.zeros(PAIRS, dtype="<u2")
+    for (first, second), equity in entries.items():
+        a, b = combo_index(*parse_cards(first)), combo_index(*parse_cards(second))
+        if a > b:
+            a, b, equity = b, a, 1 - equity
+        values[pair_index(a, b)] = round(equity * SCALE)
+    path.write_bytes(HEADER.pack(MAGIC, VERSION, 0, 0) + values.tobytes())
+    return PreflopEquityTable(path)
+
+
+def test_side_pots_match_commitments():
+    committed = {0: 0, 1: 20, 2: 400, 3: 1000, 4: 1000, 5: 1500}
+    pots = side_pots(committed, [2, 3, 5])
+    assert pots == [(1620, [2, 3, 5]), (1800, [3, 5]), (500, [5])]
+    assert sum(amount for amount, _ in pots) == sum(committed.values())
+
+
+def test_flop_all_in_is_enumerated_exactly():
+    """Test a flop all-in pays out the exact enumerated equity"""
+    hand = make_hand(
+        [(3, "preflop", "r", 120)] + folds(4, 5, 0, 1) + [
+            (2, "preflop", "c", 80),
+            (2, "flop", "allin", 880),
+            (3, "flop", "c", 880),
+        ],
+        {"2": "2c 2d", "3": "Ah As"},
+        board=("7c 8d 9h", "Js", "3c"),
+    )
+    result, _, ev_result = SettlementService().validate_and_settle_hand(hand)
+    assert result[3] == 1020
+
+    holdings = np.array([parse_cards("2c 2d"), parse_cards("Ah As")])
+    board = np.array(parse_cards("7c 8d 9h"))
+    deck = np.array([c for c in range(52) if c not in set(holdings.ravel()) | set(board)])
+    _, _, shares, total = enumerate_runouts(holdings, board, deck)
+    assert ev_result[3] == pytest.approx(2020 * shares[1] / total - 1000, abs=0.01)
+    assert ev_result[2] == pytest.approx(2020 * shares[0] / total - 1000, abs=0.01)
+    assert ev_result[1] == -20
+
+
+def test_no_all_in_reports_actual_result():
+    hand = make_hand(
+        [(3, "preflop", "r", 120)] + folds(4, 5, 0, 1) + [(2, "preflop", "c", 80)]
+        + [(seat, street, "x", 0) for street in ("flop", "turn", "river") for seat in (2, 3)],
+        {"2": "2c 2d", "3": "Ah As"},
+        board=("7c 8d 9h", "Js", "3c"),
+    )
+    result, _, ev_result = SettlementService().validate_and_settle_hand(hand)
+    assert ev_result == result
+
+
+def test_heads_up_preflop_uses_table(tmp_path):
+    """Test a heads-up preflop all-in is one table lookup, in either seat order"""
+    table = write_table(tmp_path / "equity.bin", {("2c 2d", "Ah As"): 0.2})
+    assert table.equity(parse_cards("Ah As"), parse_cards("2c 2d")) == pytest.approx(0.8, abs=1e-4)
+
+    hand = make_hand(
+        [(3, "preflop", "allin", 1000)] + folds(4, 5, 0, 1) + [(2, "preflop", "allin", 960)],
+        {"2": "2c 2d", "3": "Ah As"},
+    )
+    _, _, ev_result = SettlementService(equity_table=table).validate_and_settle_hand(hand)
+    assert ev_result[2] == pytest.approx(2020 * 0.2 - 1000, abs=0.1)
+    assert ev_result[3] == pytest.approx(2020 * 0.8 - 1000, abs=0.1)
+    table.close()
+
+
+MULTIWAY_STACKS = [1000, 1000, 1000, 400, 1000, 1000]
+MULTIWAY_ACTIONS = (
+    [(3, "preflop", "allin", 400), (4, "preflop", "allin", 1000)]
+    + folds(5, 0, 1) + [(2, "preflop", "c", 960)]
+)
+MULTIWAY_HOLE_CARDS = {"2": "Kc Kd", "3": "Ah As", "4": "7s 8s"}
+
+
+def test_multiway_preflop_is_seeded_and_zero_sum():
+    hand = make_hand(MULTIWAY_ACTIONS, MULTIWAY_HOLE_CARDS, stacks=MULTIWAY_STACKS)
+    service = SettlementService(ev_samples=500)
+    _, _, pending = service.validate_and_settle_hand(hand)
+    assert pending is None  # sampled after the response, not while settling
+    first = service.sampled_ev(hand)
+    second = service.sampled_ev(hand)
+    assert first == second
+    assert sum(first.values()) == pytest.approx(0, abs=0.05)
+    assert first[3] > 0  # aces are ahead of both callers
+
+
+def test_pending_ev_samples_off_the_request():
+    hand = make_hand(MULTIWAY_ACTIONS, MULTIWAY_HOLE_CARDS, stacks=MULTIWAY_STACKS)
+    hand.id = str(uuid.uuid4())
+    repo = InMemoryHandsRepository()
+    pending = PendingEv(repo)
+
+    async def scenario():
+        # A copy, as a database row would be
+        await repo.save(decode_hand(encode_hand(hand)))
+        pending.schedule(SettlementExecutor("inline"), [hand])
+        assert pending.get(hand.id) == {"id": hand.id, "ev_result": None, "ev_pending": True}
+        assert pending.sampling(hand.id)
+        await asyncio.gather(*pending._tasks)
+        return await repo.get(hand.id)
+
+    stored = asyncio.run(scenario())
+    expected = SettlementService().sampled_ev(hand)
+    assert pending.get(hand.id) == {"id": hand.id, "ev_result": expected, "ev_pending": False}
+    assert not pending.sampling(hand.id)
+    assert stored.ev_result == expected
+    assert pending.get("unknown") is None
+    assert pending.stats()["sampled"] == 1
+
+
+class RecordingPendingEv(PendingEv):
+    def __init__(self):
+        super().__init__()
+        self.scheduled = []
+
+    def schedule(self, executor, hands):
+        self.scheduled.extend(hand.id for hand in hands)
+
+
+def test_create_hand_answers_before_sampling_multiway_ev():
+    repo = InMemoryHandsRepository()
+    pending = RecordingPendingEv()
+    overrides = {
+        get_hands_repo: lambda: repo,
+        get_hand_keys: RecentHandKeys,
+        get_pending_ev: lambda: pending,
+        get_hand_cache: lambda: cache,
+    }
+    cache = HandResponseCache()
+    app.dependency_overrides.update(overrides)
+    body = {
+        "bb_size": 40,
+        "seats": [
+            {"seat": seat, "name": f"Player{seat}", "starting_stack": stack, "role": role}
+            for seat, (stack, role) in enumerate(zip(MULTIWAY_STACKS, ROLES))
+        ],
+        "hole_cards": MULTIWAY_HOLE_CARDS,
+        "board": {"flop": "Ac Kh Qc", "turn": "Js", "river": "Td"},
+        "actions": [
+            {"seat": seat, "street": street, "type": kind, "amount": amount}
+            for seat, street, kind, amount in MULTIWAY_ACTIONS
+        ],
+    }
+    try:
+        client = TestClient(app)
+        response = client.post("/api/hands", json=body)
+        assert response.status_code == 201
+        created = response.json()
+        assert created["ev_pending"] is True and created["ev_result"] is None
+        assert pending.scheduled == [created["id"]]
+
+        # While sampling, the hand is served without an ETag and not cached
+        pending._put(created["id"], None)
+        response = client.get(f"/api/hands/{created['id']}")
+        assert response.json()["ev_result"] is None
+        assert "etag" not in response.headers
+
+        ev_result = {seat: 0 for seat in range(6)}
+        ev_result[2] = 1.5
+        asyncio.run(repo.save_ev_results([replace(repo._hands[created["id"]], ev_result=ev_result)]))
+        pending._put(created["id"], ev_result)
+        assert client.get(f"/api/hands/{created['id']}/ev").json() == {
+            "id": created["id"], "ev_result": {str(seat): v for seat, v in ev_result.items()},
+            "ev_pending": False,
+        }
+        response = client.get(f"/api/hands/{created['id']}")
+        assert response.json()["ev_result"]["2"] == 1.5
+        assert response.headers["etag"]
+
+        # Past the in-process entries the stored hand answers
+        pending._results.clear()
+        assert client.get(f"/api/hands/{created['id']}/ev").json()["ev_result"]["2"] == 1.5
+        assert client.get("/api/hands/unknown/ev").status_code == 404
+    finally:
+        for dependency in overrides:
+            app.dependency_overrides.pop(dependency)
+
+
+@pytest.mark.skipif(not DEFAULT_PATH.exists(), reason="preflop table not built")
+def test_shipped_table_known_matchups():
+    table = PreflopEquityTable(DEFAULT_PATH)
+    assert table.equity(parse_cards("Ah As"), parse_cards("Kh Ks")) == pytest.approx(0.82, abs=0.01)
+    assert table.equity(parse_cards("2c 2d"), parse_cards("Ah Kh")) == pytest.approx(0.50, abs=0.02)
+    table.close()
@@ -0,0 +1,129 @@
+import os
+import random
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.hand_codec import decode_hand, encode_hand
+from app.repository.archive import ArchiveFile, ArchiveWriter, HandArchive
+from app.repository.partitions import month_start
+from benchmarks.suite import make_fixtures
+
+
+def archived_hands(count, seed=7):
+    """Hands with random UUIDs, oldest first as ORDER BY created_at, id returns them"""
+    rng = random.Random(seed)
+    hands = [hand for group in make_fixtures(count).values() for hand in group]
+    for hand in hands:
+        hand.id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    return sorted(hands, key=lambda h: (h.created_at, uuid.UUID(h.id).bytes))
+
+
+def write(path, hands, **sizes):
+    with ArchiveWriter(path, **sizes) as writer:
+        for hand in hands:
+            writer.add(hand.id, hand.created_at, encode_hand(hand))
+
+
+def test_archive_round_trip_and_sparse_lookups(tmp_path):
+    hands = archived_hands(400)
+    path = tmp_path / "hands_p202401.hca"
+    write(path, hands, block_size=64, page_size=50)
+
+    archive = ArchiveFile(path)
+    assert archive.count == len(hands)
+    assert len(archive.blocks) == -(-len(hands) // 64)
+    assert len(archive.pages) == -(-len(hands) // 50)
+    for hand in hands[::37] + hands[-1:]:
+        assert decode_hand(archive.get(uuid.UUID(hand.id).bytes)) == decode_hand(encode_hand(hand))
+    assert archive.get(uuid.uuid4().bytes) is None
+
+    # Columnar blocks compress well below the encoded size
+    raw = sum(len(encode_hand(hand)) for hand in hands)
+    assert os.path.getsize(path) < raw / 2
+    archive.close()
+
+
+def test_colliding_id_keys_are_still_found(tmp_path):
+    """Ids sharing their first eight bytes straddle pages and blocks"""
+    hands = archived_hands(30)
+    for i, hand in enumerate(hands):
+        hand.id = str(uuid.UUID(int=i + 1))
+    path = tmp_path / "hands_p202401.hca"
+    write(path, hands, block_size=16, page_size=8)
+    archive = ArchiveFile(path)
+    for hand in hands:
+        assert decode_hand(archive.get(uuid.UUID(hand.id).bytes)).id == hand.id
+    archive.close()
+
+
+def test_rows_must_arrive_in_order(tmp_path):
+    hands = archived_hands(2)
+    writer = ArchiveWriter(tmp_path / "bad.hca")
+    writer.add(hands[1].id, hands[1].created_at, encode_hand(hands[1]))
+    with pytest.raises(ValueError, match="order"):
+        writer.add(hands[0].id, hands[0].created_at, encode_hand(hands[0]))
+    writer.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_writer_merges_into_a_new_file_and_never_overwrites(tmp_path):
+    hands = archived_hands(300)
+    earlier, later = hands[::2], hands[1::2]
+    path = tmp_path / "hands_p202401.hca"
+    write(path, earlier, block_size=32)
+    with pytest.raises(FileExistsError):
+        ArchiveWriter(path)
+
+    previous = ArchiveFile(path)
+    merged = tmp_path / "hands_p202401.hca.new"
+    with ArchiveWriter(merged, block_size=32, merge=previous) as writer:
+        # A hand already in the file is written once
+        for hand in sorted(later + earlier[70:71], key=hands.index):
+            writer.add(hand.id, hand.created_at, encode_hand(hand))
+    previous.close()
+
+    archive = ArchiveFile(merged)
+    assert archive.count == len(hands)
+    assert [decode_hand(b).id for b in archive.rows()] == [h.id for h in hands]
+    archive.close()
+    assert ArchiveFile(path).count == len(earlier)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "hands_p202401.hca", "hands_p202401.hca.new",
+    ]
+
+
+def test_directory_reads_across_files(tmp_path):
+    hands = archived_hands(200)
+    half = len(hands) // 2
+    archive = HandArchive(tmp_path)
+    assert archive.count() == 0
+
+    write(tmp_path / "hands_p202401.hca", hands[:half], block_size=32)
+    assert archive.get(hands[0].id) is not None
+    write(tmp_path / "hands_p202402.hca", hands[half:], block_size=32)
+    assert archive.count() == len(hands)
+    assert archive.get(hands[-1].id) is not None
+
+    ids = [h.id for h in hands]
+    assert [decode_hand(b).id for b in archive.rows()] == ids
+    since, until = hands[100].created_at, hands[400].created_at
+    assert [decode_hand(b).id for b in archive.rows(since, until)] == ids[100:400]
+    after = (hands[half + 5].created_at, hands[half + 5].id)
+    assert [decode_hand(b).id for b in archive.rows(after=after)] == ids[half + 6:]
+
+    newest = ids[::-1]
+    assert [decode_hand(b).id for b in archive.newest(10)] == newest[:10]
+    assert [decode_hand(b).id for b in archive.newest(10, offset=len(hands) - half + 3)] == (
+        newest[len(hands) - half + 3:len(hands) - half + 13]
+    )
+    before = (hands[250].created_at, hands[250].id)
+    assert [decode_hand(b).id for b in archive.newest(5, before=before)] == ids[245:250][::-1]
+
+
+def test_month_start():
+    value = datetime(2024, 1, 31, 23, 0, tzinfo=timezone.utc)
+    assert month_start(value) == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert month_start(value, 1) == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert month_start(value, -13) == datetime(2022, 12, 1, tzinfo=timezone.utc)
@@ -0,0 +1,50 @@
+import pytest
+
+from app.domain.cards import (
+    CARD_INDEX, FULL_DECK, add_cards, card_mask, format_cards, mask_cards,
+    parse_cards, remaining,
+)
+from app.domain.hand import Board
+from test_settlement import make_hand
+
+
+def test_parse_and_format_round_trip():
+    cards = parse_cards("As Kd 2c")
+    assert cards == [CARD_INDEX["As"], CARD_INDEX["Kd"], CARD_INDEX["2c"]]
+    assert format_cards(cards) == "As Kd 2c"
+    assert parse_cards(None) == parse_cards("") == []
+    with pytest.raises(ValueError, match="Invalid card: AS"):
+        parse_cards("Kd AS")
+
+
+def test_masks_detect_duplicates_and_complement_the_deck():
+    mask = add_cards(0, parse_cards("As Kd"))
+    with pytest.raises(ValueError, match="Duplicate card: Kd"):
+        add_cards(mask, parse_cards("Qh Kd"))
+
+    deck = remaining(mask)
+    assert len(deck) == 50
+    assert CARD_INDEX["As"] not in deck and CARD_INDEX["Ah"] in deck
+    assert deck == sorted(deck)
+    assert mask_cards(FULL_DECK) == list(range(52))
+    assert card_mask(deck) | mask == FULL_DECK
+
+
+def test_hand_cards_are_parsed_once_and_checked():
+    hand = make_hand([], {"2": "Ah As", 3: "9h 9d"})
+    dealt = hand.dealt()
+    assert dealt.holdings == {
+        2: (CARD_INDEX["Ah"], CARD_INDEX["As"]),
+        3: (CARD_INDEX["9h"], CARD_INDEX["9d"]),
+    }
+    assert dealt.board == parse_cards("Ac Kh Qc Js Td")
+    assert dealt.mask == card_mask(dealt.board) | card_mask(parse_cards("Ah As 9h 9d"))
+
+    with pytest.raises(ValueError, match="Duplicate card: Kh"):
+        make_hand([], {3: "Kh Kd"}, board=("Kh 7c 2d", None, None)).dealt()
+    with pytest.raises(ValueError, match="Seat 3 must have two hole cards"):
+        make_hand([], {3: "Kh"}).dealt()
+    with pytest.raises(ValueError, match="Flop must have 3 cards"):
+        Board("Kh 7c").cards()
+    with pytest.raises(ValueError, match="River dealt before the previous street"):
+        Board("Kh 7c 2d", None, "3s").cards()
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.equity import enumerate_runouts, evaluate_batch
+from app.services.evaluator import evaluate, parse_cards
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_evaluate_batch_matches_scalar_evaluator():
+    """Test the vectorized evaluator against the lookup-table evaluator"""
+    rnd = random.Random(5)
+    hands = np.array([rnd.sample(range(52), 7) for _ in range(5000)])
+    expected = [evaluate(row) for row in hands.tolist()]
+    assert evaluate_batch(hands).tolist() == expected
+
+
+def test_exact_enumeration_on_the_turn():
+    """Test that a turn spot enumerates all 44 rivers"""
+    holdings = np.array([parse_cards("As Ah"), parse_cards("Ks Kh")])
+    board = np.array(parse_cards("2c 7d 9h Kd"))
+    known = set(holdings.ravel().tolist()) | set(board.tolist())
+    deck = np.array([c for c in range(52) if c not in known])
+
+    wins, ties, shares, total = enumerate_runouts(holdings, board, deck)
+    assert total == 44
+    # Only the two remaining aces save seat 0
+    assert wins.tolist() == [2, 42]
+    assert ties.tolist() == [0, 0]
+
+
+def test_equity_endpoint_flop_is_exact(client):
+    """Test exact flop equity through the API"""
+    response = client.post("/api/equity", json={
+        "hole_cards": {"0": "As Ah", "1": "Kd Kc"},
+        "board": {"flop": "2c 7d 9h"},
+    })
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["method"] == "exact"
+    assert data["samples"] == 990
+    assert sum(seat["equity"] for seat in data["equity"].values()) == pytest.approx(1)
+    assert data["equity"]["0"]["win"] > 0.9
+
+
+def test_equity_endpoint_preflop_monte_carlo(client):
+    """Test seeded Monte Carlo equity through the API"""
+    response = client.post("/api/equity", json={
+        "hole_cards": {"0": "As Ah", "1": "Kd Kc", "2": "7s 2d"},
+        "samples": 20000,
+        "seed": 42,
+    })
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["method"] == "monte_carlo"
+    assert data["samples"] == 20000
+    equity = {seat: v["equity"] for seat, v in data["equity"].items()}
+    assert sum(equity.values()) == pytest.approx(1)
+    assert equity["0"] > equity["1"] > equity["2"]
+
+
+@pytest.mark.parametrize("payload", [
+    {"hole_cards": {"0": "As Ah"}},
+    {"hole_cards": {"0": "As Ah", "1": "As Kc"}},
+    {"hole_cards": {"0": "As Ah", "1": "Kd Kc"}, "board": {"flop": "2c 7d"}},
+    {"hole_cards": {"0": "As Ah", "1": "Kd Xc"}},
+    {"hole_cards": {"0": "As Ah", "1": 12}},
+    {"hole_cards": {"0": "As Ah", "1": "Kd Kc"}, "board": {"flop": ["2c", "7d", "9h"]}},
+    {"hole_cards": {"0": "As Ah", "x": "Kd Kc"}},
+    {"hole_cards": {"0": "As Ah", "1": "Kd Kc"}, "seed": -1},
+])
+def test_equity_endpoint_rejects_bad_input(client, payload):
+    """Test validation of seats, duplicates, board size, card syntax and types"""
+    assert client.post("/api/equity", json=payload).status_code == 422
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from app.services.evaluator import (
+    FLUSH, FULL_HOUSE, HIGH_CARD, PAIR, QUADS, PRIMES, STRAIGHT, STRAIGHT_FLUSH,
+    TRIPS, TWO_PAIR, BoardEvaluator, _rank_counts_value, category, evaluate,
+    format_cards, parse_cards, tables,
+)
+
+
+def rank(cards: str) -> int:
+    return evaluate(parse_cards(cards))
+
+
+@pytest.mark.parametrize("cards,expected", [
+    ("As Ks Qs Js Ts 2c 3d", STRAIGHT_FLUSH),
+    ("Ah 2h 3h 4h 5h Kc Kd", STRAIGHT_FLUSH),
+    ("9c 9d 9h 9s 2c 3d 4h", QUADS),
+    ("9c 9d 9h 2s 2c 3d 3h", FULL_HOUSE),
+    ("9c 9d 9h 2s 2c 2d 4h", FULL_HOUSE),
+    ("2h 7h 9h Jh Kh Ac Ad", FLUSH),
+    ("Ac 2d 3h 4s 5c 9d Kh", STRAIGHT),
+    ("9c 9d 9h 2s 5c Kd 4h", TRIPS),
+    ("9c 9d 2h 2s 5c 5d 4h", TWO_PAIR),
+    ("9c 9d 2h 3s 5c 6d 4h", STRAIGHT),
+    ("9c 9d 2h 3s 7c Kd Jh", PAIR),
+    ("9c Td 2h 3s 7c Kd Jh", HIGH_CARD),
+])
+def test_categories(cards, expected):
+    """Test that each hand category is recognised"""
+    assert category(rank(cards)) == expected
+
+
+def test_kickers_and_wheel():
+    """Test kicker ordering and that the wheel is the lowest straight"""
+    assert rank("Ac Ad Kh 7s 5c 3d 2h") > rank("Ac Ad Qh 7s 5c 3d 2h")
+    assert rank("6c 2d 3h 4s 5c Kd Kh") > rank("Ac 2d 3h 4s 5c Kd Kh")
+    # Third pair never beats the best kicker
+    assert rank("Ac Ad Kh Kd 2c 2d Qh") > rank("Ac Ad Kh Kd 2c 2d Jh")
+
+
+def test_parse_cards_rejects_bad_syntax():
+    """Test that malformed cards raise ValueError"""
+    assert format_cards(parse_cards("As Td 2c")) == "As Td 2c"
+    with pytest.raises(ValueError, match="Invalid card: 1s"):
+        parse_cards("As 1s")
+
+
+def test_board_evaluator_matches_evaluate():
+    """Test the board-sharing fast path against the generic evaluator"""
+    rnd = random.Random(3)
+    for _ in range(2000):
+        deck = rnd.sample(range(52), 9)
+        board = BoardEvaluator(deck[:5])
+        holdings = {0: (deck[5], deck[6]), 1: (deck[7], deck[8])}
+        ranks = board.rank_all(holdings, [0, 1])
+        assert ranks[0] == board.rank(*holdings[0]) == evaluate(deck[:7])
+        assert ranks[1] == evaluate(deck[:5] + deck[7:])
+
+
+def test_larger_rank_sets_match_direct_evaluation():
+    """Test that six and seven rank entries built from smaller ones are exact"""
+    non_flush, _ = tables()
+    rnd = random.Random(5)
+    for _ in range(3000):
+        counts = [0] * 13
+        for card in rnd.sample(range(52), rnd.choice((6, 7))):
+            counts[card >> 2] += 1
+        product = 1
+        for r, n in enumerate(counts):
+            product *= PRIMES[r] ** n
+        assert non_flush[product] == _rank_counts_value(counts)
+
+
+def test_matches_pokerkit_ordering():
+    """Test hand ordering against pokerkit on random showdowns"""
+    pokerkit = pytest.importorskip("pokerkit")
+    rnd = random.Random(11)
+    for _ in range(1000):
+        deck = rnd.sample(range(52), 9)
+        board = format_cards(deck[:5]).replace(" ", "")
+        first = evaluate(deck[:7])
+        second = evaluate(deck[:5] + deck[7:])
+        ref_first = pokerkit.StandardHighHand.from_game(
+            format_cards(deck[5:7]).replace(" ", ""), board
+        )
+        ref_second = pokerkit.StandardHighHand.from_game(
+            format_cards(deck[7:9]).replace(" ", ""), board
+        )
+        assert (first > second) == (ref_first > ref_second)
+        assert (first == second) == (ref_first == ref_second)
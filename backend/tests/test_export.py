@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.cursor import decode_cursor
+from app.api.dependencies import get_hands_repo
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.main import app
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+
+
+def make_hand(index: int) -> Hand:
+    return Hand(
+        id=str(uuid.UUID(int=index + 1)),
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=index),
+        bb_size=40,
+        seats=[
+            PlayerSnapshot(seat, f"Player{seat}", 1000, ROLES[seat])
+            for seat in range(6)
+        ],
+        hole_cards={2: "As Ks"},
+        board=Board(),
+        actions=[Action(seat, "preflop", "f", 0) for seat in (3, 4, 5, 0, 1)],
+        short_line="Seat3:fold",
+        result={1: -20, 2: 20},
+    )
+
+
+class StreamingRepo:
+    def __init__(self, hands):
+        self.hands = hands
+        self.calls = []
+
+    async def stream(self, since=None, until=None, after=None, batch_size=500):
+        self.calls.append((since, until, after))
+        for hand in self.hands:
+            if after is None or (hand.created_at, hand.id) > after:
+                yield hand
+
+
+@pytest.fixture
+def repo():
+    repo = StreamingRepo([make_hand(i) for i in range(3)])
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    yield repo
+    app.dependency_overrides.pop(get_hands_repo)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_export_ndjson_rows_carry_resume_cursor(client, repo):
+    """Test NDJSON export and resuming from the last cursor"""
+    response = client.get("/api/hands/export?format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [h.id for h in repo.hands]
+    assert decode_cursor(rows[0]["cursor"])[1] == repo.hands[0].id
+
+    resumed = client.get(f"/api/hands/export?after={rows[0]['cursor']}")
+    assert [json.loads(line)["id"] for line in resumed.text.splitlines()] == [
+        h.id for h in repo.hands[1:]
+    ]
+
+
+def test_export_csv(client, repo):
+    """Test CSV export with header and JSON-encoded nested columns"""
+    response = client.get(
+        "/api/hands/export?format=csv&since=2024-01-01T00:00:00Z"
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert json.loads(rows[0]["result"]) == {"1": -20, "2": 20}
+    assert repo.calls[-1][0] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_export_rejects_bad_format_and_cursor(client, repo):
+    """Test parameter validation"""
+    assert client.get("/api/hands/export?format=xml").status_code == 422
+    assert client.get("/api/hands/export?after=garbage").status_code == 422
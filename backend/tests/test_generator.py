@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from app.api.hands import HandRequest, _build_hand
+from app.services.settlement import SettlementService
+from benchmarks.generator import PROFILES, HandGenerator
+from benchmarks.loadgen import build_parser, run_load
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_generated_hands_settle(profile):
+    service = SettlementService(ev_samples=50)
+    hands = HandGenerator(seed=7, profile=profile, all_in=0.1, stacks=(5, 60)).generate(300)
+    for hand in hands:
+        service.validate_and_settle_hand(_build_hand(HandRequest(**hand)))
+    assert any(hand["board"].get("river") for hand in hands)
+    assert any(a["type"] == "allin" for hand in hands for a in hand["actions"])
+
+
+def test_generator_is_deterministic_per_seed():
+    first = HandGenerator(seed=3).generate(50)
+    assert HandGenerator(seed=3).generate(50) == first
+    assert HandGenerator(seed=4).generate(50) != first
+
+
+@pytest.mark.parametrize("endpoint", ["single", "batch"])
+def test_asgi_load_run_accepts_every_hand(endpoint):
+    args = build_parser().parse_args(
+        ["run", "--asgi", "--hands", "40", "--seed", "1", "--endpoint", endpoint,
+         "--batch-size", "15", "--concurrency", "4"]
+    )
+    summary = asyncio.run(run_load(args)).summary()
+    assert summary["hands_accepted"] == 40
+    assert summary["hands_rejected"] == 0 and not summary["errors"]
+    assert summary["requests"] == (40 if endpoint == "single" else 3)
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.hands import _if_none_match
+from app.main import app
+from app.services.hand_cache import HandResponseCache
+
+HAND_ID = "5f1c0c9e-0000-4000-8000-000000000000"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    """Test that the least recently used entries are evicted first"""
+    cache = HandResponseCache(max_entries=2, max_bytes=10)
+    cache.put("a", b"1234", "application/json", '"a"')
+    cache.put("b", b"1234", "application/json", '"b"')
+    assert cache.get("a") is not None
+    cache.put("c", b"1234", "application/json", '"c"')
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    cache.put("d", b"123456", "application/json", '"d"')
+    assert cache.stats()["bytes"] <= 10
+    assert cache.stats()["evictions"] == 2
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_expiry():
+    """Test that entries past their TTL count as misses"""
+    cache = HandResponseCache(ttl_seconds=0.01)
+    cache.put("a", b"{}", "application/json", '"a"')
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_if_none_match_returns_304_without_database(client):
+    """Test that a matching ETag is answered without reading the hand"""
+    etag = f'"h1-{HAND_ID}-json"'
+    response = client.get(f"/api/hands/{HAND_ID}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_if_none_match_compares_whole_tokens():
+    """Test that only an exact (weakly compared) ETag in the list matches"""
+    etag = f'"h1-{HAND_ID}-json"'
+    assert _if_none_match(f'"x", W/{etag}', etag) is True
+    assert _if_none_match(f'"h1-{HAND_ID}-json-old"', etag) is False
+    assert _if_none_match(f'"stale{etag}"', etag) is False
+    assert _if_none_match("", etag) is False
+    assert _if_none_match('"x", *', etag) is None
+
+
+def test_cached_hand_is_served_from_memory(client):
+    """Test that a cached response is returned with ETag headers"""
+    etag = f'"h1-{HAND_ID}-json"'
+    client.app.state.hand_cache.put(
+        (HAND_ID, "json"), b'{"id": "cached"}', "application/json", etag
+    )
+    hits = client.app.state.hand_cache.hits
+
+    response = client.get(f"/api/hands/{HAND_ID}")
+    assert response.status_code == 200
+    assert response.json() == {"id": "cached"}
+    assert response.headers["etag"] == etag
+    assert client.get("/health/cache").json()["hits"] == hits + 1
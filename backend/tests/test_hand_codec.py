@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.commands.backfill_hand_bin import encode_rows
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.domain.hand_codec import decode_hand, encode_hand
+from app.repository.hands_repo import HandsRepository
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+
+
+def make_hand(board=None, hole_cards=None) -> Hand:
+    actions = [Action(3, "preflop", "r", 120)]
+    actions += [Action(seat, "preflop", "f", 0) for seat in (4, 5, 0, 1)]
+    actions += [
+        Action(2, "preflop", "c", 80),
+        Action(2, "flop", "x", 0),
+        Action(3, "flop", "b", 80),
+        Action(2, "flop", "c", 80),
+        Action(2, "turn", "x", 0),
+        Action(3, "turn", "b", 300),
+        Action(2, "turn", "allin", 720),
+        Action(3, "turn", "c", 420),
+    ]
+    return Hand(
+        id=str(uuid.uuid4()),
+        created_at=datetime(2024, 3, 4, 5, 6, 7, 891011, tzinfo=timezone.utc),
+        bb_size=40,
+        seats=[
+            PlayerSnapshot(seat, f"Plâyer{seat}", 1000 + seat, ROLES[seat])
+            for seat in range(6)
+        ],
+        hole_cards=hole_cards if hole_cards is not None else {
+            seat: cards for seat, cards in enumerate(
+                ["As Ks", "Qd Jd", "Tc 9c", "8h 7h", "6s 5s", "4d 3d"]
+            )
+        },
+        board=board or Board("Ac Kh Qc", "Js", "Td"),
+        actions=actions,
+        short_line="Seat3:raise120 Seat4:fold Flop:Ac Kh Qc",
+        result={0: 0, 1: -20, 2: 1020, 3: -1000, 4: 0, 5: 0},
+    )
+
+
+def test_round_trip():
+    """Test that every field survives encode/decode"""
+    hand = make_hand()
+    assert decode_hand(encode_hand(hand)) == hand
+
+
+def test_round_trip_partial_board_and_unknown_cards():
+    """Test undealt streets and seats without hole cards"""
+    hand = make_hand(board=Board("Ac Kh Qc"), hole_cards={2: "Tc 9c", 3: "8h 7h"})
+    assert decode_hand(encode_hand(hand)) == hand
+
+
+def test_round_trip_all_in_ev():
+    """Test that a stored all-in EV survives, whether or not it equals the result"""
+    hand = make_hand()
+    pending = encode_hand(hand)
+    hand.ev_result = dict(hand.result)
+    assert len(encode_hand(hand)) == len(pending) + 1
+    assert decode_hand(encode_hand(hand)) == hand
+
+    hand.ev_result = {0: 0, 1: -20, 2: 412.57, 3: -392.57, 4: 0, 5: 0}
+    assert decode_hand(encode_hand(hand)).ev_result == hand.ev_result
+    # Hands encoded before their EV was sampled decode without one
+    assert decode_hand(pending).ev_result is None
+
+
+def test_rejects_unknown_version_and_bad_cards():
+    """Test version checking and card validation"""
+    data = bytearray(encode_hand(make_hand()))
+    data[0] = 99
+    with pytest.raises(ValueError, match="version"):
+        decode_hand(bytes(data))
+    with pytest.raises(ValueError, match="Invalid card"):
+        encode_hand(make_hand(board=Board("Ac Kh Xx")))
+
+
+def test_rejects_values_out_of_range():
+    """Test that values the format cannot hold are a ValueError, not a struct.error"""
+    hand = make_hand()
+    hand.seats[0].starting_stack = 2**32
+    with pytest.raises(ValueError, match="starting stack"):
+        encode_hand(hand)
+    hand.seats[0].starting_stack = -1
+    with pytest.raises(ValueError, match="starting stack"):
+        encode_hand(hand)
+    hand = make_hand()
+    hand.bb_size = -40
+    with pytest.raises(ValueError, match="bb_size"):
+        encode_hand(hand)
+    with pytest.raises(ValueError, match="bb_size"):
+        HandsRepository(None)._to_row(hand)
+
+
+def test_smaller_than_json():
+    """Test size against the JSON columns; decode speed is tracked by benchmarks/suite.py"""
+    hand = make_hand()
+    row = HandsRepository(None)._to_row(hand)
+    json_size = sum(len(value) for value in row[3:7]) + len(row[8])
+    assert len(encode_hand(hand)) * 4 < json_size
+
+
+def test_backfill_skips_rows_that_cannot_be_encoded():
+    repo = HandsRepository(None)
+    good = repo._to_row(make_hand())[:9]
+    legacy = list(repo._to_row(make_hand())[:9])
+    legacy[3] = legacy[3].replace('"BTN"', '"DEALER"')
+    updates, failed = encode_rows(repo, [good, tuple(legacy)])
+    assert failed == 1
+    assert [hand_id for _, hand_id in updates] == [good[0]]
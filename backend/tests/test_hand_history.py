@@ -0,0 +1,191 @@
+import gzip
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import (
+    get_hand_imports,
+    get_hand_keys,
+    get_hands_repo,
+    get_settlement_executor,
+)
+from app.domain.hand_history import HandHistoryReader, parse_hand
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.hand_imports import HandImports
+from app.services.idempotency import RecentHandKeys
+from app.services.settlement import SettlementService
+from app.services.settlement_pool import SettlementExecutor
+
+SHOWDOWN = """\
+PokerStars Hand #243717411876:  Hold'em No Limit ($0.25/$0.50 USD) - 2024/01/05 20:24:11 ET
+Table 'Aase III' 6-max Seat #3 is the button
+Seat 1: alice ($50 in chips)
+Seat 2: bob ($48.50 in chips)
+Seat 3: carol ($50 in chips)
+Seat 4: dave ($20 in chips)
+Seat 5: erin ($50 in chips)
+Seat 6: frank ($75.25 in chips)
+dave: posts small blind $0.25
+erin: posts big blind $0.50
+*** HOLE CARDS ***
+Dealt to carol [Ah Kd]
+frank: raises $1 to $1.50
+alice: folds
+bob: folds
+alice said, "gl"
+carol: raises $3.50 to $5
+dave: raises $15 to $20 and is all-in
+erin: folds
+frank: folds
+carol: calls $15
+*** FLOP *** [2c 7d Th]
+*** TURN *** [2c 7d Th] [Js]
+*** RIVER *** [2c 7d Th Js] [Qs]
+*** SHOW DOWN ***
+dave: shows [9s 9h] (a pair of Nines)
+carol: shows [Ah Kd] (a straight, Ten to Ace)
+carol collected $40.25 from pot
+*** SUMMARY ***
+Total pot $41.50 | Rake $1.25
+Board [2c 7d Th Js Qs]
+Seat 3: carol (button) showed [Ah Kd] and won ($40.25)
+Seat 4: dave (small blind) showed [9s 9h] and lost
+"""
+
+FIVE_HANDED = """\
+PokerStars Hand #243717411877:  Hold'em No Limit ($0.25/$0.50 USD) - 2024/01/05 20:25:00 ET
+Table 'Aase III' 6-max Seat #4 is the button
+Seat 1: alice ($50 in chips)
+Seat 2: bob ($48.50 in chips)
+Seat 3: carol ($90.25 in chips)
+Seat 5: erin ($49.50 in chips)
+Seat 6: frank ($73.75 in chips)
+erin: posts small blind $0.25
+frank: posts big blind $0.50
+*** HOLE CARDS ***
+alice: folds
+"""
+
+TOURNAMENT = """\
+PokerStars Hand #243717411878: Tournament #3001, $10+$1 USD Hold'em No Limit - Level II (15/30) - 2024/01/05 21:00:00 UTC
+Table '3001 4' 6-max Seat #1 is the button
+Seat 1: p1 (1500 in chips)
+Seat 2: p2 (1500 in chips)
+Seat 3: p3 (1500 in chips)
+Seat 4: p4 (1500 in chips)
+Seat 5: p5 (1500 in chips)
+Seat 6: p6 (1500 in chips)
+p2: posts small blind 15
+p3: posts big blind 30
+*** HOLE CARDS ***
+p4: raises 45 to 75
+p5: folds
+p6: folds
+p1: folds
+p2: folds
+p3: calls 45
+*** FLOP *** [2c 7d Th]
+p3: checks
+p4: bets 90
+p3: folds
+Uncalled bet (90) returned to p4
+p4 collected 165 from pot
+*** SUMMARY ***
+Seat 4: p4 collected (165)
+"""
+
+HISTORY = "\n\n\n".join([SHOWDOWN, FIVE_HANDED, TOURNAMENT]).encode()
+
+
+def read_all(data: bytes, chunk: int) -> list:
+    reader = HandHistoryReader()
+    parsed = []
+    for start in range(0, len(data), chunk):
+        parsed.extend(reader.feed(data[start:start + chunk]))
+    return parsed + reader.close()
+
+
+def test_parse_maps_seats_roles_and_cents():
+    hand = parse_hand(SHOWDOWN.splitlines())
+    assert hand.bb_size == 50
+    assert [(s.seat, s.name, s.role, s.starting_stack) for s in hand.seats][2:4] == [
+        (2, "carol", "BTN", 5000),
+        (3, "dave", "SB", 2000),
+    ]
+    assert hand.hole_cards == {2: "Ah Kd", 3: "9s 9h"}
+    assert hand.created_at == datetime(2024, 1, 6, 1, 24, 11)
+    raise_to = hand.actions[4]
+    assert (raise_to.seat, raise_to.type, raise_to.amount) == (3, "allin", 1975)
+
+    result, _, _ = SettlementService(ev_samples=50).validate_and_settle_hand(hand)
+    assert result[2] == 2200 and result[3] == -2000
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_reader_streams_plain_and_multi_member_gzip(compress):
+    data = gzip.compress(HISTORY[:700]) + gzip.compress(HISTORY[700:]) if compress else HISTORY
+    parsed = read_all(data, chunk=7)
+    assert [p.reference for p in parsed] == [
+        f"PokerStars Hand #24371741187{i}" for i in (6, 7, 8)
+    ]
+    assert parsed[1].line == 37 and "only 6-handed" in parsed[1].error
+    assert parsed[2].hand.bb_size == 30 and parsed[2].error is None
+
+
+def test_unsupported_hands_and_truncated_gzip():
+    with_ante = TOURNAMENT.replace("p2: posts small blind", "p1: posts the ante 5\np2: posts small blind")
+    with pytest.raises(ValueError, match="Antes"):
+        parse_hand(with_ante.splitlines())
+    with pytest.raises(ValueError, match="Truncated gzip"):
+        read_all(gzip.compress(HISTORY)[:-20], chunk=4096)
+
+
+@pytest.fixture
+def api():
+    repo = InMemoryHandsRepository()
+    imports = HandImports(batch_size=1)
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    app.dependency_overrides[get_hand_keys] = RecentHandKeys
+    app.dependency_overrides[get_settlement_executor] = lambda: SettlementExecutor("inline")
+    app.dependency_overrides[get_hand_imports] = lambda: imports
+    try:
+        yield TestClient(app), repo
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_import_endpoint_settles_saves_and_reports(api):
+    client, repo = api
+    response = client.post(
+        "/api/hands/import?name=january.txt.gz", content=gzip.compress(HISTORY)
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["status"], report["hands"], report["accepted"], report["rejected"]) == (
+        "done", 3, 2, 1
+    )
+    assert report["errors"] == [{
+        "hand": "PokerStars Hand #243717411877",
+        "line": 37,
+        "error": "Hand has 5 players; only 6-handed hands are supported",
+    }]
+    assert len(repo._hands) == 2
+
+    again = client.post("/api/hands/import", content=HISTORY).json()
+    assert (again["accepted"], again["replayed"]) == (2, 2)
+    assert len(repo._hands) == 2
+
+    listed = client.get("/api/hands/imports").json()["imports"]
+    assert [i["name"] for i in listed] == ["upload", "january.txt.gz"]
+    assert "errors" not in listed[0]
+    assert client.get(f"/api/hands/imports/{report['id']}").json()["accepted"] == 2
+    assert client.get("/api/hands/imports/missing").status_code == 404
+
+
+def test_import_of_corrupt_gzip_is_rejected(api):
+    client, _ = api
+    response = client.post("/api/hands/import", content=b"\x1f\x8b" + b"\x00" * 64)
+    assert response.status_code == 422
+    assert response.json()["detail"]["status"] == "failed"
@@ -1,25 +1,33 @@
+from datetime import datetime, timezone
+
 import pytest
 from fastapi.testclient import TestClient
+from app.api.cursor import decode_cursor, encode_cursor
+from app.api.hands import HandRequest, _build_hand
 from app.main import app
 
-client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
 
 
-def test_root_endpoint():
+def test_root_endpoint(client):
     """Test the root endpoint"""
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Poker API is running"}
 
 
-def test_health_check():
+def test_health_check(client):
     """Test the health check endpoint"""
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
 
-def test_create_hand_complete_poker_hand():
+def test_create_hand_complete_poker_hand(client):
     """Test creating a complete poker hand with validation"""
     hand_data = {
         "bb_size": 40,
@@ -51,9 +59,9 @@ def test_create_hand_complete_poker_hand():
             {"seat": 0, "street": "preflop", "type": "f", "amount": 0},
             {"seat": 1, "street": "preflop", "type": "f", "amount": 0},
             {"seat": 2, "street": "preflop", "type": "c", "amount": 80},
+            {"seat": 2, "street": "flop", "type": "x", "amount": 0},
             {"seat": 3, "street": "flop", "type": "b", "amount": 80},
             {"seat": 2, "street": "flop", "type": "c", "amount": 80},
-            {"seat": 3, "street": "turn", "type": "x", "amount": 0},
             {"seat": 2, "street": "turn", "type": "b", "amount": 160},
             {"seat": 3, "street": "turn", "type": "c", "amount": 160},
             {"seat": 2, "street": "river", "type": "x", "amount": 0},
@@ -82,7 +90,7 @@ def test_create_hand_complete_poker_hand():
     assert "River:Td" in short_line
 
 
-def test_create_hand_invalid_roles():
+def test_create_hand_invalid_roles(client):
     """Test creating a hand with invalid roles"""
     hand_data = {
         "bb_size": 40,
@@ -103,7 +111,7 @@ def test_create_hand_invalid_roles():
     assert response.status_code == 422
 
 
-def test_create_hand_wrong_player_count():
+def test_create_hand_wrong_player_count(client):
     """Test creating a hand with wrong number of players"""
     hand_data = {
         "bb_size": 40,
@@ -120,14 +128,138 @@ def test_create_hand_wrong_player_count():
     assert response.status_code == 422
 
 
-def test_list_hands():
+def _valid_hand(**changes):
+    hand = {
+        "bb_size": 40,
+        "seats": [
+            {"seat": seat, "name": f"Player{seat}", "starting_stack": 1000, "role": role}
+            for seat, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+        ],
+        "hole_cards": {"0": "As Kd"},
+        "board": {},
+        "actions": [{"seat": 3, "street": "preflop", "type": "f", "amount": 0}],
+    }
+    hand.update(changes)
+    return hand
+
+
+def test_built_hand_is_stamped_in_naive_utc():
+    """Test that created_at is naive UTC, like hands stamped anywhere else"""
+    hand = _build_hand(HandRequest(**_valid_hand()))
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert hand.created_at.tzinfo is None
+    assert abs((now - hand.created_at).total_seconds()) < 5
+
+
+@pytest.mark.parametrize("change", [
+    lambda hand: hand.update(bb_size=0),
+    lambda hand: hand.update(bb_size=-40),
+    lambda hand: hand.update(bb_size=2**31),
+    lambda hand: hand["seats"][0].update(starting_stack=-1),
+    lambda hand: hand["seats"][0].update(starting_stack=2**32),
+    lambda hand: hand["seats"][0].update(starting_stack="1000"),
+    lambda hand: hand["seats"][0].update(seat="0"),
+    lambda hand: hand["seats"][0].update(role=["BTN"]),
+    lambda hand: hand["actions"][0].update(seat="3"),
+    lambda hand: hand["actions"][0].update(amount="0"),
+    lambda hand: hand["actions"][0].update(amount=0.5),
+    lambda hand: hand["hole_cards"].update({"0": 12}),
+    lambda hand: hand["board"].update(flop=["As", "Kd", "Qh"]),
+])
+def test_create_hand_rejects_bad_types_and_ranges(client, change):
+    """Test that values of the wrong type or range are a 422, not a server error"""
+    hand = _valid_hand()
+    _build_hand(HandRequest(**hand))
+    change(hand)
+    response = client.post("/api/hands", json=hand)
+    assert response.status_code == 422
+
+
+def test_list_hands(client):
     """Test listing hands"""
     response = client.get("/api/hands")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
 
-def test_get_hand_not_found():
+def test_get_hand_not_found(client):
     """Test getting a non-existent hand"""
     response = client.get("/api/hands/non-existent-id")
     assert response.status_code == 404
+
+
+def test_db_health_reports_pool_stats(client):
+    """Test the pool stats endpoint"""
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["open"] is True
+    assert {"in_use", "waiting", "acquire_avg_ms", "max_size"} <= data.keys()
+
+
+def test_create_hands_batch_reports_per_hand_errors(client):
+    """Test that invalid hands in a batch are reported individually"""
+    bad_roles = {
+        "bb_size": 40,
+        "seats": [
+            {"seat": i, "name": f"Player{i}", "starting_stack": 1000, "role": "BTN"}
+            for i in range(6)
+        ],
+        "hole_cards": {},
+        "board": {},
+        "actions": []
+    }
+    missing_fields = {"bb_size": 40}
+
+    response = client.post("/api/hands/batch", json=[bad_roles, missing_fields])
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["accepted"] == 0
+    assert data["rejected"] == 2
+    assert [r["index"] for r in data["results"]] == [0, 1]
+    assert "Invalid roles" in data["results"][0]["error"]
+    assert "seats" in data["results"][1]["error"]
+
+
+def test_create_hands_batch_ndjson(client):
+    """Test NDJSON batch bodies, including an unparseable line"""
+    body = '{"bb_size": 40}\nnot json\n'
+    response = client.post(
+        "/api/hands/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["rejected"] == 2
+    assert data["results"][1]["error"].startswith("Invalid JSON")
+
+
+def test_create_hands_batch_rejects_non_array(client):
+    """Test that a JSON batch body must be an array"""
+    response = client.post("/api/hands/batch", json={"bb_size": 40})
+    assert response.status_code == 422
+
+
+def test_cursor_round_trip():
+    """Test that keyset cursors decode to the position they encode"""
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, "5f1c0c9e-0000-4000-8000-000000000000")
+    assert decode_cursor(cursor) == (
+        created_at, "5f1c0c9e-0000-4000-8000-000000000000"
+    )
+
+
+def test_list_hands_rejects_bad_cursor(client):
+    """Test that malformed cursors and cursor+offset are rejected"""
+    assert client.get("/api/hands?cursor=not-a-cursor").status_code == 422
+    cursor = encode_cursor(datetime(2024, 5, 1), "abc")
+    assert client.get(f"/api/hands?cursor={cursor}").status_code == 422
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+    cursor = encode_cursor(datetime(2024, 5, 1), "5f1c0c9e-0000-4000-8000-000000000000")
+    response = client.get(f"/api/hands?cursor={cursor}&offset=10")
+    assert response.status_code == 422
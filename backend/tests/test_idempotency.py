@@ -0,0 +1,226 @@
+import asyncio
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_hand_keys, get_hands_repo, get_settlement_executor
+from app.api.hands import HandRequest, _build_hand, _store_many
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.repository.write_behind import GroupCommitWriter
+from app.services.idempotency import RecentHandKeys, content_key, header_key
+from app.services.settlement_pool import SettlementExecutor
+
+HAND = {
+    "bb_size": 40,
+    "seats": [
+        {"seat": i, "name": f"Player{i}", "starting_stack": 1000, "role": role}
+        for i, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+    ],
+    "hole_cards": {"2": "As Ks"},
+    "board": {},
+    "actions": [
+        {"seat": seat, "street": "preflop", "type": "f", "amount": 0}
+        for seat in (3, 4, 5, 0, 1)
+    ],
+}
+
+
+def variant(stack: int) -> dict:
+    hand = copy.deepcopy(HAND)
+    hand["seats"][0]["starting_stack"] = stack
+    return hand
+
+
+class CountingExecutor(SettlementExecutor):
+    def __init__(self):
+        super().__init__("inline")
+        self.settled = 0
+
+    async def settle(self, hand):
+        self.settled += 1
+        return await super().settle(hand)
+
+    async def settle_many(self, batch):
+        self.settled += len(batch)
+        return await super().settle_many(batch)
+
+
+@pytest.fixture
+def api():
+    repo = InMemoryHandsRepository()
+    keys = RecentHandKeys()
+    executor = CountingExecutor()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    app.dependency_overrides[get_hand_keys] = lambda: keys
+    app.dependency_overrides[get_settlement_executor] = lambda: executor
+    try:
+        yield TestClient(app), repo, keys, executor
+    finally:
+        for dependency in (get_hands_repo, get_hand_keys, get_settlement_executor):
+            app.dependency_overrides.pop(dependency)
+
+
+def build(body: dict):
+    return _build_hand(HandRequest.model_validate(body))
+
+
+def test_content_key_ignores_key_order_and_seat_key_types():
+    reordered = {key: HAND[key] for key in reversed(list(HAND))}
+    reordered["hole_cards"] = {2: "As Ks"}
+    reordered["seats"] = [dict(reversed(list(seat.items()))) for seat in HAND["seats"]]
+    assert content_key(build(reordered)) == content_key(build(HAND))
+    assert content_key(build(variant(999))) != content_key(build(HAND))
+    assert header_key("abc") != header_key("abc", 0) != header_key("abc", 1)
+
+
+def test_retry_returns_original_without_settling_again(api):
+    client, repo, keys, executor = api
+    first = client.post("/api/hands", json=HAND)
+    retry = client.post("/api/hands", json=HAND)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert executor.settled == 1
+    assert len(asyncio.run(repo.list())) == 1
+
+
+def test_idempotency_key_header_wins_over_content(api):
+    client, repo, _, _ = api
+    first = client.post("/api/hands", json=HAND, headers={"Idempotency-Key": "t1-42"})
+    changed = client.post("/api/hands", json=variant(999), headers={"Idempotency-Key": "t1-42"})
+    other = client.post("/api/hands", json=HAND, headers={"Idempotency-Key": "t1-43"})
+
+    assert changed.json()["id"] == first.json()["id"]
+    assert other.json()["id"] != first.json()["id"]
+    assert len(asyncio.run(repo.list())) == 2
+
+    too_long = client.post("/api/hands", json=HAND, headers={"Idempotency-Key": "k" * 256})
+    assert too_long.status_code == 422
+
+
+def test_stored_key_is_found_after_the_cache_forgets_it(api):
+    """A retry after a restart is settled again but not stored twice"""
+    client, repo, keys, executor = api
+    first = client.post("/api/hands", json=HAND).json()
+    app.dependency_overrides[get_hand_keys] = lambda: RecentHandKeys()
+
+    retry = client.post("/api/hands", json=HAND)
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json()["id"] == first["id"]
+    assert executor.settled == 2
+    assert len(asyncio.run(repo.list())) == 1
+
+
+def test_batch_replays_earlier_and_repeated_hands(api):
+    client, repo, _, executor = api
+    single = client.post("/api/hands", json=HAND).json()
+
+    body = [HAND, variant(900), variant(900), {"bb_size": 40}]
+    first = client.post("/api/hands/batch", json=body).json()
+    assert (first["accepted"], first["replayed"], first["rejected"]) == (3, 2, 1)
+    results = first["results"]
+    assert results[0]["id"] == single["id"] and results[0]["replayed"]
+    assert "replayed" not in results[1]
+    assert results[2]["id"] == results[1]["id"] and results[2]["index"] == 2
+    assert executor.settled == 2
+
+    again = client.post("/api/hands/batch", json=body).json()
+    assert [r.get("id") for r in again["results"]] == [r.get("id") for r in results]
+    assert again["replayed"] == 3
+    assert executor.settled == 2
+    assert len(asyncio.run(repo.list())) == 2
+
+
+def test_concurrent_claim_waits_for_the_owner():
+    async def scenario():
+        keys = RecentHandKeys()
+        assert await keys.claim(b"k") is None
+        waiter = asyncio.create_task(keys.claim(b"k"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        keys.finish(b"k", {"id": "1"})
+        return await waiter, keys.stats()
+
+    response, stats = asyncio.run(scenario())
+    assert response == {"id": "1"}
+    assert stats["waits"] == 1 and stats["pending"] == 0
+
+
+def test_failed_owner_hands_the_key_over():
+    async def scenario():
+        keys = RecentHandKeys()
+        await keys.claim(b"k")
+        waiter = asyncio.create_task(keys.claim(b"k"))
+        await asyncio.sleep(0)
+        keys.finish(b"k", None)
+        return await waiter, keys.stats()
+
+    response, stats = asyncio.run(scenario())
+    assert response is None
+    assert stats["pending"] == 1
+
+
+def test_batches_never_wait_on_keys_settling_elsewhere():
+    async def scenario():
+        repo = InMemoryHandsRepository()
+        keys = RecentHandKeys()
+        executor = SettlementExecutor("inline")
+        hands = [build(HAND), build(variant(900))]
+        hand_keys = [content_key(hand) for hand in hands]
+        # A single submission of the second hand is still settling
+        assert await keys.claim(hand_keys[1]) is None
+        first = await asyncio.wait_for(_store_many(hands, hand_keys, repo, executor, keys), 1)
+        # Same keys in the opposite order, twice at once
+        reordered = [build(variant(900)), build(HAND)]
+        again = await asyncio.wait_for(asyncio.gather(
+            _store_many(reordered, hand_keys[::-1], repo, executor, keys),
+            _store_many(reordered, hand_keys[::-1], repo, executor, keys),
+        ), 1)
+        return first, again, keys.stats()
+
+    first, again, stats = asyncio.run(scenario())
+    assert all("replayed" not in outcome for outcome in first)
+    for outcomes in again:
+        assert [o["id"] for o in outcomes] == [first[1]["id"], first[0]["id"]]
+        assert all(o["replayed"] for o in outcomes)
+    assert stats["pending"] == 1 and stats["waits"] == 0
+
+
+def test_batch_rejects_only_hands_the_codec_cannot_store():
+    async def scenario():
+        repo = InMemoryHandsRepository()
+        hands = [build(HAND), build(variant(900))]
+        # Parsed hand histories do not pass through _build_hand's checks
+        hands[1].seats[0].starting_stack = 2**32
+        outcomes = await _store_many(
+            hands, [content_key(hand) for hand in hands],
+            repo, SettlementExecutor("inline"), RecentHandKeys(),
+        )
+        return outcomes, repo
+
+    outcomes, repo = asyncio.run(scenario())
+    assert outcomes[0]["id"] in repo._hands
+    assert "starting stack" in outcomes[1]
+    assert len(repo._hands) == 1
+
+
+def test_write_behind_reports_taken_keys():
+    async def scenario():
+        repo = InMemoryHandsRepository()
+        writer = GroupCommitWriter(repo, max_batch=10, max_delay_ms=20)
+        writer.start()
+        first, second = build(HAND), build(HAND)
+        results = await asyncio.gather(
+            writer.save(first, (b"k", {"id": first.id})),
+            writer.save(second, (b"k", {"id": second.id})),
+        )
+        await writer.stop()
+        return results, first, writer.stats()
+
+    results, first, stats = asyncio.run(scenario())
+    assert results == [None, {"id": first.id}]
+    assert stats["written"] == 1 and stats["duplicates"] == 1
@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_hands_repo, get_live_tables
+from app.domain.action import ActionError
+from app.domain.hand import Action
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.live_tables import LiveTableRegistry, TableLimitReached
+from test_settlement import make_hand
+
+SEATS = [
+    {"seat": seat, "name": f"Player{seat}", "starting_stack": 1000, "role": role}
+    for seat, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+]
+HOLE_CARDS = {"2": "2c 2d", "3": "Ah As"}
+
+
+def blank_hand(index):
+    hand = make_hand([], HOLE_CARDS, board=(None, None, None))
+    hand.id = f"hand-{index}"
+    return hand
+
+
+def test_registry_applies_actions_incrementally():
+    tables = LiveTableRegistry(max_tables=3000)
+    open_tables = [tables.open(blank_hand(i)) for i in range(3000)]
+    # Interleave one action per table, as thousands of live tables would
+    for seat in (3, 4, 5):
+        for table in open_tables:
+            table.act(Action(seat, "preflop", "f" if seat != 3 else "r", 120 if seat == 3 else 0))
+    view = open_tables[-1].view()
+    assert view["to_act"] == 0
+    assert view["pot"] == 180
+    assert view["actions"] == 3
+
+    with pytest.raises(ActionError):
+        open_tables[0].act(Action(2, "preflop", "c", 80))
+    with pytest.raises(TableLimitReached):
+        tables.open(blank_hand(3000))
+
+
+def test_registry_expires_idle_hands():
+    tables = LiveTableRegistry(max_tables=2, idle_seconds=60)
+    first = tables.open(blank_hand(0))
+    tables.open(blank_hand(1))
+    first.touched -= 120
+    tables.open(blank_hand(2))
+    assert tables.get("hand-0") is None
+    assert tables.stats()["expired"] == 1
+    assert tables.stats()["open"] == 2
+
+
+@pytest.fixture
+def live_client():
+    repo = InMemoryHandsRepository()
+    tables = LiveTableRegistry()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    app.dependency_overrides[get_live_tables] = lambda: tables
+    try:
+        yield TestClient(app), repo, tables
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+        app.dependency_overrides.pop(get_live_tables)
+
+
+def test_websocket_hand_is_validated_settled_and_saved(live_client):
+    """Test a hand streamed action by action over the live-table socket"""
+    client, repo, tables = live_client
+    with client.websocket_connect("/api/tables/live") as ws:
+        ws.send_json({"op": "action", "seat": 3, "street": "preflop", "type": "r", "amount": 120})
+        assert ws.receive_json() == {"op": "error", "detail": "Open a hand first"}
+
+        ws.send_json({"op": "open", "bb_size": 40, "seats": SEATS, "hole_cards": HOLE_CARDS})
+        opened = ws.receive_json()
+        assert opened["op"] == "opened"
+        assert opened["state"]["to_act"] == 3
+        assert opened["state"]["pot"] == 60
+
+        ws.send_json({"op": "action", "seat": 4, "street": "preflop", "type": "f", "amount": 0})
+        illegal = ws.receive_json()
+        assert illegal["op"] == "illegal"
+        assert illegal["index"] == 0
+        assert "out of turn" in illegal["reason"]
+
+        actions = [(3, "r", 120), (4, "f", 0), (5, "f", 0), (0, "f", 0), (1, "f", 0), (2, "c", 80)]
+        for seat, action_type, amount in actions:
+            ws.send_json({
+                "op": "action", "seat": seat, "street": "preflop",
+                "type": action_type, "amount": amount,
+            })
+            reply = ws.receive_json()
+            assert reply["op"] == "state"
+        assert reply["state"]["street"] == "flop"
+        assert reply["state"]["pot"] == 260
+
+        ws.send_json({"op": "finish"})
+        assert "to act" in ws.receive_json()["detail"]
+
+        for street in ("flop", "turn", "river"):
+            for seat in (2, 3):
+                ws.send_json({"op": "action", "seat": seat, "street": street, "type": "x", "amount": 0})
+                ws.receive_json()
+        ws.send_json({"op": "board", "flop": "7c 8d 9h", "turn": "Js", "river": "3c"})
+        assert ws.receive_json()["state"]["complete"] is True
+
+        ws.send_json({"op": "finish"})
+        settled = ws.receive_json()
+        assert settled["op"] == "settled"
+        assert settled["result"]["3"] == 140
+        assert settled["ev_result"] == settled["result"]
+
+    hand = asyncio.run(repo.get(settled["id"]))
+    assert len(hand.actions) == 12
+    assert tables.stats()["finished"] == 1
+    assert tables.stats()["open"] == 0
+
+
+def test_websocket_resume_after_disconnect(live_client):
+    client, _, tables = live_client
+    with client.websocket_connect("/api/tables/live") as ws:
+        ws.send_json({"op": "open", "bb_size": 40, "seats": SEATS})
+        hand_id = ws.receive_json()["state"]["hand_id"]
+        ws.send_json({"op": "action", "seat": 3, "street": "preflop", "type": "f", "amount": 0})
+        ws.receive_json()
+
+    with client.websocket_connect("/api/tables/live") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json()["op"] == "error"
+        ws.send_json({"op": "resume", "hand_id": hand_id})
+        resumed = ws.receive_json()
+        assert resumed["state"]["actions"] == 1
+        assert resumed["state"]["to_act"] == 4
+        ws.send_json({"op": "abandon"})
+        assert ws.receive_json() == {"op": "abandoned"}
+    assert tables.get(hand_id) is None
+
+
+def test_resume_is_refused_while_another_connection_holds_the_hand(live_client):
+    client, _, _ = live_client
+    with client.websocket_connect("/api/tables/live") as first:
+        first.send_json({"op": "open", "bb_size": 40, "seats": SEATS})
+        hand_id = first.receive_json()["state"]["hand_id"]
+        with client.websocket_connect("/api/tables/live") as second:
+            second.send_json({"op": "resume", "hand_id": hand_id})
+            refused = second.receive_json()
+            assert refused["op"] == "error" and refused["retry"] is True
+
+            first.send_json({"op": "action", "seat": 3, "street": "preflop", "type": "f", "amount": 0})
+            assert first.receive_json()["state"]["actions"] == 1
+
+    with client.websocket_connect("/api/tables/live") as third:
+        third.send_json({"op": "resume", "hand_id": hand_id})
+        assert third.receive_json()["op"] == "opened"
+
+
+class FlakyRepository(InMemoryHandsRepository):
+    def __init__(self):
+        super().__init__()
+        self.failures = 1
+
+    async def save(self, hand, key=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database went away")
+        return await super().save(hand, key)
+
+
+def test_failed_save_keeps_the_hand_open_for_a_retry():
+    repo = FlakyRepository()
+    tables = LiveTableRegistry()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    app.dependency_overrides[get_live_tables] = lambda: tables
+    try:
+        with TestClient(app).websocket_connect("/api/tables/live") as ws:
+            ws.send_json({"op": "open", "bb_size": 40, "seats": SEATS, "hole_cards": HOLE_CARDS})
+            ws.receive_json()
+            ws.send_json({"op": "action", "seat": 3, "street": ["preflop"], "type": "f", "amount": 0})
+            assert ws.receive_json()["detail"] == "Action street and type must be strings"
+            for seat in (3, 4, 5, 0, 1):
+                ws.send_json({"op": "action", "seat": seat, "street": "preflop", "type": "f", "amount": 0})
+                ws.receive_json()
+
+            ws.send_json({"op": "finish"})
+            assert ws.receive_json() == {"op": "error", "detail": "Could not save the hand", "retry": True}
+            ws.send_json({"op": "finish"})
+            settled = ws.receive_json()
+            assert settled["op"] == "settled"
+        assert asyncio.run(repo.get(settled["id"])) is not None
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+        app.dependency_overrides.pop(get_live_tables)
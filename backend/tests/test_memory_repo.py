@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.repository.memory_repo import InMemoryHandsRepository
+from benchmarks.suite import compare, make_long_hands
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_hand(index: int) -> Hand:
+    return Hand(
+        id=str(uuid.UUID(int=index + 1)),
+        created_at=EPOCH + timedelta(minutes=index),
+        bb_size=40,
+        seats=[PlayerSnapshot(s, f"Player{s}", 1000, ROLES[s]) for s in range(6)],
+        hole_cards={},
+        board=Board(),
+        actions=[Action(seat, "preflop", "f", 0) for seat in (3, 4, 5, 0, 1)],
+        short_line="Seat3:fold",
+        result={1: -20, 2: 20},
+    )
+
+
+def filled_repo(count: int) -> InMemoryHandsRepository:
+    repo = InMemoryHandsRepository()
+    asyncio.run(repo.save_many([make_hand(i) for i in reversed(range(count))]))
+    return repo
+
+
+def test_summaries_page_newest_first():
+    repo = filled_repo(5)
+    first = asyncio.run(repo.list_summaries(limit=2))
+    assert [s.id for s in first] == [make_hand(4).id, make_hand(3).id]
+
+    last = first[-1]
+    second = asyncio.run(repo.list_summaries(limit=2, before=(last.created_at, last.id)))
+    assert [s.id for s in second] == [make_hand(2).id, make_hand(1).id]
+
+    by_offset = asyncio.run(repo.list_summaries(limit=2, offset=4))
+    assert [s.id for s in by_offset] == [make_hand(0).id]
+
+
+def test_stream_resumes_after_position():
+    repo = filled_repo(4)
+
+    async def collect(**kwargs):
+        return [hand.id async for hand in repo.stream(**kwargs)]
+
+    start = make_hand(1)
+    assert asyncio.run(collect(after=(start.created_at, start.id))) == [
+        make_hand(2).id, make_hand(3).id,
+    ]
+    assert asyncio.run(collect(until=make_hand(2).created_at)) == [
+        make_hand(0).id, make_hand(1).id,
+    ]
+
+
+def test_get_and_encoded():
+    repo = filled_repo(1)
+    assert asyncio.run(repo.get(make_hand(0).id)).short_line == "Seat3:fold"
+    assert asyncio.run(repo.get_encoded(make_hand(0).id))[0] == 1
+    assert asyncio.run(repo.get("missing")) is None
+
+
+def test_long_fixture_hands_are_legal():
+    hands = make_long_hands(2)
+    assert len(hands[0].actions) >= 25
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {"a": {"ops_per_sec": 1000.0}, "b": {"ops_per_sec": 1000.0}}
+    results = {
+        "a": {"ops_per_sec": 850.0},
+        "b": {"ops_per_sec": 700.0},
+        "new": {"ops_per_sec": 1.0},
+    }
+    regressions = compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("b:")
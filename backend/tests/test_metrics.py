@@ -0,0 +1,79 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_hands_repo
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.metrics import Histogram, MetricsRegistry, metrics
+
+HAND = {
+    "bb_size": 40,
+    "seats": [
+        {"seat": i, "name": f"Player{i}", "starting_stack": 1000, "role": role}
+        for i, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+    ],
+    "hole_cards": {},
+    "board": {},
+    "actions": [
+        {"seat": seat, "street": "preflop", "type": "f", "amount": 0}
+        for seat in (3, 4, 5, 0, 1)
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    repo = InMemoryHandsRepository()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_hands_repo)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("t_seconds", "Test", ["stage"], buckets=(0.1, 1.0))
+    child = histogram.labels("a")
+    for value in (0.05, 0.5, 5.0):
+        child.observe(value)
+    lines = histogram.render()
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="a"} 3' in lines
+
+
+def test_disabled_registry_skips_observations():
+    registry = MetricsRegistry()
+    registry.enabled = False
+    child = registry.histogram("t", "Test").labels()
+    child.observe_since(registry.now())
+    assert child.count == 0
+
+
+def test_create_hand_records_stages(client):
+    response = client.post("/api/hands", json=HAND)
+    assert response.status_code == 201
+
+    body = client.get("/metrics").text
+    for stage in ("parse", "build", "validate", "settle", "short_line"):
+        assert f'poker_stage_seconds_count{{stage="{stage}"}}' in body
+    # The route label is the matched template, not the raw path
+    assert 'poker_requests_total{method="POST",route="' in body
+    assert '/hands",status="201"}' in body
+    assert "poker_db_pool_in_use" in body
+
+
+def test_invalid_body_keeps_fastapi_error_shape(client):
+    response = client.post("/api/hands", json={"bb_size": 40})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == "body"
+
+
+def test_tracing_can_be_switched_off(client):
+    assert client.put("/metrics/tracing?enabled=false").json() == {"enabled": False}
+    try:
+        assert not metrics.enabled
+        assert "poker_tracing_enabled 0" in client.get("/metrics").text
+    finally:
+        client.put("/metrics/tracing?enabled=true")
+    assert metrics.enabled
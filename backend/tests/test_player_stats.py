@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_player_stats_repo
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.main import app
+from app.services.player_stats import PlayerStats, aggregate_player_stats, hand_player_stats
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+
+
+def make_hand(actions, result, names=None):
+    names = names or [f"Player{seat}" for seat in range(6)]
+    return Hand(
+        id=str(uuid.uuid4()),
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        bb_size=40,
+        seats=[PlayerSnapshot(seat, names[seat], 1000, ROLES[seat]) for seat in range(6)],
+        hole_cards={},
+        board=Board("Ac Kh Qc", "Js", "Td"),
+        actions=[Action(*a) for a in actions],
+        short_line="",
+        result=result,
+    )
+
+
+RAISED_POT = [
+    (3, "preflop", "r", 120),
+    (4, "preflop", "f", 0),
+    (5, "preflop", "f", 0),
+    (0, "preflop", "f", 0),
+    (1, "preflop", "f", 0),
+    (2, "preflop", "c", 80),
+    (2, "flop", "x", 0),
+    (3, "flop", "b", 100),
+    (2, "flop", "c", 100),
+    (2, "turn", "x", 0),
+    (3, "turn", "x", 0),
+    (2, "river", "b", 200),
+    (3, "river", "c", 200),
+]
+
+
+def test_hand_player_stats_counts_actions():
+    stats = hand_player_stats(make_hand(RAISED_POT, {1: -20, 2: 420, 3: -420}))
+    assert stats["Player3"] == PlayerStats(1, 1, 1, 1, 1, 1, -420)
+    assert stats["Player2"] == PlayerStats(1, 1, 0, 1, 1, 1, 420)
+    assert stats["Player1"] == PlayerStats(hands_played=1, net_result=-20)
+    assert stats["Player0"] == PlayerStats(hands_played=1)
+
+
+def test_no_showdown_when_everyone_folds():
+    actions = [(seat, "preflop", "f", 0) for seat in (3, 4, 5, 0, 1)]
+    stats = hand_player_stats(make_hand(actions, {1: -20, 2: 20}))
+    assert all(s.showdowns == 0 for s in stats.values())
+    assert stats["Player2"].vpip_hands == 0
+
+
+def test_aggregate_merges_hands_by_name():
+    hands = [make_hand(RAISED_POT, {1: -20, 2: 420, 3: -420}) for _ in range(3)]
+    totals = aggregate_player_stats(hands)
+    assert totals["Player3"].hands_played == 3
+    assert totals["Player3"].net_result == -1260
+    assert totals["Player3"].as_dict()["vpip"] == 1.0
+    assert totals["Player3"].as_dict()["af"] == 1.0
+    assert totals["Player0"].as_dict()["af"] is None
+
+
+class StatsRepo:
+    def __init__(self, totals):
+        self.totals = totals
+
+    async def get(self, name):
+        return self.totals.get(name)
+
+    async def leaderboard(self, order_by="net_result", limit=20, min_hands=0):
+        rows = [
+            (name, stats) for name, stats in self.totals.items()
+            if stats.hands_played >= min_hands
+        ]
+        rows.sort(key=lambda row: (-getattr(row[1], order_by), row[0]))
+        return rows[:limit]
+
+
+@pytest.fixture(scope="module")
+def client():
+    totals = aggregate_player_stats([make_hand(RAISED_POT, {1: -20, 2: 420, 3: -420})])
+    app.dependency_overrides[get_player_stats_repo] = lambda: StatsRepo(totals)
+    with TestClient(app) as client:
+        yield client
+    app.dependency_overrides.pop(get_player_stats_repo)
+
+
+def test_player_stats_endpoint(client):
+    response = client.get("/api/players/Player2/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["name"] == "Player2"
+    assert data["net_result"] == 420
+    assert data["vpip"] == 1.0
+
+
+def test_player_stats_not_found(client):
+    assert client.get("/api/players/Nobody/stats").status_code == 404
+
+
+def test_leaderboard(client):
+    response = client.get("/api/players/leaderboard?by=net_result&limit=2")
+    assert response.status_code == 200
+    assert [row["name"] for row in response.json()] == ["Player2", "Player0"]
+
+
+def test_leaderboard_rejects_unknown_order(client):
+    assert client.get("/api/players/leaderboard?by=name").status_code == 422
@@ -0,0 +1,149 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_hands_repo
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.main import app
+from app.services.replay import HandReplay, ReplayCache
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+HAND_ID = str(uuid.UUID(int=11))
+
+ACTIONS = [
+    (3, "preflop", "r", 120),
+    (4, "preflop", "f", 0),
+    (5, "preflop", "f", 0),
+    (0, "preflop", "f", 0),
+    (1, "preflop", "f", 0),
+    (2, "preflop", "c", 80),
+    (2, "flop", "x", 0),
+    (3, "flop", "b", 80),
+    (2, "flop", "c", 80),
+    (2, "turn", "b", 160),
+    (3, "turn", "c", 160),
+    (2, "river", "x", 0),
+    (3, "river", "x", 0),
+]
+
+
+def make_hand(actions=ACTIONS):
+    return Hand(
+        id=HAND_ID,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        bb_size=40,
+        seats=[PlayerSnapshot(seat, f"Player{seat}", 1000, ROLES[seat]) for seat in range(6)],
+        hole_cards={2: "Tc 9c", 3: "8h 7h"},
+        board=Board("Ac Kh Qc", "Js", "Td"),
+        actions=[Action(*a) for a in actions],
+        short_line="",
+        result={},
+    )
+
+
+def test_blinds_snapshot():
+    snapshot = HandReplay(make_hand()).snapshot(0)
+    assert snapshot["action"] is None
+    assert snapshot["pot"] == 60
+    assert snapshot["to_act"] == 3
+    assert snapshot["board"] == {"flop": None, "turn": None, "river": None}
+
+
+def test_board_follows_the_street():
+    replay = HandReplay(make_hand())
+    assert replay.snapshot(5)["board"]["flop"] is None
+    after_preflop = replay.snapshot(6)
+    assert after_preflop["street"] == "flop"
+    assert after_preflop["board"]["flop"] == "Ac Kh Qc"
+    assert after_preflop["to_act"] == 2
+    assert replay.snapshot(11)["board"]["river"] == "Td"
+
+
+def test_random_access_matches_full_pass():
+    full = HandReplay(make_hand(), checkpoint_interval=4).snapshots()
+    replay = HandReplay(make_hand(), checkpoint_interval=4)
+    for step in (13, 2, 9, 0, 7):
+        assert replay.snapshot(step) == full[step]
+    assert full[-1]["pot"] == 740
+    assert full[-1]["stacks"][3] == 640
+
+
+def test_checkpoints_bound_the_replay():
+    replay = HandReplay(make_hand(), checkpoint_interval=4)
+    replay.snapshot(13)
+    assert sorted(replay._checkpoints) == [0, 4, 8, 12]
+    assert replay._checkpoints[8].street == "flop"
+
+
+def test_all_in_runs_out_the_board():
+    actions = [(3, "preflop", "allin", 1000)] + [
+        (seat, "preflop", "f", 0) for seat in (4, 5, 0, 1)
+    ] + [(2, "preflop", "allin", 960)]
+    last = HandReplay(make_hand(actions)).snapshots()[-1]
+    assert last["to_act"] is None
+    assert last["board"]["river"] == "Td"
+
+
+def test_replay_cache_is_bounded():
+    cache = ReplayCache(max_entries=2)
+    for hand_id in ("a", "b", "c"):
+        cache.load(hand_id, make_hand())
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+class CountingRepo:
+    def __init__(self, hand):
+        self.hand = hand
+        self.reads = 0
+
+    async def get(self, hand_id):
+        self.reads += 1
+        return self.hand if hand_id == self.hand.id else None
+
+
+@pytest.fixture(scope="module")
+def repo():
+    repo = CountingRepo(make_hand())
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    yield repo
+    app.dependency_overrides.pop(get_hands_repo)
+
+
+@pytest.fixture(scope="module")
+def client(repo):
+    with TestClient(app) as client:
+        yield client
+
+
+def test_replay_endpoint(client, repo):
+    response = client.get(f"/api/hands/{HAND_ID}/replay")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["steps"] == len(ACTIONS) + 1
+    assert data["snapshots"][6]["board"]["flop"] == "Ac Kh Qc"
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_replay_step_is_memoized(client, repo):
+    client.get(f"/api/hands/{HAND_ID}/replay?step=3")
+    reads = repo.reads
+    response = client.get(f"/api/hands/{HAND_ID}/replay?step=10")
+    assert response.status_code == 200
+    assert response.json()["action"] == {
+        "seat": 2, "street": "turn", "type": "b", "amount": 160,
+    }
+    assert repo.reads == reads
+
+
+def test_replay_step_out_of_range(client):
+    response = client.get(f"/api/hands/{HAND_ID}/replay?step=14")
+    assert response.status_code == 422
+
+
+def test_replay_not_found(client):
+    response = client.get(f"/api/hands/{uuid.UUID(int=12)}/replay")
+    assert response.status_code == 404
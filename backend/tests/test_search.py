@@ -0,0 +1,126 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.dependencies import get_hands_repo
+from app.domain.search import (
+    HandSearch, board_cards, hand_pot, matches, parse_action, parse_card,
+    player_action_tokens, showdown_players, winner_seats,
+)
+from app.main import app
+from app.repository.hands_repo import _search_conditions
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services.settlement import SettlementService
+from benchmarks.suite import make_fixtures
+from test_memory_repo import make_hand
+
+
+def settled_hands():
+    service = SettlementService()
+    fixtures = make_fixtures(20)
+    hands = fixtures["typical"] + fixtures["multi_all_in"] + [make_hand(100)]
+    for hand in hands[:-1]:
+        hand.result, hand.short_line, _ = service.validate_and_settle_hand(hand)
+    return hands
+
+
+def test_derived_values():
+    """Test the Python definitions behind the generated columns"""
+    walk = make_hand(0)  # everyone folds to the big blind
+    assert hand_pot(walk) == 60
+    assert showdown_players(walk) == 0
+    assert winner_seats(walk) == [2]
+    assert board_cards(walk) == []
+
+    called = settled_hands()[0]
+    assert hand_pot(called) == 360  # three players in for 120
+    assert showdown_players(called) == 3
+    assert len(board_cards(called)) == 5
+    raiser = next(a for a in called.actions if a.type == "r")
+    assert f"Player{raiser.seat}:preflop:r" in player_action_tokens(called)
+
+
+def test_matches_combines_filters():
+    """Test that every filter must hold and player actions are per player"""
+    hand = settled_hands()[0]
+    raiser = next(a.seat for a in hand.actions if a.type == "r")
+    caller = next(a.seat for a in hand.actions if a.type == "c")
+    card = board_cards(hand)[0]
+
+    assert matches(HandSearch(player=f"Player{raiser}", action=("preflop", "r")), hand)
+    assert not matches(HandSearch(player=f"Player{caller}", action=("preflop", "r")), hand)
+    assert matches(HandSearch(action=("preflop", "r"), board_cards=[card]), hand)
+    assert matches(HandSearch(min_pot_bb=9, max_pot_bb=9, showdown=True), hand)
+    assert not matches(HandSearch(min_pot_bb=9.5), hand)
+    assert not matches(HandSearch(showdown=False), hand)
+
+
+def test_parse_rejects_bad_patterns():
+    assert parse_action("flop:b") == ("flop", "b")
+    assert parse_card("Ah") == "Ah"
+    for value in ("preflop", "flop:z", "showdown:r"):
+        with pytest.raises(ValueError):
+            parse_action(value)
+    with pytest.raises(ValueError):
+        parse_card("1x")
+
+
+def test_sql_conditions_use_indexed_forms():
+    """Test each filter becomes the predicate its index serves"""
+    conditions, params = _search_conditions(HandSearch(
+        player="Player3", action=("preflop", "r"), board_cards=["Ah"],
+        min_pot_bb=100, showdown=True, winner_seat=3, text="50%_off",
+    ))
+    assert conditions == [
+        "seats_json @> %s::jsonb",
+        "player_actions @> %s::TEXT[]",
+        "board_cards @> %s::TEXT[]",
+        "pot::FLOAT8 / bb_size >= %s",
+        "showdown_players > 0",
+        "winner_seats @> %s::INT[]",
+        "short_line ILIKE %s",
+    ]
+    assert params == [
+        '[{"name":"Player3"}]', ["Player3:preflop:r"], ["Ah"], 100, [3],
+        "%50\\%\\_off%",
+    ]
+
+    conditions, params = _search_conditions(HandSearch(action=("river", "b")))
+    assert conditions == ["actions_json @> %s::jsonb"]
+    assert params == ['[{"street":"river","type":"b"}]']
+
+
+def test_search_endpoint_pages_matches():
+    """Test the endpoint against the in-memory repository"""
+    hands = settled_hands()
+    repo = InMemoryHandsRepository()
+    asyncio.run(repo.save_many(hands))
+    expected = [
+        hand.id for hand in sorted(hands, key=lambda h: (h.created_at, h.id), reverse=True)
+        if showdown_players(hand) and hand_pot(hand) >= 20 * hand.bb_size
+    ]
+    assert len(expected) > 3
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+
+    async def fetch_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            bad = await client.get("/api/hands/search?action=preflop:q")
+            assert bad.status_code == 422
+            ids, cursor = [], None
+            while True:
+                params = {"showdown": "true", "min_pot_bb": 20, "limit": 3}
+                if cursor:
+                    params["cursor"] = cursor
+                response = await client.get("/api/hands/search", params=params)
+                assert response.status_code == 200
+                ids += [hand["id"] for hand in response.json()]
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    return ids
+
+    try:
+        assert asyncio.run(fetch_all()) == expected
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
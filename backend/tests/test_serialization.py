@@ -0,0 +1,41 @@
+import asyncio
+import json
+from dataclasses import asdict
+
+import httpx
+
+from app.api.dependencies import get_hands_repo
+from app.domain.serialization import dumps, dumps_text, loads
+from app.main import app
+from test_memory_repo import filled_repo, make_hand
+
+
+def test_dumps_matches_json_of_asdict():
+    """Test orjson output has the same shape as the stdlib encoding"""
+    hand = make_hand(0)
+    expected = json.loads(json.dumps(asdict(hand), default=str))
+    expected["created_at"] = hand.created_at.isoformat()
+    assert loads(dumps(hand)) == expected
+    assert loads(dumps_text({1: "a"})) == {"1": "a"}
+
+
+def test_list_hands_returns_array_with_cursor():
+    """Test the list endpoint still renders a JSON array of summaries"""
+    repo = filled_repo(3)
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+
+    async def fetch():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/hands?limit=2")
+
+    try:
+        response = asyncio.run(fetch())
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert [hand["id"] for hand in body] == [make_hand(2).id, make_hand(1).id]
+    assert set(body[0]) >= {"id", "created_at", "short_line", "result"}
+    assert "X-Next-Cursor" in response.headers
@@ -0,0 +1,156 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from app.domain.hand import Action, Board, Hand, PlayerSnapshot
+from app.services.settlement import SettlementService, _award_side_pots, award_pots
+
+ROLES = ["BTN", "SB", "BB", "UTG", "MP", "CO"]
+
+
+def make_hand(actions, hole_cards, board=("Ac Kh Qc", "Js", "Td"), stacks=None):
+    stacks = stacks or [1000] * 6
+    return Hand(
+        id="test",
+        created_at=datetime(2024, 1, 1),
+        bb_size=40,
+        seats=[
+            PlayerSnapshot(seat, f"Player{seat}", stacks[seat], ROLES[seat])
+            for seat in range(6)
+        ],
+        hole_cards=hole_cards,
+        board=Board(*board),
+        actions=[Action(*a) for a in actions],
+        short_line="",
+        result={},
+    )
+
+
+def folds(*seats):
+    return [(seat, "preflop", "f", 0) for seat in seats]
+
+
+def test_everyone_folds_to_big_blind():
+    """Test that the last player standing takes the blinds"""
+    hand = make_hand(folds(3, 4, 5, 0, 1), {}, board=(None, None, None))
+    result = SettlementService()._settle_hand(hand)
+    assert result == {0: 0, 1: -20, 2: 20, 3: 0, 4: 0, 5: 0}
+
+
+def test_best_hand_wins_showdown():
+    """Test a heads-up showdown with a clear winner"""
+    hand = make_hand(
+        [(3, "preflop", "r", 120)] + folds(4, 5, 0, 1) + [(2, "preflop", "c", 80)],
+        {"2": "2c 2d", "3": "Ah As"},
+        board=("7c 8d 9h", "Js", "3c"),
+    )
+    result = SettlementService()._settle_hand(hand)
+    assert result == {0: 0, 1: -20, 2: -120, 3: 140, 4: 0, 5: 0}
+
+
+def test_split_pot_with_odd_chip():
+    """Test that the odd chip goes to the first winner left of the button"""
+    hand = make_hand(
+        [(3, "preflop", "c", 40), (4, "preflop", "f", 0), (5, "preflop", "f", 0),
+         (0, "preflop", "f", 0), (1, "preflop", "f", 0), (2, "preflop", "x", 0)],
+        {"2": "2c 3d", "3": "4h 5s"},
+    )
+    # SB's dead 20 makes a pot of 100 split between BB and UTG
+    result = SettlementService()._settle_hand(hand)
+    assert result == {0: 0, 1: -20, 2: 10, 3: 10, 4: 0, 5: 0}
+
+    hand.seats[1] = PlayerSnapshot(1, "Player1", 1000, "SB")
+    hand.bb_size = 42
+    hand.actions[0] = Action(3, "preflop", "c", 42)
+    # Pot of 21 + 42 + 42 = 105: BB sits closer to the button's left
+    result = SettlementService()._settle_hand(hand)
+    assert result == {0: 0, 1: -21, 2: 11, 3: 10, 4: 0, 5: 0}
+
+
+def test_side_pots_with_multiple_all_ins():
+    """Test main and side pots when short stacks win"""
+    committed = {0: 100, 1: 300, 2: 500, 3: 500, 4: 0, 5: 0}
+    live = [1, 2, 3, 0]
+    ranks = {0: 40, 1: 30, 2: 10, 3: 20}
+    won = award_pots(committed, live, ranks)
+    # Main pot 400 to seat 0, first side pot 600 to seat 1, last 400 to seat 3
+    assert won == {0: 400, 1: 600, 2: 0, 3: 400, 4: 0, 5: 0}
+    assert sum(won.values()) == sum(committed.values())
+
+
+def test_side_pots_with_tie_and_dead_money():
+    """Test tied side pot winners and folded chips in the pots"""
+    committed = {0: 100, 1: 300, 2: 300, 3: 50, 4: 0, 5: 0}
+    live = [1, 2, 0]
+    ranks = {0: 10, 1: 20, 2: 20}
+    won = award_pots(committed, live, ranks)
+    assert won == {0: 0, 1: 375, 2: 375, 3: 0, 4: 0, 5: 0}
+
+
+def test_equal_commitments_fast_path_matches_side_pot_award():
+    """Test the no-side-pot shortcut against the general award, odd chips included"""
+    rnd = random.Random(3)
+    for _ in range(2000):
+        live = rnd.sample(range(6), rnd.randint(2, 6))
+        cap = rnd.randint(1, 500)
+        committed = {
+            seat: cap if seat in live else rnd.choice((0, rnd.randint(0, cap + 50)))
+            for seat in range(6)
+        }
+        ranks = {seat: rnd.randint(0, 2) for seat in live}
+        general = _award_side_pots(
+            dict.fromkeys(committed, 0), committed, list(committed.values()), live, ranks
+        )
+        assert award_pots(committed, live, ranks) == general
+
+
+def level_by_level(committed, live, ranks):
+    """Reference award: every commitment level of a live seat is its own pot"""
+    won = dict.fromkeys(committed, 0)
+    previous = 0
+    for level in sorted({committed[seat] for seat in live}):
+        pot = sum(min(a, level) - min(a, previous) for a in committed.values())
+        eligible = [seat for seat in live if committed[seat] >= level]
+        best = max(ranks[seat] for seat in eligible)
+        winners = [seat for seat in eligible if ranks[seat] == best]
+        share, odd = divmod(pot, len(winners))
+        for i, seat in enumerate(winners):
+            won[seat] += share + (i < odd)
+        previous = level
+    return won
+
+
+def test_side_pots_match_level_by_level_award():
+    """Test the best-hand-first side pot walk against one pot per level"""
+    rnd = random.Random(5)
+    for _ in range(5000):
+        live = rnd.sample(range(6), rnd.randint(2, 6))
+        committed = {seat: rnd.choice((100, 200, 300, 400)) for seat in live}
+        top = max(committed.values())
+        committed.update(
+            (seat, rnd.randint(0, top)) for seat in range(6) if seat not in live
+        )
+        ranks = {seat: rnd.randint(0, 3) for seat in live}
+        assert award_pots(committed, live, ranks) == level_by_level(committed, live, ranks)
+
+
+def test_showdown_requires_complete_board():
+    """Test that a multiway showdown without a river is rejected"""
+    hand = make_hand(
+        [(3, "preflop", "c", 40)] + folds(4, 5, 0, 1) + [(2, "preflop", "x", 0)],
+        {"2": "2c 3d", "3": "4h 5s"},
+        board=("Ac Kh Qc", "Js", None),
+    )
+    with pytest.raises(ValueError, match="complete board"):
+        SettlementService()._settle_hand(hand)
+
+
+def test_overcommitted_seat_is_rejected():
+    """Test that a seat cannot put in more than its stack"""
+    hand = make_hand(
+        [(3, "preflop", "allin", 1200)] + folds(4, 5, 0, 1, 2),
+        {},
+    )
+    with pytest.raises(ValueError, match="commits 1200"):
+        SettlementService()._settle_hand(hand)
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_hand_keys, get_hands_repo, get_settlement_executor
+from app.main import app
+from app.repository.memory_repo import InMemoryHandsRepository
+from app.services import settlement_pool
+from app.services.idempotency import RecentHandKeys
+from app.services.settlement import SettlementService
+from app.services.settlement_pool import SettlementBusy, SettlementExecutor
+from test_settlement import folds, make_hand
+
+SHOWDOWN = [(3, "preflop", "r", 120), *folds(4, 5, 0, 1), (2, "preflop", "c", 80)] + [
+    (seat, street, "x", 0) for street in ("flop", "turn", "river") for seat in (2, 3)
+]
+HOLE_CARDS = {2: "Ah As", 3: "Kh Kd"}
+
+
+def hands(count):
+    batch = []
+    for index in range(count):
+        hand = make_hand(SHOWDOWN, HOLE_CARDS, board=("2c 7d 9h", "Js", "3c"))
+        hand.id = f"hand-{index}"
+        batch.append(hand)
+    return batch
+
+
+def test_thread_and_process_pools_match_inline():
+    """Test every executor mode settles exactly like SettlementService"""
+    expected = SettlementService().validate_and_settle_hand(hands(1)[0])
+    invalid = make_hand(folds(4), {})
+
+    async def scenario(mode):
+        executor = SettlementExecutor(mode, workers=2, chunk_size=4)
+        executor.start()
+        try:
+            single = await executor.settle(hands(1)[0])
+            batch = await executor.settle_many([*hands(9), invalid])
+            return single, batch, executor.stats()
+        finally:
+            executor.shutdown()
+
+    for mode in ("inline", "thread", "process"):
+        single, batch, stats = asyncio.run(scenario(mode))
+        assert single == expected
+        assert batch[:9] == [expected] * 9
+        assert isinstance(batch[9], ValueError)
+        assert "out of turn" in str(batch[9])
+        assert stats["in_flight"] == 0
+        if mode != "inline":
+            # One job for the single hand, then ten hands in chunks of four
+            assert stats["jobs"] == 4
+
+
+def test_saturated_pool_rejects_and_slow_jobs_time_out(monkeypatch):
+    release = threading.Event()
+    real_chunk = settlement_pool.settle_chunk
+
+    def blocking_chunk(batch):
+        release.wait(5)
+        return real_chunk(batch)
+
+    monkeypatch.setattr(settlement_pool, "settle_chunk", blocking_chunk)
+
+    async def scenario():
+        executor = SettlementExecutor("thread", workers=1, max_in_flight=1, timeout=0.2)
+        executor.start()
+        try:
+            with pytest.raises(SettlementBusy, match="longer than"):
+                await executor.settle(hands(1)[0])
+            # The timed-out job still holds the only slot until it finishes
+            with pytest.raises(SettlementBusy, match="busy"):
+                await executor.settle(hands(1)[0])
+            release.set()
+            while executor.in_flight:
+                await asyncio.sleep(0.01)
+            await executor.settle(hands(1)[0])
+            return executor.stats()
+        finally:
+            release.set()
+            executor.shutdown()
+
+    stats = asyncio.run(scenario())
+    assert stats["timeouts"] == 1
+    assert stats["rejected"] == 1
+    assert stats["jobs"] == 2
+
+
+def test_failed_submission_releases_its_slot():
+    async def scenario():
+        executor = SettlementExecutor("thread", workers=1, max_in_flight=1)
+        executor.start()
+        # Shut down underneath the executor, as lifespan teardown can
+        executor._pool.shutdown()
+        try:
+            with pytest.raises(RuntimeError):
+                await executor.settle(hands(1)[0])
+            return executor.in_flight
+        finally:
+            executor.shutdown()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_busy_settlement_returns_503():
+    class BusyExecutor:
+        async def settle(self, hand):
+            raise SettlementBusy("Settlement workers are busy")
+
+        async def settle_many(self, batch):
+            raise SettlementBusy("Settlement workers are busy")
+
+    repo = InMemoryHandsRepository()
+    keys = RecentHandKeys()
+    app.dependency_overrides[get_hands_repo] = lambda: repo
+    app.dependency_overrides[get_hand_keys] = lambda: keys
+    app.dependency_overrides[get_settlement_executor] = BusyExecutor
+    try:
+        client = TestClient(app)
+        body = {
+            "bb_size": 40,
+            "seats": [
+                {"seat": seat, "name": f"Player{seat}", "starting_stack": 1000, "role": role}
+                for seat, role in enumerate(["BTN", "SB", "BB", "UTG", "MP", "CO"])
+            ],
+            "hole_cards": {},
+            "board": {},
+            "actions": [
+                {"seat": seat, "street": "preflop", "type": "f", "amount": 0}
+                for seat in (3, 4, 5, 0, 1)
+            ],
+        }
+        single = client.post("/api/hands", json=body)
+        batch = client.post("/api/hands/batch", json=[body])
+    finally:
+        app.dependency_overrides.pop(get_hands_repo)
+        app.dependency_overrides.pop(get_hand_keys)
+        app.dependency_overrides.pop(get_settlement_executor)
+    assert single.status_code == 503
+    assert single.headers["retry-after"] == "1"
+    assert batch.status_code == 503
+    assert keys.stats()["pending"] == 0
+    assert asyncio.run(repo.list()) == []
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import evaluator
+from app.services.settlement_pool import SettlementExecutor
+from app.services.startup import StartupTimes
+
+
+def test_blocking_warm_up_builds_tables_before_returning(monkeypatch):
+    monkeypatch.setattr(evaluator, "_flush", None)
+    monkeypatch.setattr(evaluator, "_non_flush", None)
+
+    async def scenario():
+        times = StartupTimes()
+        executor = SettlementExecutor("thread", workers=1)
+        executor.start()
+        try:
+            await times.warm_up(executor, mode="blocking")
+        finally:
+            executor.shutdown()
+        return times.stats()
+
+    stats = asyncio.run(scenario())
+    assert evaluator._flush is not None
+    assert stats["warm"] and stats["warmup_mode"] == "blocking"
+
+
+def test_warm_up_off_and_unknown_modes():
+    async def scenario(mode):
+        times = StartupTimes()
+        await times.warm_up(mode=mode)
+        await times.stop()
+        return times.stats()
+
+    assert asyncio.run(scenario("off"))["warm"] is False
+    with pytest.raises(ValueError, match="STARTUP_WARMUP"):
+        asyncio.run(scenario("eager"))
+
+
+def test_startup_report_covers_import_readiness_and_first_success():
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+        stats = client.get("/health/startup").json()
+    assert 0 < stats["import_seconds"] <= stats["ready_seconds"]
+    assert stats["first_success_seconds"] is not None
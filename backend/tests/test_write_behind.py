@@ -0,0 +1,172 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.domain.hand import Board, Hand
+from app.repository.write_behind import GroupCommitWriter, WriteQueueFull
+
+
+def make_hand(index: int) -> Hand:
+    return Hand(
+        id=str(uuid.UUID(int=index + 1)),
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        bb_size=40,
+        seats=[],
+        hole_cards={},
+        board=Board(),
+        actions=[],
+        short_line="",
+        result={},
+    )
+
+
+class RecordingRepo:
+    def __init__(self, commit_delay: float = 0.0, bad_ids=()):
+        self.commit_delay = commit_delay
+        self.bad_ids = set(bad_ids)
+        self.batches = []
+        self.saved = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def save_many(self, hands, keys=None):
+        await self.release.wait()
+        await asyncio.sleep(self.commit_delay)
+        if any(hand.id in self.bad_ids for hand in hands):
+            raise ValueError("duplicate key")
+        self.batches.append(len(hands))
+        self.saved.extend(hands)
+        return [None] * len(hands)
+
+    async def save(self, hand, key=None):
+        if hand.id in self.bad_ids:
+            raise ValueError("duplicate key")
+        self.saved.append(hand)
+
+
+def test_concurrent_saves_commit_in_groups():
+    async def scenario():
+        repo = RecordingRepo(commit_delay=0.01)
+        writer = GroupCommitWriter(repo, max_batch=20, max_delay_ms=50, queue_size=100)
+        writer.start()
+        await asyncio.gather(*(writer.save(make_hand(i)) for i in range(50)))
+        await writer.stop()
+        return repo, writer
+
+    repo, writer = asyncio.run(scenario())
+    assert len(repo.saved) == 50
+    assert max(repo.batches) == 20
+    assert len(repo.batches) <= 4
+    assert writer.stats()["written"] == 50
+
+
+def test_lone_hand_flushes_after_delay():
+    async def scenario():
+        repo = RecordingRepo()
+        writer = GroupCommitWriter(repo, max_batch=100, max_delay_ms=20)
+        writer.start()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await writer.save(make_hand(0))
+        elapsed = loop.time() - started
+        await writer.stop()
+        return repo, elapsed
+
+    repo, elapsed = asyncio.run(scenario())
+    assert repo.batches == [1]
+    assert 0.015 <= elapsed < 1
+
+
+def test_ack_on_enqueue_returns_before_commit_and_drains_on_stop():
+    async def scenario():
+        repo = RecordingRepo()
+        repo.release.clear()
+        writer = GroupCommitWriter(repo, max_batch=10, max_delay_ms=1, ack_on_enqueue=True)
+        writer.start()
+        for i in range(25):
+            await writer.save(make_hand(i))
+        queued_before_commit = len(repo.saved)
+        repo.release.set()
+        await writer.stop()
+        return repo, queued_before_commit
+
+    repo, queued_before_commit = asyncio.run(scenario())
+    assert queued_before_commit == 0
+    assert len(repo.saved) == 25
+
+
+def test_full_queue_applies_backpressure():
+    async def scenario():
+        repo = RecordingRepo()
+        repo.release.clear()
+        writer = GroupCommitWriter(
+            repo, max_batch=1, max_delay_ms=0, queue_size=1,
+            ack_on_enqueue=True, enqueue_timeout=0.02,
+        )
+        writer.start()
+        await writer.save(make_hand(0))  # taken by the flusher, blocked in commit
+        await asyncio.sleep(0.01)
+        await writer.save(make_hand(1))  # fills the queue
+        with pytest.raises(WriteQueueFull):
+            await writer.save(make_hand(2))
+        repo.release.set()
+        await writer.stop()
+        return repo
+
+    assert len(asyncio.run(scenario()).saved) == 2
+
+
+def test_bad_hand_does_not_fail_its_group():
+    bad = make_hand(3).id
+
+    async def scenario():
+        repo = RecordingRepo(bad_ids={bad})
+        writer = GroupCommitWriter(repo, max_batch=10, max_delay_ms=20)
+        writer.start()
+        results = await asyncio.gather(
+            *(writer.save(make_hand(i)) for i in range(6)), return_exceptions=True
+        )
+        await writer.stop()
+        return repo, results
+
+    repo, results = asyncio.run(scenario())
+    assert isinstance(results[3], ValueError)
+    assert sum(r is None for r in results) == 5
+    assert len(repo.saved) == 5
+
+
+def test_save_after_stop_is_rejected():
+    async def scenario():
+        writer = GroupCommitWriter(RecordingRepo())
+        writer.start()
+        await writer.stop()
+        with pytest.raises(RuntimeError):
+            await writer.save(make_hand(0))
+
+    asyncio.run(scenario())
+
+
+def test_stop_writes_hands_put_behind_the_sentinel():
+    async def scenario():
+        repo = RecordingRepo()
+        repo.release.clear()
+        writer = GroupCommitWriter(repo, max_batch=1, max_delay_ms=0, queue_size=1)
+        writer.start()
+        saves = [asyncio.create_task(writer.save(make_hand(0)))]
+        await asyncio.sleep(0.01)  # taken by the flusher, blocked in commit
+        saves.append(asyncio.create_task(writer.save(make_hand(1))))
+        saves.append(asyncio.create_task(writer.save(make_hand(2))))
+        await asyncio.sleep(0.01)  # hand 1 fills the queue, hand 2 waits for room
+        stopping = asyncio.create_task(writer.stop())
+        # Room appears as stop begins: the sentinel goes in before hand 2
+        item = writer._queue.get_nowait()
+        repo.release.set()
+        await writer._flush([item])
+        await asyncio.wait_for(stopping, 1)
+        return repo, await asyncio.wait_for(asyncio.gather(*saves), 1)
+
+    repo, results = asyncio.run(scenario())
+    assert results == [None, None, None]
+    assert sorted(hand.id for hand in repo.saved) == [make_hand(i).id for i in range(3)]